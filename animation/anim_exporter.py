@@ -4,7 +4,9 @@ from pathlib import Path
 
 import pymel.core as pm
 
+import flottitools.mayafbx as mayafbx
 import flottitools.path_consts as path_consts
+import flottitools.utils.exportmanifest as exportmanifest
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.pathutils as pathutils
 import flottitools.utils.rigutils as rigutils
@@ -105,7 +107,8 @@ def get_rad_clip_data_from_scene():
     export_path = os.path.normpath(get_clip_export_default_path(clip_name, dir_path=scene_path.parents[1]))
     current_reference = pm.listReferences()[0]
     clip_data_dict = {CLIP_NAME: clip_name, CLIP_FRAME_START: frame_start, CLIP_FRAME_END: frame_end,
-                 CLIP_EXPORT_PATH: export_path, CLIP_RIG_NAMESPACE: current_reference.namespace}
+                 CLIP_EXPORT_PATH: export_path, CLIP_RIG_NAMESPACE: current_reference.namespace,
+                 CLIP_RIG_PATH: os.path.normpath(current_reference.path)}
     return clip_data_dict
 
 
@@ -161,13 +164,68 @@ def get_default_rad_data_for_export():
     # return export_clip_dict(metadata)
 
 
-def export_clip_dict(clip_dict):
-    export_path = Path(clip_dict[CLIP_EXPORT_PATH])
+def export_clip_dict(clip_dict, skip_unchanged=False):
+    """
+    Exports a clip of the open scene.
+
+    :param skip_unchanged: don't export if the scene, rig, frame range and export options are the same as
+        when the clip was last exported. Returns None if the export was skipped.
+    """
+    return export_clip_dicts([clip_dict], skip_unchanged)[0]
+
+
+def export_clip_dicts(clip_dicts, skip_unchanged=False):
+    """Exports clips of the open scene like export_clip_dict() and returns a result per clip."""
+    # exporting a clip leaves the scene modified, so every fingerprint is taken before the first export
+    fingerprints = [get_clip_fingerprint_from_scene(c) for c in clip_dicts]
+    results = []
+    for clip_dict, fingerprint in zip(clip_dicts, fingerprints):
+        export_path = Path(clip_dict[CLIP_EXPORT_PATH])
+        if skip_unchanged and exportmanifest.is_export_up_to_date(export_path, fingerprint):
+            results.append(None)
+            continue
+        matching_reference = get_matching_reference(clip_dict[CLIP_RIG_NAMESPACE])
+        result = export_animation(export_path, clip_dict[CLIP_FRAME_START], clip_dict[CLIP_FRAME_END],
+                                  rig_reference=matching_reference)
+        if result.lower() == 'success':
+            exportmanifest.record_export(export_path, fingerprint)
+        results.append(result)
+    return results
+
+
+def get_clip_fingerprint_from_scene(clip_dict):
+    """Returns the fingerprint of exporting clip_dict from the open scene, or None if the scene has unsaved
+    changes and the files on disk don't describe the export."""
+    scene_path = pathutils.get_scene_path()
+    if not scene_path or pm.isModified():
+        return None
     matching_reference = get_matching_reference(clip_dict[CLIP_RIG_NAMESPACE])
-    result = export_animation(export_path, clip_dict[CLIP_FRAME_START], clip_dict[CLIP_FRAME_END],
-                                            rig_reference=matching_reference)
-    
-    return result
+    rig_path = matching_reference.path if matching_reference else None
+    return get_clip_fingerprint(scene_path, clip_dict, rig_path)
+
+
+def get_clip_fingerprint(scene_path, clip_dict, rig_path=None):
+    """
+    Returns the export manifest fingerprint of exporting clip_dict from the scene at scene_path.
+    Doesn't open the scene.
+
+    :param rig_path: the file the clip's rig is referenced from. Defaults to the rig path in clip_dict.
+        Without one the fingerprint never matches and the clip is always exported.
+    """
+    rig_path = rig_path or clip_dict.get(CLIP_RIG_PATH)
+    files = {'scene': scene_path, 'rig': rig_path}
+    # clips are exported with whatever the FBX plugin is set to
+    settings = {CLIP_FRAME_START: clip_dict[CLIP_FRAME_START],
+                CLIP_FRAME_END: clip_dict[CLIP_FRAME_END],
+                CLIP_RIG_NAMESPACE: clip_dict.get(CLIP_RIG_NAMESPACE),
+                'options': mayafbx.FbxExportOptions.from_scene().to_dict()}
+    return exportmanifest.get_export_fingerprint(clip_dict[CLIP_EXPORT_PATH], files, settings)
+
+
+def is_clip_export_up_to_date(scene_path, clip_dict):
+    """True if clip_dict of the scene at scene_path doesn't need to be exported again. Doesn't open the scene."""
+    fingerprint = get_clip_fingerprint(scene_path, clip_dict)
+    return exportmanifest.is_export_up_to_date(clip_dict[CLIP_EXPORT_PATH], fingerprint)
 
 def get_matching_reference(ref_ns, references_current_scene=None):
     references_current_scene = references_current_scene or pm.listReferences()
@@ -9,6 +9,7 @@ import flottitools.path_consts as path_consts
 import flottitools.ui as flotti_ui
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.pathutils as pathutils
+import flottitools.utils.progressutils as progressutils
 
 import flottitools.animation.anim_exporter as anim_exporter
 
@@ -226,13 +227,21 @@ class AnimExporterMayaWindow(flotti_ui.FlottiWindowDesignerUI):
             self.save()
 
     def export_all_clips(self):
-        for clip in self.clips:
-            self._export_clip(clip)
+        self._export_clips(self.clips)
 
     def export_selected(self):
         indices = [i for i, clip in enumerate(self.clips) if clip.is_checked()]
-        for index in indices:
-            self._export_clip(self.clips[index])
+        self._export_clips([self.clips[index] for index in indices])
+
+    def _export_clips(self, clips):
+        with progressutils.get_main_progress_reporter() as progress:
+            progress.set_maximum(len(clips))
+            try:
+                for clip in clips:
+                    progress.update_label_and_iter_val('Exporting {}'.format(clip.ui.clipname_lineedit.text()))
+                    self._export_clip(clip)
+            except progressutils.ProgressCanceled:
+                print('Export canceled.')
 
     def _export_clip(self, clip):
         result = clip.export()
@@ -348,7 +357,8 @@ class AnimClipWidget:
         self.export_path = self.ui.export_lineedit.text()
         data_dict = {anim_exporter.CLIP_NAME: self.clip_name, anim_exporter.CLIP_FRAME_START: self.frame_start, 
                      anim_exporter.CLIP_FRAME_END: self.frame_end, anim_exporter.CLIP_EXPORT_PATH: self.export_path, 
-                     anim_exporter.CLIP_RIG_NAMESPACE: self.current_reference.namespace}
+                     anim_exporter.CLIP_RIG_NAMESPACE: self.current_reference.namespace,
+                     anim_exporter.CLIP_RIG_PATH: os.path.normpath(self.current_reference.path)}
         return data_dict
 
     def refresh_rig_references(self):
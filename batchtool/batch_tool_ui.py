@@ -5,12 +5,16 @@ import stat
 
 import pymel.core as pm
 
+import flottitools.batchtool.batchutils as batchutils
+import flottitools.mayafbx as mayafbx
 import flottitools.path_consts as path_consts
 import flottitools.ui as flottiui
+import flottitools.utils.exportmanifest as exportmanifest
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.materialutils as matutils
 import flottitools.utils.meshutils as meshutils
 import flottitools.utils.pathutils as pathutils
+import flottitools.utils.progressutils as progressutils
 
 from flottitools.ui import QtCore, QtWidgets, QtGui
 
@@ -34,7 +38,7 @@ class BatcherMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
     def __init__(self):
         super(BatcherMayaWindow, self).__init__()
         self.start_dir_string = path_consts.FLOTTITOOLS_DIR
-        self.default_filter_string = '*.ma, *.mb'
+        self.default_filter_string = batchutils.SCENE_FILTER_STRING
         self.files_list_paths = []
 
         export_fbx_name = 'Export Mesh as .fbx'
@@ -110,7 +114,7 @@ class BatcherMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
     def execute_batch_operation(self):
         operation_name = self.ui.operation_comboBox.currentText()
         operation_method = self.operation_name_to_method[operation_name]
-        logger = Logger(self.files_list_paths, operation_name)
+        logger = batchutils.Logger(self.files_list_paths, operation_name)
         result = None
         try:
             result = operation_method(self.files_list_paths, logger)
@@ -128,9 +132,9 @@ class BatcherMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
         for selected_index in self.ui.browse_dir_treeView.selectedIndexes():
             path_string = self.system_model.filePath(selected_index)
             path = pathlib.Path(path_string)
-            file_paths = get_all_file_paths_in_dir(path)
+            file_paths = batchutils.get_all_file_paths_in_dir(path)
             if filter_text:
-                file_paths = path_match_multiple(file_paths, filter_text)
+                file_paths = batchutils.path_match_multiple(file_paths, filter_text)
             file_paths_in_selected_dirs.extend(file_paths)
         # remove duplicates and sort list
         file_paths_in_selected_dirs = list(set(file_paths_in_selected_dirs))
@@ -225,64 +229,67 @@ class BatcherMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
         return new_list_item
 
 
-def path_match_multiple(paths, match_string):
-    if ',' not in match_string:
-        return [p for p in paths if p.match(match_string)]
-    parts = match_string.split(',')
-    match_strings = [p.strip() for p in parts]
-    matched_paths = []
-    for match_string in match_strings:
-        matched_paths.extend([p for p in paths if p.match(match_string)])
-    return matched_paths
-
-
-def get_all_file_paths_in_dir(dir_path):
-    all_paths = []
-    for dir_path, sub_dir_names, file_names in os.walk(dir_path):
-        for file_name in file_names:
-            file_path = pathlib.Path(os.path.join(dir_path, file_name))
-            all_paths.append(file_path)
-    return all_paths
-
-
 class ListWidgetItemWithPath(QtWidgets.QListWidgetItem):
     # would have used a dict but QListWidgetItems aren't hashable and can't be stored in a dict
     path = None
 
 
-def export_mesh_as_fbx(file_paths, logger):
+def export_mesh_as_fbx(file_paths, logger, skip_unchanged=True):
+    """
+    :param skip_unchanged: don't open scenes whose fbx was exported from the same scene file with the same
+        FBX plugin settings, according to the export manifest.
+    """
     results = []
-    for file_path in file_paths:
-        try:
-            on_open_error = open_file_and_ignore_errors(file_path)
-            if on_open_error:
-                logger.log(file_path, on_open_error)
-            fbx_path = pathlib.Path(file_path)
-            fbx_path = fbx_path.with_suffix('.fbx')
-            fbx_abs_path = os.path.abspath(fbx_path)
-            mesh = meshutils.get_meshes_from_scene()[0]
-            ioutils.export_fbx(fbx_abs_path, nodes=mesh)
-            ioutils.ensure_file_is_writable(file_path)
-            pm.saveFile()
-            logger.log(file_path, 'Exported {0} to {1}'.format(mesh, fbx_abs_path))
-        except Exception as e:
-            logger.log(file_path, e)
+    with progressutils.get_main_progress_reporter() as progress:
+        progress.set_maximum(len(file_paths))
+        for file_path in file_paths:
+            progress.update_label_and_iter_val(os.path.basename(file_path))
+            try:
+                fbx_path = pathlib.Path(file_path)
+                fbx_path = fbx_path.with_suffix('.fbx')
+                fbx_abs_path = os.path.abspath(fbx_path)
+                if skip_unchanged and exportmanifest.is_export_up_to_date(
+                        fbx_abs_path, get_mesh_fbx_fingerprint(file_path, fbx_abs_path)):
+                    logger.log(file_path, 'Skipped, {} is up to date'.format(fbx_abs_path))
+                    continue
+                on_open_error = open_file_and_ignore_errors(file_path)
+                if on_open_error:
+                    logger.log(file_path, on_open_error)
+                mesh = meshutils.get_meshes_from_scene()[0]
+                ioutils.export_fbx(fbx_abs_path, nodes=mesh)
+                ioutils.ensure_file_is_writable(file_path)
+                pm.saveFile()
+                # fingerprint the saved scene, which is what the fbx was exported from
+                fingerprint = get_mesh_fbx_fingerprint(file_path, fbx_abs_path) if not on_open_error else None
+                exportmanifest.record_export(fbx_abs_path, fingerprint)
+                logger.log(file_path, 'Exported {0} to {1}'.format(mesh, fbx_abs_path))
+            except Exception as e:
+                logger.log(file_path, e)
     return results
 
 
+def get_mesh_fbx_fingerprint(file_path, fbx_path):
+    """The fbx is exported with whatever the FBX plugin is set to, so its settings are part of the fingerprint."""
+    settings = {'options': mayafbx.FbxExportOptions.from_scene().to_dict()}
+    return exportmanifest.get_export_fingerprint(fbx_path, {'scene': file_path}, settings)
+
+
 def rename_mesh_to_texture_name(file_paths, logger):
     results = []
-    for file_path in file_paths:
-        try:
-            on_open_error = open_file_and_ignore_errors(file_path)
-            if on_open_error:
-                logger.log(file_path, on_open_error)
-            rename_mesh_in_scene_to_match_texture()
-            ioutils.ensure_file_is_writable(file_path)
-            pm.saveFile()
-            logger.log(file_path, 'Mesh successfully renamed!')
-        except Exception as e:
-            logger.log(file_path, e)
+    with progressutils.get_main_progress_reporter() as progress:
+        progress.set_maximum(len(file_paths))
+        for file_path in file_paths:
+            progress.update_label_and_iter_val(os.path.basename(file_path))
+            try:
+                on_open_error = open_file_and_ignore_errors(file_path)
+                if on_open_error:
+                    logger.log(file_path, on_open_error)
+                rename_mesh_in_scene_to_match_texture()
+                ioutils.ensure_file_is_writable(file_path)
+                pm.saveFile()
+                logger.log(file_path, 'Mesh successfully renamed!')
+            except Exception as e:
+                logger.log(file_path, e)
     return results
 
 
@@ -305,37 +312,3 @@ def open_file_and_ignore_errors(file_path):
     except Exception as e:
         error = e
     return error
-
-
-class Logger:
-    def __init__(self, file_list, operation_name):
-        self.operation_name = operation_name
-        self.log_file_path = self.get_log_file_path()
-        self.log_data = ['Performing {} on files: \n'.format(operation_name)]
-
-        stuff = ['    {}\n'.format(str(p)) for p in file_list]
-        self.log_data.extend(stuff)
-
-    def log(self, file_path, result):
-        self.log_data.append('{0} :  {1}\n'.format(str(file_path), result))
-
-    def finish(self):
-        with open(self.log_file_path, 'w') as f:
-            f.writelines(self.log_data)
-
-    def get_log_file_path(self):
-        log_file_base_name = 'Batch {} Log'.format(self.operation_name)
-        next_log_file_name = '{}01.txt'.format(log_file_base_name)
-        log_dir = pathlib.Path(path_consts.FLOTTITOOLS_DIR)
-        existing_log_files = []
-        for each in os.listdir(log_dir):
-            if each.lower().startswith(log_file_base_name.lower()):
-                existing_log_files.append(each)
-        if existing_log_files:
-            existing_log_files.sort()
-            name, ext = os.path.splitext(existing_log_files[-1])
-            number = int(name[-2:])
-            number += 1
-            next_log_file_name = '{0}{1}.txt'.format(log_file_base_name, str(number).zfill(2))
-        log_file_path = log_dir.joinpath(next_log_file_name)
-        return log_file_path
@@ -0,0 +1,84 @@
+"""
+File discovery and logging shared by the Batcher window and headless batch runners.
+Nothing in here needs Maya or Qt.
+"""
+import os
+import pathlib
+
+import flottitools.path_consts as path_consts
+
+
+SCENE_FILTER_STRING = '*.ma, *.mb'
+
+
+def path_match_multiple(paths, match_string):
+    if ',' not in match_string:
+        return [p for p in paths if p.match(match_string)]
+    parts = match_string.split(',')
+    match_strings = [p.strip() for p in parts]
+    matched_paths = []
+    for match_string in match_strings:
+        matched_paths.extend([p for p in paths if p.match(match_string)])
+    return matched_paths
+
+
+def get_all_file_paths_in_dir(dir_path):
+    all_paths = []
+    for dir_path, sub_dir_names, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            file_path = pathlib.Path(os.path.join(dir_path, file_name))
+            all_paths.append(file_path)
+    return all_paths
+
+
+def get_matching_file_paths(paths, filter_string=SCENE_FILTER_STRING):
+    """
+    Returns a sorted list of unique files that match filter_string.
+
+    :param paths: file and directory paths. Directories are searched recursively.
+    :param filter_string: comma separated glob patterns like the Batcher filter field.
+    """
+    file_paths = []
+    for path in paths:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            file_paths.extend(get_all_file_paths_in_dir(path))
+        else:
+            file_paths.append(path)
+    if filter_string:
+        file_paths = path_match_multiple(file_paths, filter_string)
+    return sorted(set(file_paths))
+
+
+class Logger:
+    def __init__(self, file_list, operation_name, log_dir=None):
+        self.operation_name = operation_name
+        self.log_dir = pathlib.Path(log_dir or path_consts.FLOTTITOOLS_DIR)
+        self.log_file_path = self.get_log_file_path()
+        self.log_data = ['Performing {} on files: \n'.format(operation_name)]
+
+        stuff = ['    {}\n'.format(str(p)) for p in file_list]
+        self.log_data.extend(stuff)
+
+    def log(self, file_path, result):
+        self.log_data.append('{0} :  {1}\n'.format(str(file_path), result))
+
+    def finish(self):
+        with open(self.log_file_path, 'w') as f:
+            f.writelines(self.log_data)
+
+    def get_log_file_path(self):
+        log_file_base_name = 'Batch {} Log'.format(self.operation_name)
+        next_log_file_name = '{}01.txt'.format(log_file_base_name)
+        existing_log_files = []
+        for each in os.listdir(self.log_dir):
+            if each.lower().startswith(log_file_base_name.lower()):
+                existing_log_files.append(each)
+        if existing_log_files:
+            existing_log_files.sort()
+            name, ext = os.path.splitext(existing_log_files[-1])
+            number = int(name[-2:])
+            number += 1
+            next_log_file_name = '{0}{1}.txt'.format(log_file_base_name, str(number).zfill(2))
+        log_file_path = self.log_dir.joinpath(next_log_file_name)
+        return log_file_path
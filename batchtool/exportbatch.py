@@ -0,0 +1,352 @@
+"""
+Parallel FBX export with a pool of mayapy worker processes.
+
+The FBX plugin exports on a single thread, so exporting many assets from one Maya is bound to one core.
+export_jobs() splits export jobs across mayapy workers that keep a warm session with fbxmaya loaded between
+jobs. A job is a plain dict, so jobs can be written to a JSON file and sent to workers. There are three types:
+
+    nodes       exports nodes of a scene with mayafbx.FbxExportOptions. See get_nodes_job().
+    sk_mesh     exports the skeletal mesh of a static mesh scene like the character exporter.
+    anim_clips  exports every clip in the .rad metadata of an animation scene like the animation exporter.
+
+Jobs are grouped by scene, so a worker opens each scene once for all of its nodes jobs. Results and the Maya
+output of every scene are collected in the parent process, which never loads pymel or opens a scene.
+By default exports whose inputs didn't change since their last export are skipped without opening their scene,
+see utils.exportmanifest. Pass --force to export everything:
+
+    mayapy -m flottitools.batchtool.exportbatch path/to/characters --type sk_mesh --workers 8 --output results.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+
+import flottitools.batchtool.batchutils as batchutils
+import flottitools.batchtool.mayapypool as mayapypool
+import flottitools.utils.exportmanifest as exportmanifest
+
+
+OPERATION_NAME = 'FBX Export'
+DEFAULT_TIMEOUT = mayapypool.DEFAULT_TIMEOUT
+DEFAULT_MAX_SCENES_PER_WORKER = mayapypool.DEFAULT_MAX_ITEMS_PER_WORKER
+
+JOB_TYPE_NODES = 'nodes'
+JOB_TYPE_SK_MESH = 'sk_mesh'
+JOB_TYPE_ANIM_CLIPS = 'anim_clips'
+# scenes the command line looks for when given directories
+JOB_TYPE_TO_FILTER = {JOB_TYPE_SK_MESH: 'SM_*.ma, SM_*.mb',
+                      JOB_TYPE_ANIM_CLIPS: 'AS_*.ma, AS_*.mb'}
+
+
+def get_nodes_job(scene_path, export_path, options, nodes=None, takes=None):
+    """
+    Returns a job that exports nodes of scene_path to export_path.
+
+    :param options: mayafbx.FbxExportOptions or a dict returned by its to_dict().
+    :param nodes: names of the nodes to export. None exports the whole scene.
+    :param takes: optional mayafbx.Take or (name, start, end) tuples.
+    """
+    if hasattr(options, 'to_dict'):
+        options = options.to_dict()
+    return {'type': JOB_TYPE_NODES,
+            'scene_path': str(scene_path),
+            'export_path': str(export_path),
+            'options': dict(options),
+            'nodes': [str(n) for n in nodes] if nodes else None,
+            'takes': [list(t) for t in takes] if takes else None}
+
+
+def get_scene_job(job_type, scene_path):
+    """Returns a sk_mesh or anim_clips job. Their export paths come from the scene path or its metadata."""
+    return {'type': job_type, 'scene_path': str(scene_path)}
+
+
+def get_result(job, export_paths, duration, error=None, skipped_paths=None):
+    return {'job': job,
+            'export_paths': [str(p) for p in export_paths],
+            'skipped_paths': [str(p) for p in skipped_paths or []],
+            'duration': duration,
+            'error': error,
+            'log': []}
+
+
+def get_failed_result(job, error_message, duration=0.0):
+    return get_result(job, [], duration, error_message)
+
+
+def get_result_summary(result):
+    if result['error']:
+        return 'failed: {}'.format(result['error'])
+    if result['skipped_paths'] and not result['export_paths']:
+        return 'up to date'
+    return 'exported {0} in {1:.1f} s'.format(', '.join(result['export_paths']) or 'nothing', result['duration'])
+
+
+def group_jobs_by_scene(jobs):
+    """Returns lists of job indexes that share a scene, in the order scenes first appear."""
+    scene_path_to_indexes = {}
+    for index, job in enumerate(jobs):
+        scene_path_to_indexes.setdefault(os.path.normpath(job['scene_path']), []).append(index)
+    return list(scene_path_to_indexes.values())
+
+
+class ExportWorker(mayapypool.MayapyWorker):
+    module_name = 'flottitools.batchtool.exportbatch'
+
+    def __init__(self, mayapy_path=None, skip_unchanged=False):
+        super(ExportWorker, self).__init__(mayapy_path)
+        self.skip_unchanged = skip_unchanged
+
+    def get_worker_args(self):
+        return ['--skip-unchanged'] if self.skip_unchanged else []
+
+    def export(self, jobs, timeout=DEFAULT_TIMEOUT):
+        """Runs jobs of one scene and returns a result per job with the worker's output as 'log'. Raises
+        mayapypool.WorkerError if the worker times out or dies."""
+        results = self.request(json.dumps(jobs), timeout * len(jobs))
+        for result in results:
+            result['log'] = list(self.output_lines)
+        return results
+
+
+def export_jobs(jobs, worker_count=None, timeout=DEFAULT_TIMEOUT, mayapy_path=None,
+                max_scenes_per_worker=DEFAULT_MAX_SCENES_PER_WORKER, logger=None, worker_class=ExportWorker,
+                progress_bar=None, skip_unchanged=True):
+    """
+    Exports jobs in parallel mayapy workers.
+
+    :param worker_count: number of mayapy processes. Defaults to one per core.
+    :param timeout: seconds a single job may take before its worker is killed.
+    :param max_scenes_per_worker: a worker is restarted after this many scenes to bound memory growth.
+    :param logger: optional batchutils.Logger that gets one line per job.
+    :param progress_bar: optional progress reporter, only updated from the calling thread. If it is canceled
+        workers finish the scene they are on and ProgressCanceled is raised.
+    :param skip_unchanged: skip exports whose inputs didn't change since they were last exported, according
+        to the export manifest of utils.exportmanifest. Their paths are in the results' 'skipped_paths'.
+    :returns: a result dict per job in jobs order. Failed jobs have an 'error' message.
+    """
+    jobs = list(jobs)
+    scene_jobs = [[jobs[i] for i in indexes] for indexes in group_jobs_by_scene(jobs)]
+
+    def on_scene_done(scene_job_list, results):
+        if logger:
+            for result in results:
+                logger.log(result['job']['scene_path'], get_result_summary(result))
+        if progress_bar:
+            scene_name = os.path.basename(scene_job_list[0]['scene_path'])
+            progress_bar.update_label_and_add_val('Exported {}'.format(scene_name), len(results))
+
+    def get_failed_results(scene_job_list, error_message):
+        return [get_failed_result(job, error_message) for job in scene_job_list]
+
+    if progress_bar:
+        progress_bar.reset()
+        progress_bar.set_maximum(len(jobs))
+    scene_results = mayapypool.run_pool(scene_jobs,
+                                        create_worker=lambda: worker_class(mayapy_path, skip_unchanged),
+                                        run_item=lambda worker, job_list: worker.export(job_list, timeout),
+                                        get_failed_result=get_failed_results,
+                                        worker_count=worker_count, max_items_per_worker=max_scenes_per_worker,
+                                        on_item_done=on_scene_done)
+    job_index_to_result = {}
+    for indexes, results in zip(group_jobs_by_scene(jobs), scene_results):
+        job_index_to_result.update(zip(indexes, results))
+    return [job_index_to_result[i] for i in range(len(jobs))]
+
+
+def get_nodes_job_fingerprint(job):
+    """Returns the export manifest fingerprint of a nodes job. Doesn't open the scene."""
+    settings = {'options': job['options'], 'nodes': job['nodes'], 'takes': job['takes']}
+    return exportmanifest.get_export_fingerprint(job['export_path'], {'scene': job['scene_path']}, settings)
+
+
+def export_scene_jobs(jobs, skip_unchanged=False):
+    """
+    Worker side. Runs jobs that share a scene and returns a result per job.
+
+    :param skip_unchanged: skip exports whose inputs didn't change since they were last exported, according
+        to the export manifest. The scene isn't opened if every job of it is skipped.
+    """
+    results = [None] * len(jobs)
+    node_job_indexes = [i for i, job in enumerate(jobs) if job['type'] == JOB_TYPE_NODES]
+    if node_job_indexes:
+        try:
+            node_results = _export_node_jobs([jobs[i] for i in node_job_indexes], skip_unchanged)
+        except Exception:
+            node_results = [get_failed_result(jobs[i], traceback.format_exc()) for i in node_job_indexes]
+        for index, result in zip(node_job_indexes, node_results):
+            results[index] = result
+    for index, job in enumerate(jobs):
+        if results[index] is None:
+            results[index] = _run_scene_job(job, skip_unchanged)
+    return results
+
+
+def _export_node_jobs(jobs, skip_unchanged):
+    import pymel.core as pm
+    import flottitools.mayafbx as mayafbx
+    import flottitools.utils.ioutils as ioutils
+
+    results = [None] * len(jobs)
+    export_queue = mayafbx.FbxExportQueue()
+    queued_indexes_and_fingerprints = []
+    for index, job in enumerate(jobs):
+        fingerprint = get_nodes_job_fingerprint(job)
+        if skip_unchanged and exportmanifest.is_export_up_to_date(job['export_path'], fingerprint):
+            results[index] = get_result(job, [], 0.0, skipped_paths=[job['export_path']])
+            continue
+        ioutils.ensure_file_is_writable(job['export_path'])
+        takes = [mayafbx.Take(*t) for t in job['takes']] if job['takes'] else None
+        export_queue.add(job['export_path'], mayafbx.FbxExportOptions.from_dict(job['options']),
+                         nodes=job['nodes'], takes=takes)
+        queued_indexes_and_fingerprints.append((index, fingerprint))
+    if not queued_indexes_and_fingerprints:
+        return results
+    # nodes jobs don't change the scene, so they all run on one open scene
+    pm.openFile(jobs[0]['scene_path'], force=True)
+    for (index, fingerprint), export_result in zip(queued_indexes_and_fingerprints, export_queue.run()):
+        job = jobs[index]
+        if export_result.error is None:
+            exportmanifest.record_export(job['export_path'], fingerprint)
+            results[index] = get_result(job, [job['export_path']], export_result.duration)
+        else:
+            error_message = ''.join(traceback.format_exception_only(type(export_result.error),
+                                                                    export_result.error)).strip()
+            results[index] = get_failed_result(job, error_message, export_result.duration)
+    return results
+
+
+def _run_scene_job(job, skip_unchanged):
+    start = time.perf_counter()
+    try:
+        export_paths, skipped_paths = JOB_TYPE_TO_EXPORTER[job['type']](job, skip_unchanged)
+    except Exception:
+        return get_failed_result(job, traceback.format_exc(), time.perf_counter() - start)
+    return get_result(job, export_paths, time.perf_counter() - start, skipped_paths=skipped_paths)
+
+
+def _open_scene(job):
+    import pymel.core as pm
+
+    # these exporters change the scene, so each of them gets a freshly opened one
+    pm.openFile(job['scene_path'], force=True)
+
+
+def _export_sk_mesh(job, skip_unchanged):
+    import pathlib
+    import flottitools.character.character_exporter as character_exporter
+
+    static_mesh_path = pathlib.Path(job['scene_path'])
+    export_path = character_exporter.get_sk_mesh_export_path(static_mesh_path)
+    if export_path is None:
+        raise ValueError('Not a static mesh scene: {}'.format(static_mesh_path))
+    if skip_unchanged and character_exporter.is_sk_mesh_export_up_to_date(static_mesh_path):
+        return [], [export_path]
+    skeleton_path = character_exporter.get_skeleton_path_from_static_mesh_path(static_mesh_path)
+    skin_weights_path = character_exporter.get_skin_weights_path_from_static_mesh_path(static_mesh_path)
+    _open_scene(job)
+    character_exporter.export_sk_meshes_from_scene(export_path, skeleton_path, skin_weights_path)
+    return [export_path], []
+
+
+def _export_anim_clips(job, skip_unchanged):
+    import pathlib
+    import flottitools.animation.anim_exporter as anim_exporter
+
+    scene_path = pathlib.Path(job['scene_path'])
+    metadata_path = anim_exporter.get_metadata_default_path(scene_path)
+    if not metadata_path.exists():
+        raise ValueError('No clip metadata at {}'.format(metadata_path))
+    with open(metadata_path) as f:
+        clip_dicts = json.load(f)
+    stale_clip_dicts = clip_dicts
+    if skip_unchanged:
+        stale_clip_dicts = [c for c in clip_dicts if not anim_exporter.is_clip_export_up_to_date(scene_path, c)]
+    if stale_clip_dicts:
+        _open_scene(job)
+        for clip_dict, result in zip(stale_clip_dicts, anim_exporter.export_clip_dicts(stale_clip_dicts)):
+            if result.lower() != 'success':
+                raise RuntimeError('Export of clip {0} returned: {1}'.format(clip_dict[anim_exporter.CLIP_NAME],
+                                                                             result))
+    export_paths = [c[anim_exporter.CLIP_EXPORT_PATH] for c in stale_clip_dicts]
+    skipped_paths = [c[anim_exporter.CLIP_EXPORT_PATH] for c in clip_dicts if c not in stale_clip_dicts]
+    return export_paths, skipped_paths
+
+
+JOB_TYPE_TO_EXPORTER = {JOB_TYPE_SK_MESH: _export_sk_mesh,
+                        JOB_TYPE_ANIM_CLIPS: _export_anim_clips}
+
+
+def run_worker_loop(skip_unchanged=False):
+    """Worker side of the pool. Runs in mayapy and exports every list of jobs read from stdin."""
+    import pymel.core as pm
+
+    pm.loadPlugin('fbxmaya', quiet=True)
+    # mayafbx logs how long every export took. Send it to stdout so it ends up in the scene's log.
+    mayafbx_logger = logging.getLogger('mayafbx')
+    mayafbx_logger.addHandler(logging.StreamHandler(sys.stdout))
+    mayafbx_logger.setLevel(logging.INFO)
+    mayapypool.write_ready()
+    for line in mayapypool.iterate_requests():
+        jobs = json.loads(line)
+        try:
+            results = export_scene_jobs(jobs, skip_unchanged)
+        except Exception:
+            results = [get_failed_result(job, traceback.format_exc()) for job in jobs]
+        mayapypool.write_result(results)
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if any job failed, else 0."""
+    parser = argparse.ArgumentParser(description='Export FBX files in parallel mayapy processes.')
+    parser.add_argument('paths', nargs='*', help='scene files or directories to search for scenes.')
+    parser.add_argument('--type', choices=sorted(JOB_TYPE_TO_FILTER), default=JOB_TYPE_SK_MESH,
+                        help='what to export from the scenes in paths.')
+    parser.add_argument('--filter', help='comma separated file patterns to match in directories. '
+                                         'Defaults to the scenes of --type.')
+    parser.add_argument('--jobs', help='JSON file with a list of jobs to run as well, like from get_nodes_job().')
+    parser.add_argument('--force', action='store_true',
+                        help='export everything, even assets whose inputs did not change since their last export.')
+    parser.add_argument('--workers', type=int, help='number of mayapy processes. Defaults to one per core.')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='seconds allowed per job.')
+    parser.add_argument('--mayapy', help='mayapy executable. Defaults to $MAYA_LOCATION/bin/mayapy.')
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout.')
+    parser.add_argument('--log-dir', help='write a Batcher style log file to this directory.')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--skip-unchanged', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker_loop(args.skip_unchanged)
+        return 0
+
+    jobs = []
+    if args.jobs:
+        with open(args.jobs) as f:
+            jobs.extend(json.load(f))
+    if args.paths:
+        filter_string = args.filter or JOB_TYPE_TO_FILTER[args.type]
+        scene_paths = batchutils.get_matching_file_paths(args.paths, filter_string)
+        jobs.extend([get_scene_job(args.type, p) for p in scene_paths])
+    logger = None
+    if args.log_dir:
+        logger = batchutils.Logger([job['scene_path'] for job in jobs], OPERATION_NAME, args.log_dir)
+    results = export_jobs(jobs, worker_count=args.workers, timeout=args.timeout, mayapy_path=args.mayapy,
+                          logger=logger, skip_unchanged=not args.force)
+    if logger:
+        logger.finish()
+
+    results_json = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(results_json)
+    else:
+        sys.stdout.write(results_json + '\n')
+    return 1 if any([r['error'] for r in results]) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+A pool of long running mayapy worker processes shared by the headless batch runners.
+
+A worker is a mayapy running a flottitools module with --worker. It writes READY_MARKER once Maya has started,
+then reads one request per line from stdin and answers each with one RESULT_MARKER line of JSON on stdout.
+Anything else it prints is Maya output, which is kept per request so the parent can log it. Keeping workers
+alive avoids paying mayapy startup for every file. A request that takes longer than its timeout, or crashes
+its worker, raises a WorkerError and run_pool() replaces the worker, so one bad file can't stop the batch.
+Nothing in here needs Maya or Qt.
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+import flottitools.path_consts as path_consts
+
+
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_STARTUP_TIMEOUT = 300.0
+DEFAULT_MAX_ITEMS_PER_WORKER = 50
+# worker output that contains these markers is meant for the parent, everything else is Maya chatter
+READY_MARKER = '@@flottitools-batch-ready'
+RESULT_MARKER = '@@flottitools-batch-report '
+# how many lines of worker output to include in crash messages
+OUTPUT_TAIL_LENGTH = 20
+# seconds between checks for finished items
+POLL_INTERVAL = 0.1
+
+
+def get_mayapy_path():
+    """Returns mayapy from $MAYA_LOCATION, this interpreter if it is mayapy, else 'mayapy' from PATH."""
+    executable_name = 'mayapy.exe' if sys.platform == 'win32' else 'mayapy'
+    maya_location = os.environ.get('MAYA_LOCATION')
+    if maya_location:
+        return os.path.join(maya_location, 'bin', executable_name)
+    if os.path.basename(sys.executable).lower().startswith('mayapy'):
+        return sys.executable
+    return executable_name
+
+
+def get_default_worker_count(item_count):
+    return max(1, min(item_count, os.cpu_count() or 1))
+
+
+def write_ready():
+    """Worker side. Tells the parent the worker is ready for requests."""
+    sys.stdout.write(READY_MARKER + '\n')
+    sys.stdout.flush()
+
+
+def write_result(result):
+    """Worker side. Sends the JSON serializable result of the current request to the parent."""
+    sys.stdout.write(RESULT_MARKER + json.dumps(result, sort_keys=True) + '\n')
+    sys.stdout.flush()
+
+
+def iterate_requests():
+    """Worker side. Yields every non empty line read from stdin until the parent closes it."""
+    for line in iter(sys.stdin.readline, ''):
+        line = line.strip()
+        if line:
+            yield line
+
+
+class WorkerError(RuntimeError):
+    pass
+
+
+class WorkerTimeout(WorkerError):
+    pass
+
+
+class WorkerCrashed(WorkerError):
+    pass
+
+
+class MayapyWorker(object):
+    """Parent side of one worker process. Subclasses set module_name to the module that implements --worker."""
+    module_name = None
+
+    def __init__(self, mayapy_path=None):
+        self.mayapy_path = mayapy_path or get_mayapy_path()
+        self.process = None
+        self.request_count = 0
+        # Maya output of the current or last request
+        self.output_lines = []
+        self._lines = None
+
+    def get_worker_args(self):
+        """Extra command line arguments for the worker."""
+        return []
+
+    def get_command(self):
+        return [self.mayapy_path, '-m', self.module_name, '--worker'] + self.get_worker_args()
+
+    def start(self, timeout=DEFAULT_STARTUP_TIMEOUT):
+        env = dict(os.environ)
+        flottitools_parent_dir = os.path.dirname(os.path.abspath(path_consts.FLOTTITOOLS_DIR))
+        env['PYTHONPATH'] = os.pathsep.join([flottitools_parent_dir] + [p for p in [env.get('PYTHONPATH')] if p])
+        env['PYTHONUNBUFFERED'] = '1'
+        try:
+            self.process = subprocess.Popen(self.get_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            stderr=subprocess.STDOUT, env=env, universal_newlines=True, bufsize=1)
+        except OSError as e:
+            raise WorkerError('Could not start {0}: {1}'.format(self.mayapy_path, e))
+        self._lines = queue.Queue()
+        reader = threading.Thread(target=self._read_output, args=(self.process.stdout, self._lines))
+        reader.daemon = True
+        reader.start()
+        self.output_lines = []
+        self._wait_for_line(READY_MARKER, timeout, 'Worker did not start within {} seconds.'.format(timeout))
+
+    def request(self, line, timeout=DEFAULT_TIMEOUT):
+        """Sends line to the worker and returns its decoded JSON result. Raises WorkerError if the worker times
+        out or dies."""
+        self.output_lines = []
+        try:
+            self.process.stdin.write('{}\n'.format(line))
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            raise WorkerCrashed(self._get_crash_message())
+        result_line = self._wait_for_line(RESULT_MARKER, timeout, 'Timed out after {} seconds.'.format(timeout))
+        self.request_count += 1
+        return json.loads(result_line[len(RESULT_MARKER):])
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def _wait_for_line(self, marker, timeout, timeout_message):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.process.kill()
+                raise WorkerTimeout(timeout_message)
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                self.process.wait()
+                raise WorkerCrashed(self._get_crash_message())
+            line = line.rstrip('\n')
+            # Maya output written without a trailing newline can end up in front of the marker
+            marker_index = line.find(marker)
+            if marker_index >= 0:
+                if marker_index > 0:
+                    self.output_lines.append(line[:marker_index])
+                return line[marker_index:]
+            self.output_lines.append(line)
+
+    def _get_crash_message(self):
+        return_code = self.process.poll()
+        message = 'Worker exited with code {}.'.format(return_code)
+        if self.output_lines:
+            message += ' Last output:\n{}'.format('\n'.join(self.output_lines[-OUTPUT_TAIL_LENGTH:]))
+        return message
+
+    @staticmethod
+    def _read_output(stream, lines):
+        for line in iter(stream.readline, ''):
+            lines.put(line)
+        lines.put(None)
+
+
+def run_pool(items, create_worker, run_item, get_failed_result, worker_count=None,
+             max_items_per_worker=DEFAULT_MAX_ITEMS_PER_WORKER, on_item_done=None):
+    """
+    Runs every item on a pool of workers, one thread per worker.
+
+    :param create_worker: returns a new MayapyWorker that is not started yet.
+    :param run_item: run_item(worker, item) returns the result of item.
+    :param get_failed_result: get_failed_result(item, error_message) returns the result of an item whose
+        worker failed or whose run_item raised. The worker is replaced.
+    :param worker_count: number of workers. Defaults to one per core.
+    :param max_items_per_worker: a worker is restarted after this many items to bound memory growth.
+    :param on_item_done: on_item_done(item, result) is called from the calling thread as items finish. If it
+        raises, like a canceled progress bar does, workers finish the item they are on and the exception is
+        raised once they stopped.
+    :returns: a result per item, in items order.
+    """
+    items = list(items)
+    worker_count = worker_count or get_default_worker_count(len(items))
+    index_queue = queue.Queue()
+    for index in range(len(items)):
+        index_queue.put(index)
+    done_queue = queue.Queue()
+    index_to_result = {}
+
+    def run_worker():
+        worker = None
+        try:
+            while True:
+                try:
+                    index = index_queue.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if worker is None:
+                        worker = create_worker()
+                        worker.start()
+                    result = run_item(worker, items[index])
+                except WorkerError as e:
+                    result = get_failed_result(items[index], str(e))
+                    if worker:
+                        worker.stop()
+                    worker = None
+                except Exception:
+                    # like a result that isn't valid JSON. The worker is in an unknown state, so it is replaced too
+                    result = get_failed_result(items[index], traceback.format_exc())
+                    if worker:
+                        worker.stop()
+                    worker = None
+                if worker and worker.request_count >= max_items_per_worker:
+                    worker.stop()
+                    worker = None
+                index_to_result[index] = result
+                done_queue.put(index)
+        finally:
+            if worker:
+                worker.stop()
+
+    threads = [threading.Thread(target=run_worker) for _ in range(min(worker_count, len(items)))]
+    for thread in threads:
+        thread.start()
+    try:
+        while any([thread.is_alive() for thread in threads]) or not done_queue.empty():
+            try:
+                index = done_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if on_item_done:
+                on_item_done(items[index], index_to_result[index])
+    finally:
+        # on cancel, workers finish the item they are on and find nothing left to do
+        while not index_queue.empty():
+            try:
+                index_queue.get_nowait()
+            except queue.Empty:
+                break
+        for thread in threads:
+            thread.join()
+    return [index_to_result[i] for i in range(len(items))]
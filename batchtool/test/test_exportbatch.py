@@ -0,0 +1,105 @@
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import flottitools.batchtool.exportbatch as exportbatch
+import flottitools.batchtool.mayapypool as mayapypool
+
+
+# stands in for mayapy. Scene names decide what the fake worker does.
+FAKE_WORKER_SOURCE = textwrap.dedent('''
+    import json
+    import os
+    import sys
+
+    sys.stdout.write('{ready}\\n')
+    sys.stdout.flush()
+    for line in iter(sys.stdin.readline, ''):
+        jobs = json.loads(line)
+        scene_path = jobs[0]['scene_path']
+        if 'crash' in scene_path:
+            sys.stdout.write('Fatal Error. Attempting to save in crash.ma\\n')
+            sys.stdout.flush()
+            sys.exit(3)
+        if 'garbled' in scene_path:
+            sys.stdout.write('{result}not json\\n')
+            sys.stdout.flush()
+            continue
+        sys.stdout.write('opened {{}} in {{}}\\n'.format(scene_path, os.getpid()))
+        results = []
+        for job in jobs:
+            error = 'no such node' if job.get('nodes') == ['missing'] else None
+            export_paths = [] if error else [job['export_path']]
+            results.append({{'job': job, 'export_paths': export_paths, 'duration': 0.5, 'error': error,
+                             'log': []}})
+        sys.stdout.write('{result}' + json.dumps(results) + '\\n')
+        sys.stdout.flush()
+''').format(ready=mayapypool.READY_MARKER, result=mayapypool.RESULT_MARKER)
+
+
+class FakeExportWorker(exportbatch.ExportWorker):
+    fake_worker_path = None
+
+    def get_command(self):
+        return [sys.executable, self.fake_worker_path]
+
+
+class TestExportJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        FakeExportWorker.fake_worker_path = os.path.join(self.tmp_dir, 'fake_worker.py')
+        with open(FakeExportWorker.fake_worker_path, 'w') as f:
+            f.write(FAKE_WORKER_SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def export(self, jobs, **kwargs):
+        return exportbatch.export_jobs(jobs, worker_class=FakeExportWorker, **kwargs)
+
+    def test_results_in_job_order(self):
+        jobs = [exportbatch.get_nodes_job('a.ma', 'a1.fbx', {'triangulate': True}, nodes=['cube1']),
+                exportbatch.get_nodes_job('b.ma', 'b.fbx', {'triangulate': True}),
+                exportbatch.get_nodes_job('a.ma', 'a2.fbx', {'triangulate': False}, nodes=['missing'])]
+        results = self.export(jobs, worker_count=2)
+        self.assertListEqual([['a1.fbx'], ['b.fbx'], []], [r['export_paths'] for r in results])
+        self.assertEqual('no such node', results[2]['error'])
+
+    def test_jobs_of_a_scene_share_a_worker(self):
+        jobs = [exportbatch.get_nodes_job('a.ma', '{}.fbx'.format(i), {}) for i in range(3)]
+        results = self.export(jobs, worker_count=3)
+        self.assertEqual(1, len([line for line in results[0]['log'] if line.startswith('opened a.ma')]))
+        self.assertListEqual(results[0]['log'], results[2]['log'])
+
+    def test_crash_fails_every_job_of_the_scene(self):
+        jobs = [exportbatch.get_nodes_job('crash.ma', 'c1.fbx', {}),
+                exportbatch.get_nodes_job('crash.ma', 'c2.fbx', {}),
+                exportbatch.get_nodes_job('b.ma', 'b.fbx', {})]
+        results = self.export(jobs, worker_count=1)
+        self.assertIn('exited with code 3', results[0]['error'])
+        self.assertIn('Fatal Error', results[1]['error'])
+        self.assertIsNone(results[2]['error'])
+
+    def test_bad_result_fails_only_its_scene(self):
+        jobs = [exportbatch.get_nodes_job('garbled.ma', 'g.fbx', {}),
+                exportbatch.get_nodes_job('b.ma', 'b1.fbx', {}),
+                exportbatch.get_nodes_job('b.ma', 'b2.fbx', {})]
+        results = self.export(jobs, worker_count=1)
+        self.assertIn('JSONDecodeError', results[0]['error'])
+        self.assertListEqual([['b1.fbx'], ['b2.fbx']], [r['export_paths'] for r in results[1:]])
+
+    def test_group_jobs_by_scene(self):
+        jobs = [exportbatch.get_scene_job(exportbatch.JOB_TYPE_SK_MESH, p) for p in ['a.ma', 'b.ma', 'a.ma']]
+        self.assertListEqual([[0, 2], [1]], exportbatch.group_jobs_by_scene(jobs))
+
+    def test_skipped_result_summary(self):
+        job = exportbatch.get_scene_job(exportbatch.JOB_TYPE_ANIM_CLIPS, 'AS_run.ma')
+        result = exportbatch.get_result(job, [], 0.0, skipped_paths=['run.fbx'])
+        self.assertEqual('up to date', exportbatch.get_result_summary(result))
+
+    def test_skip_unchanged_is_passed_to_worker(self):
+        worker = exportbatch.ExportWorker('mayapy', skip_unchanged=True)
+        self.assertIn('--skip-unchanged', worker.get_command())
@@ -3,9 +3,12 @@ import os
 import pymel.core as pm
 
 import flottitools.mayafbx as mayafbx
+import flottitools.skinmesh.skinfile as skinfile
 import flottitools.skinmesh.skinio as skinio
+import flottitools.utils.exportmanifest as exportmanifest
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.meshutils as meshutils
+import flottitools.utils.pathutils as pathutils
 import flottitools.utils.skeletonutils as skelutils
 import flottitools.utils.skinutils as skinutils
 
@@ -20,7 +23,20 @@ MAYA_FILE_EXTENSIONS = [MAYA_ASCII_EXTENSION, MAYA_BINARY_EXTENSION]
 FBX_EXTENSION = '.fbx'
 
 
-def export_sk_meshes_from_scene(export_fbx_path, skeleton_path, skin_weights_path):
+def export_sk_meshes_from_scene(export_fbx_path, skeleton_path, skin_weights_path, skip_unchanged=False):
+    """
+    Binds the meshes of the open static mesh scene to the skeleton and exports them with the skeleton.
+
+    :param skip_unchanged: don't export if the scene, skeleton, skin weights and export options are the same
+        as when export_fbx_path was last exported. Returns None if the export was skipped.
+    """
+    fingerprint = None
+    scene_path = pathutils.get_scene_path()
+    # the files on disk only describe the export if the open scene has no unsaved changes
+    if scene_path and not pm.isModified():
+        fingerprint = get_sk_mesh_fingerprint(scene_path, skeleton_path, skin_weights_path, export_fbx_path)
+    if skip_unchanged and exportmanifest.is_export_up_to_date(export_fbx_path, fingerprint):
+        return
     if not skeleton_path.exists():
         raise AssertionError('Aborting SKMesh export. No skeleton file exists at path: {}'.format(os.path.normpath(skeleton_path)))
     if not skin_weights_path.exists():
@@ -37,6 +53,35 @@ def export_sk_meshes_from_scene(export_fbx_path, skeleton_path, skin_weights_pat
     skin_clusters = [skinutils.bind_mesh_to_joints(static_mesh, skeleton) for static_mesh in static_meshes]
     skinio.import_skinning_on_meshes(static_meshes, skin_weights_path)
     
+    ioutils.ensure_file_is_writable(export_fbx_path)
+    pm.select(static_meshes, replace=True)
+    pm.select(root_joint, add=True)
+    mayafbx.export_fbx(export_fbx_path, get_sk_mesh_export_options(), selection=True)
+    exportmanifest.record_export(export_fbx_path, fingerprint)
+    return static_meshes, skeleton, skin_clusters
+
+
+def get_sk_mesh_fingerprint(static_mesh_path, skeleton_path, skin_weights_path, export_fbx_path):
+    """Returns the export manifest fingerprint of exporting the skeletal mesh. Doesn't open any scene."""
+    files = {'scene': static_mesh_path, 'skeleton': skeleton_path, 'skin_weights': skin_weights_path}
+    settings = {'options': get_sk_mesh_export_options().to_dict()}
+    return exportmanifest.get_export_fingerprint(export_fbx_path, files, settings)
+
+
+def is_sk_mesh_export_up_to_date(static_mesh_path):
+    """True if the skeletal mesh of the static mesh scene at static_mesh_path doesn't need to be exported
+    again. Doesn't open the scene."""
+    export_fbx_path = get_sk_mesh_export_path(static_mesh_path)
+    if export_fbx_path is None:
+        return False
+    fingerprint = get_sk_mesh_fingerprint(static_mesh_path,
+                                          get_skeleton_path_from_static_mesh_path(static_mesh_path),
+                                          get_skin_weights_path_from_static_mesh_path(static_mesh_path),
+                                          export_fbx_path)
+    return exportmanifest.is_export_up_to_date(export_fbx_path, fingerprint)
+
+
+def get_sk_mesh_export_options():
     options = mayafbx.FbxExportOptions()
     options.smoothing_groups = True
     options.hard_edges = False
@@ -47,12 +92,7 @@ def export_sk_meshes_from_scene(export_fbx_path, skeleton_path, skin_weights_pat
     options.audio = False
     options.automatic_units = True
     options.file_version = mayafbx.FileVersion.FBX_2020
-    
-    ioutils.ensure_file_is_writable(export_fbx_path)
-    pm.select(static_meshes, replace=True)
-    pm.select(root_joint, add=True)
-    mayafbx.export_fbx(export_fbx_path, options, selection=True)
-    return static_meshes, skeleton, skin_clusters
+    return options
 
 
 def get_sk_mesh_export_path(static_mesh_path):
@@ -72,6 +112,12 @@ def get_skeleton_path_from_static_mesh_path(static_mesh_path):
 
 def get_skin_weights_path_from_static_mesh_path(static_mesh_path):
     skw_path = get_path_from_static_mesh_path(static_mesh_path, SKIN_WEIGHTS_PREFIX)
+    if skw_path is None:
+        return
+    # prefer the binary skin file when there is one
+    skin_file_path = skw_path.with_suffix(skinfile.SKIN_FILE_EXTENSION)
+    if skin_file_path.exists():
+        return skin_file_path
     return skw_path
 
 
@@ -12,6 +12,7 @@ QtGui = flotti_ui.QtGui
 
 FBX_FILE_EXTENSION = '.fbx'
 MAYA_FILE_EXTENSIONS = ['.ma', '.mb']
+SKINWEIGHTS_FILE_EXTENSIONS = ['.skw'] + MAYA_FILE_EXTENSIONS
 SKMESH_PREFIX = 'SK_'
 SKEL_FILE_PREFIX = 'SKEL_'
 SKINWEIGHTS_FILE_PREFIX = 'SKW_'
@@ -110,7 +111,7 @@ class CharacterExporterMayaWindow(flotti_ui.FlottiMayaWindowDesignerUI):
         self.skeleton_path = self._path_line_edit(self.ui.steps_skel_lineedit, SKEL_FILE_PREFIX, MAYA_FILE_EXTENSIONS)
 
     def _steps_skinweights_edited(self):
-        self.skin_weights_path = self._path_line_edit(self.ui.steps_skw_lineedit, SKINWEIGHTS_FILE_PREFIX, MAYA_FILE_EXTENSIONS)
+        self.skin_weights_path = self._path_line_edit(self.ui.steps_skw_lineedit, SKINWEIGHTS_FILE_PREFIX, SKINWEIGHTS_FILE_EXTENSIONS)
     
     def _export_line_edited(self):
         text = self.ui.export_path_lineedit.text()
@@ -1,11 +1,12 @@
+import os
+
 import pymel.core as pm
 
-from flottitools.mayafbx import FbxExportOptions, export_fbx
+from flottitools.mayafbx import FbxExportOptions, FbxExportQueue
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.meshutils as meshutils
 import flottitools.utils.pathutils as pathutils
-import flottitools.utils.transformutils as xformutils
-import flottitools.utils.selectionutils as selutils
+import flottitools.utils.progressutils as progressutils
 
 
 def export_selected_meshes_with_prompt():
@@ -14,7 +15,10 @@ def export_selected_meshes_with_prompt():
         pm.error('Nothing selected. Select static meshes to export.')
         return
     meshes = meshutils.get_meshes_in_list(sel)
-    export_paths = export_static_meshes(meshes)
+    try:
+        export_paths = export_static_meshes(meshes)
+    except progressutils.ProgressCanceled:
+        print('Export canceled.')
 
 
 def export_static_meshes(meshes):
@@ -24,17 +28,40 @@ def export_static_meshes(meshes):
         dir_path = scene_path.parent
     
     options = FbxExportOptions()
-    export_paths = []
-    with selutils.preserve_selection():
-        for mesh in meshes:
-            initial_pos = xformutils.get_worldspace_vector(mesh)
+    export_queue = FbxExportQueue()
+    for mesh in meshes:
+        export_path = dir_path.joinpath('{}.fbx'.format(mesh.nodeName(stripNamespace=True)))
+        ioutils.ensure_file_is_writable(export_path)
+        export_queue.add(export_path, options, nodes=[mesh])
+
+    # every mesh is exported at the origin. Each one is only moved there for its own export, so a mesh that is
+    # exported with its children keeps them at their offsets.
+    moved_meshes_to_local_positions = {}
+    with progressutils.get_main_progress_reporter() as progress:
+        progress.set_maximum(len(meshes))
+
+        def on_job_start(job):
+            mesh = job.nodes[0]
+            moved_meshes_to_local_positions[mesh] = mesh.getTranslation()
             mesh.setTranslation((0, 0, 0), space='world')
-            name = '{}.fbx'.format(mesh.nodeName(stripNamespace=True))
-            export_path = dir_path.joinpath(name)
-            ioutils.ensure_file_is_writable(export_path)
-            pm.select(mesh, replace=True)
-            export_fbx(export_path, options, selection=True)
-            print('Success! Exported {0} to {1}'.format(name, export_path))
-            export_paths.append(export_path)
-            mesh.setTranslation(initial_pos, space='world')
+
+        def on_job_done(result):
+            mesh = result.job.nodes[0]
+            mesh.setTranslation(moved_meshes_to_local_positions.pop(mesh))
+            progress.update_label_and_iter_val('Exported {}'.format(os.path.basename(result.job.filename)))
+
+        try:
+            results = export_queue.run(on_job_start=on_job_start, on_job_done=on_job_done)
+        finally:
+            for mesh, local_position in moved_meshes_to_local_positions.items():
+                mesh.setTranslation(local_position)
+
+    export_paths = []
+    for result in results:
+        if result.error:
+            print('Failed to export {0}: {1}'.format(result.job.filename, result.error))
+            continue
+        print('Success! Exported {0} to {1} in {2:.2f}s'.format(result.job.nodes[0], result.job.filename,
+                                                                result.duration))
+        export_paths.append(result.job.filename)
     return export_paths
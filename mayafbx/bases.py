@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Callable, Generic, Iterator, TypeVar, overload
+from typing import TYPE_CHECKING, Callable, Generic, Iterable, Iterator, TypeVar, overload
 
 from apmaya.mayafbx.enums import StrEnum
-from apmaya.mayafbx.utils import get_maya_version, logger, run_mel_command
+from apmaya.mayafbx.utils import (
+    collect_fbx_properties,
+    get_maya_version,
+    logger,
+    run_mel_command,
+    run_mel_commands,
+)
 
 if TYPE_CHECKING:
     from typing_extensions import Self
@@ -14,11 +20,17 @@ if TYPE_CHECKING:
 __all__ = [
     "FbxProperty",
     "FbxOptions",
+    "FbxOptionsState",
     "FbxPropertyField",
     "apply_options",
     "applied_options",
+    "options_cache",
+    "get_active_options_state",
+    "get_property_values",
 ]
 
+FBX_PROPERTY_COMMAND = "FBXProperty"
+
 T = TypeVar("T", bool, str, float, int, StrEnum)
 
 
@@ -60,6 +72,11 @@ class FbxProperty(Generic[T]):
         """FBXProperty mel command."""
         return self._command
 
+    @property
+    def type(self) -> type[T]:
+        """Python type of the property value."""
+        return self._type
+
     @property
     def default(self) -> T:
         """Default value."""
@@ -72,17 +89,40 @@ class FbxProperty(Generic[T]):
         """
         if not self.is_available():
             return None
-        value = run_mel_command(f"{self._command} -q")
-        return self._type(value)  # type: ignore[arg-type]  # type: ignore[arg-type]
+        return self.parse(run_mel_command(f"{self._command} -q"))
+
+    def parse(self, value: object) -> T:
+        """Convert a value returned by mel to the property type."""
+        if issubclass(self._type, bool) and isinstance(value, str):
+            # NOTE: bool("false") is True
+            return value.strip().lower() in {"true", "1"}  # type: ignore[return-value]
+        if isinstance(value, str):
+            value = value.strip()
+        return self._type(value)  # type: ignore[arg-type]
+
+    @property
+    def fbx_property_path(self) -> str | None:
+        """Path listed by the ``FBXProperties`` command, or `None` for ``FBXExport...`` commands."""
+        name, _, path = self._command.partition(" ")
+        return path if name == FBX_PROPERTY_COMMAND else None
 
     def set(self, value: T) -> None:
         """Set property value to scene."""
+        command = self.get_set_command(value)
+        if command is not None:
+            run_mel_command(command)
+
+    def get_set_command(self, value: T) -> str | None:
+        """Mel command setting property to ``value``.
+
+        Returns ``None`` if property is not availble in current Maya version.
+        """
         if not self.is_available():
             logger.debug(
                 "Property not available in this version of Maya, skipping set: '%s'",
                 self._command,
             )
-            return
+            return None
 
         if issubclass(self._type, bool):
             value_ = {True: "true", False: "false"}[bool(value)]
@@ -96,7 +136,7 @@ class FbxProperty(Generic[T]):
             args += ["-v"]
         args += [value_]
 
-        run_mel_command(" ".join(args))
+        return " ".join(args)
 
 
 class FbxPropertyField(Generic[T]):
@@ -135,7 +175,10 @@ class FbxPropertyField(Generic[T]):
     ) -> FbxPropertyField[T] | T:
         if obj is None:  # pragma: no cover
             return self
-        return obj.__dict__.get(self.name) or self.fbx_property.default
+        if self.name in obj.__dict__:
+            # NOTE: not `or default`, False and 0 are valid values
+            return obj.__dict__[self.name]  # type: ignore[no-any-return]
+        return self.fbx_property.default
 
     def __set__(self, obj: object, value: T) -> None:
         obj.__dict__[self.name] = value
@@ -168,14 +211,32 @@ class FbxOptions:
     def from_scene(cls) -> Self:
         """Initialize a new instance from scene values."""
         self = cls()
-        for descriptor in self.__class__.__dict__.values():
-            if isinstance(descriptor, FbxPropertyField):
-                value = descriptor.fbx_property.get()
-                if value is None:
-                    continue
-                descriptor.__set__(self, value)
+        descriptors = [d for d in cls.__dict__.values() if isinstance(d, FbxPropertyField)]
+        values = get_property_values([d.fbx_property for d in descriptors])
+        for descriptor in descriptors:
+            value = values[descriptor.fbx_property.command]
+            if value is None:
+                continue
+            descriptor.__set__(self, value)
         return self
 
+    def to_dict(self) -> dict[str, object]:
+        """Return a `dict` of field name to value.
+
+        Values are plain `bool`, `int`, `float` and `str`, so the result can be
+        serialized to json or used to compare options.
+        """
+        return {
+            name: descriptor.__get__(self, type(self))
+            for name, descriptor in self.__class__.__dict__.items()
+            if isinstance(descriptor, FbxPropertyField)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> Self:
+        """Initialize a new instance from a `dict` returned by `to_dict`."""
+        return cls(**data)
+
     def __iter__(self) -> Iterator[tuple[FbxProperty, object]]:
         for descriptor in self.__class__.__dict__.values():
             if isinstance(descriptor, FbxPropertyField):
@@ -183,16 +244,185 @@ class FbxOptions:
                 yield (descriptor.fbx_property, value)
 
 
+class FbxOptionsState:
+    """Last known values of FBX plugin properties.
+
+    Properties are queried from the plugin the first time they are needed and only set
+    when the new value differs from the known one. Every property changed through the
+    state is restored to the value it had before by `restore`.
+    """
+
+    def __init__(self) -> None:
+        self._values: dict[str, object] = {}
+        self._original_values: dict[str, tuple[FbxProperty, object]] = {}
+
+    def get(self, prop: FbxProperty) -> object:
+        """Get the value of ``prop``, querying the plugin only if it is not known yet."""
+        if prop.command not in self._values:
+            self._values[prop.command] = prop.get()
+        return self._values[prop.command]
+
+    def prefetch(self, props: Iterable[FbxProperty]) -> None:
+        """Query every property of ``props`` whose value is not known yet at once."""
+        unknown_props = [prop for prop in props if prop.command not in self._values]
+        if unknown_props:
+            self._values.update(get_property_values(unknown_props))
+
+    def set(self, prop: FbxProperty, value: object) -> bool:
+        """Set ``prop`` to ``value`` if it differs from the known value.
+
+        Returns:
+            `True` if the property was set.
+        """
+        return bool(self.set_values([(prop, value)]))
+
+    def set_values(self, props_and_values: Iterable[tuple[FbxProperty, object]]) -> int:
+        """Set every property that differs from its known value with a single mel script.
+
+        Returns:
+            The number of properties that were set.
+        """
+        props_and_values = list(props_and_values)
+        self.prefetch([prop for prop, _ in props_and_values])
+        commands = []
+        for prop, value in props_and_values:
+            current_value = self.get(prop)
+            if current_value is None:
+                # NOTE: not available in this version of Maya
+                continue
+            if _is_same_value(prop, current_value, value):
+                continue
+            self._original_values.setdefault(prop.command, (prop, current_value))
+            self._values[prop.command] = value
+            commands.append(prop.get_set_command(value))  # type: ignore[arg-type]
+        try:
+            run_mel_commands(commands)
+        except Exception:
+            # NOTE: there is no telling which commands ran before the error
+            self.forget()
+            raise
+        return len(commands)
+
+    def apply(self, options: FbxOptions) -> int:
+        """Apply ``options``, only setting the properties that differ.
+
+        Returns:
+            The number of properties that were set.
+        """
+        return self.set_values(options)
+
+    def forget(self) -> None:
+        """Forget the known values, but not the ones to restore.
+
+        Call after the plugin options were changed behind the state's back,
+        like by loading an FBX preset.
+        """
+        self._values.clear()
+
+    def restore(self) -> None:
+        """Set every property changed through this state back to its original value."""
+        original_values = list(self._original_values.values())
+        self.set_values(original_values)
+        self._original_values.clear()
+
+
+def _is_same_value(prop: FbxProperty, current_value: object, value: object) -> bool:
+    if issubclass(prop.type, bool):
+        return bool(current_value) == bool(value)
+    if issubclass(prop.type, float):
+        return abs(float(current_value) - float(value)) < 1e-6  # type: ignore[arg-type]
+    return current_value == value
+
+
+_active_state: FbxOptionsState | None = None
+
+
+@contextmanager
+def options_cache() -> Iterator[FbxOptionsState]:
+    """Share one `FbxOptionsState` between every export and import in this context.
+
+    Options stay applied from one `applied_options` to the next, so exporting many files
+    with the same options only queries and sets them once. They are restored when the
+    context exits. Nested contexts reuse the outer state.
+
+    Example::
+
+        import mayafbx
+
+        options = mayafbx.FbxExportOptions()
+        with mayafbx.options_cache():
+            for path in paths:
+                mayafbx.export_fbx(path, options)
+    """
+    global _active_state  # noqa: PLW0603
+    if _active_state is not None:
+        yield _active_state
+        return
+    _active_state = FbxOptionsState()
+    try:
+        yield _active_state
+    finally:
+        state, _active_state = _active_state, None
+        state.restore()
+
+
+def get_active_options_state() -> FbxOptionsState | None:
+    """Return the `FbxOptionsState` of the active `options_cache`, or `None` outside of one."""
+    return _active_state
+
+
+def get_property_values(props: Iterable[FbxProperty]) -> dict[str, object]:
+    """Query the values of ``props`` from scene.
+
+    ``FBXProperty`` values are all read from a single ``FBXProperties`` command,
+    other commands like ``FBXExportUpAxis`` are queried one by one.
+
+    Returns:
+        A `dict` of property command to value. Values of properties not available
+        in current Maya version are `None`.
+    """
+    props = list(props)
+    values: dict[str, object] = {}
+    path_to_prop = {
+        prop.fbx_property_path: prop
+        for prop in props
+        if prop.fbx_property_path and prop.is_available()
+    }
+    if path_to_prop:
+        try:
+            fbx_properties = collect_fbx_properties()
+        except AssertionError:
+            # NOTE: a value the regex can't parse. Fall back to querying each property.
+            logger.debug("Failed to parse FBXProperties output, querying one by one.")
+            fbx_properties = []
+        for data in fbx_properties:
+            prop = path_to_prop.get(data["path"])
+            if prop is not None:
+                values[prop.command] = prop.parse(data["value"])
+    for prop in props:
+        if prop.command not in values:
+            values[prop.command] = prop.get()
+    return values
+
+
 def apply_options(options: FbxOptions) -> None:
-    """Apply ``options`` to scene."""
-    for prop, value in options:
-        prop.set(value)
+    """Apply ``options`` to scene with a single mel script.
+
+    Inside `options_cache`, only the properties that differ from the known values are set.
+    """
+    if _active_state is not None:
+        _active_state.apply(options)
+        return
+    run_mel_commands([prop.get_set_command(value) for prop, value in options])  # type: ignore[arg-type]
 
 
 @contextmanager
 def applied_options(options: FbxOptions) -> Iterator[None]:
-    """Apply ``options`` to scene during context."""
-    backup = options.from_scene()
-    apply_options(options)
-    yield
-    apply_options(backup)
+    """Apply ``options`` to scene during context.
+
+    Only the properties that differ from the scene values are set and restored.
+    Inside `options_cache` they are restored when the cache exits instead.
+    """
+    with options_cache() as state:
+        state.apply(options)
+        yield
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import os
+import time
 from contextlib import contextmanager
-from typing import Generator, cast
+from typing import Callable, Generator, NamedTuple, Sequence, cast
 
 from maya.api import OpenMaya
 
-from apmaya.mayafbx.bases import FbxOptions, FbxPropertyField, applied_options
+from apmaya.mayafbx.bases import (
+    FbxOptions,
+    FbxPropertyField,
+    apply_options,
+    applied_options,
+    get_active_options_state,
+    options_cache,
+)
 from apmaya.mayafbx.enums import (
     AxisConversionMethod,
     FileFormat,
@@ -29,6 +37,9 @@ __all__ = [
     "export_fbx",
     "restore_export_preset",
     "FbxExportOptions",
+    "FbxExportJob",
+    "FbxExportResult",
+    "FbxExportQueue",
 ]
 
 
@@ -74,6 +85,9 @@ def restore_export_preset() -> None:
     Values are restored by loading the "Autodesk Media & Entertainment" export preset.
     """
     run_mel_command("FBXResetExport")
+    state = get_active_options_state()
+    if state is not None:
+        state.forget()
 
 
 def get_export_takes() -> list[Take]:
@@ -1072,3 +1086,138 @@ class FbxExportOptions(FbxOptions):
     Mel Command:
         ``FBXExportFileVersion``
     """
+
+
+class FbxExportJob(NamedTuple):
+    """FBX export job description."""
+
+    filename: os.PathLike | str
+    """Destination ``.fbx`` file."""
+
+    options: FbxExportOptions
+    """Export options."""
+
+    nodes: Sequence[object] | None = None
+    """Nodes to export, as names or PyNodes. `None` exports the whole scene."""
+
+    takes: list[Take] | None = None
+    """An optional list of animation `Take` to export."""
+
+
+class FbxExportResult(NamedTuple):
+    """Outcome of a `FbxExportJob`."""
+
+    job: FbxExportJob
+    """The job that was run."""
+
+    duration: float
+    """Seconds the export took."""
+
+    error: Exception | None = None
+    """The exception the export raised, or `None` if it succeeded."""
+
+
+class FbxExportQueue:
+    """Collect export jobs and run them back to back.
+
+    Jobs with identical options are exported together, so each set of options is
+    applied to the plugin once and the plugin values are restored once at the end.
+
+    Example::
+
+        import mayafbx
+
+        queue = mayafbx.FbxExportQueue()
+        for mesh in meshes:
+            queue.add(f"C:/export/{mesh}.fbx", options, nodes=[mesh])
+        for result in queue.run():
+            print(result.job.filename, result.duration, result.error)
+    """
+
+    def __init__(self) -> None:
+        self.jobs: list[FbxExportJob] = []
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def add(
+        self,
+        filename: os.PathLike | str,
+        options: FbxExportOptions,
+        *,
+        nodes: Sequence[object] | None = None,
+        takes: list[Take] | None = None,
+    ) -> FbxExportJob:
+        """Add an export job to the queue and return it."""
+        job = FbxExportJob(filename, options, list(nodes) if nodes else None, takes)
+        self.jobs.append(job)
+        return job
+
+    def run(
+        self,
+        *,
+        stop_on_error: bool = False,
+        on_job_start: Callable[[FbxExportJob], None] | None = None,
+        on_job_done: Callable[[FbxExportResult], None] | None = None,
+    ) -> list[FbxExportResult]:
+        """Run every job and empty the queue.
+
+        The selection is restored afterwards.
+
+        Args:
+            stop_on_error: Raise the first export error instead of recording it
+                and carrying on with the next job.
+            on_job_start: Called with each `FbxExportJob` right before it is exported,
+                like to prepare the scene for it. Exceptions it raises stop the queue.
+            on_job_done: Called with the `FbxExportResult` of each job as soon as
+                it is done, like to report progress. Exceptions it raises stop the queue.
+
+        Returns:
+            A `FbxExportResult` per job, in the order the jobs were added.
+        """
+        jobs, self.jobs = self.jobs, []
+        job_index_to_result: dict[int, FbxExportResult] = {}
+        selection = OpenMaya.MGlobal.getActiveSelectionList()
+        try:
+            with options_cache():
+                for job_indexes in self._group_by_options(jobs):
+                    apply_options(jobs[job_indexes[0]].options)
+                    for job_index in job_indexes:
+                        if on_job_start is not None:
+                            on_job_start(jobs[job_index])
+                        result = self._run_job(jobs[job_index], stop_on_error=stop_on_error)
+                        job_index_to_result[job_index] = result
+                        if on_job_done is not None:
+                            on_job_done(result)
+        finally:
+            OpenMaya.MGlobal.setActiveSelectionList(selection)
+        return [job_index_to_result[i] for i in sorted(job_index_to_result)]
+
+    @staticmethod
+    def _group_by_options(jobs: list[FbxExportJob]) -> list[list[int]]:
+        """Group job indexes by identical options, in the order options first appear."""
+        options_key_to_indexes: dict[tuple, list[int]] = {}
+        for index, job in enumerate(jobs):
+            options_key = tuple(sorted(job.options.to_dict().items()))
+            options_key_to_indexes.setdefault(options_key, []).append(index)
+        return list(options_key_to_indexes.values())
+
+    @staticmethod
+    def _run_job(job: FbxExportJob, *, stop_on_error: bool) -> FbxExportResult:
+        start = time.perf_counter()
+        error = None
+        try:
+            if job.nodes:
+                selection = OpenMaya.MSelectionList()
+                for node in job.nodes:
+                    selection.add(str(node))
+                OpenMaya.MGlobal.setActiveSelectionList(selection)
+            export_fbx(job.filename, job.options, selection=bool(job.nodes), takes=job.takes)
+        except Exception as exception:  # noqa: BLE001
+            if stop_on_error:
+                raise
+            logger.exception("Failed to export '%s'", job.filename)
+            error = exception
+        duration = time.perf_counter() - start
+        logger.info("Export of '%s' took %.3fs", job.filename, duration)
+        return FbxExportResult(job, duration, error)
@@ -4,7 +4,13 @@ from __future__ import annotations
 
 import os
 
-from apmaya.mayafbx.bases import FbxOptions, FbxPropertyField, applied_options, run_mel_command
+from apmaya.mayafbx.bases import (
+    FbxOptions,
+    FbxPropertyField,
+    applied_options,
+    get_active_options_state,
+    run_mel_command,
+)
 from apmaya.mayafbx.enums import (
     ConvertUnit,
     ForcedFileAxis,
@@ -60,6 +66,9 @@ def restore_import_preset() -> None:
     Values are restored by loading the "Autodesk Media & Entertainment" import preset.
     """
     run_mel_command("FBXResetImport")
+    state = get_active_options_state()
+    if state is not None:
+        state.forget()
 
 
 class FbxImportOptions(FbxOptions):
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import logging
 import re
-from typing import TYPE_CHECKING, NamedTuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, NamedTuple
 
 from maya import cmds, mel
 from maya.api import OpenMaya, OpenMayaAnim
@@ -44,8 +45,9 @@ class Take(NamedTuple):
     """End frame."""
 
 
+@lru_cache(maxsize=None)
 def get_maya_version() -> int:
-    """Returns maya version."""
+    """Returns maya version. It is only queried once per session."""
     return int(cmds.about(version=True))
 
 
@@ -62,6 +64,19 @@ def run_mel_command(command: str) -> str | list[str] | int:
         raise MelEvalError(command) from exception
 
 
+def run_mel_commands(commands: Iterable[str | None]) -> None:
+    """Run mel commands as a single script with one ``mel.eval`` call.
+
+    ``None`` commands are skipped.
+
+    Raise:
+        MelEvalError: Failed to run mel script.
+    """
+    commands = [command for command in commands if command]
+    if commands:
+        run_mel_command(";\n".join(commands) + ";")
+
+
 def get_anim_control_start_time() -> int:
     """Return Animation Control start time."""
     return int(OpenMayaAnim.MAnimControl.animationStartTime().value)
@@ -88,8 +103,10 @@ def collect_fbx_properties() -> list[FbxPropDict]:
 
     lines: list[str] = []
     id_ = OpenMaya.MCommandMessage.addCommandOutputFilterCallback(callback, lines)
-    mel.eval("FBXProperties")
-    OpenMaya.MCommandMessage.removeCallback(id_)
+    try:
+        mel.eval("FBXProperties")
+    finally:
+        OpenMaya.MCommandMessage.removeCallback(id_)
 
     regex = re.compile(
         r"PATH:\s(\S+)\s+"
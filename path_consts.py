@@ -4,5 +4,6 @@ import os
 FLOTTITOOLS_DIR = os.path.dirname(__file__)
 UI_DIR = os.path.join(FLOTTITOOLS_DIR, 'ui')
 ICONS_DIR = os.path.join(UI_DIR, 'icons')
+PLUGINS_DIR = os.path.join(FLOTTITOOLS_DIR, 'plugins')
 
 CONTENTSOURCE_FOLDER_NAME = 'ContentSource'
@@ -0,0 +1,18 @@
+"""Registers the flottiSetSkinWeights command. See flottitools.utils.skinweightscmd."""
+import maya.api.OpenMaya as om
+
+import flottitools.utils.skinweightscmd as skinweightscmd
+
+
+def maya_useNewAPI():
+    pass
+
+
+def initializePlugin(plugin):
+    fn_plugin = om.MFnPlugin(plugin, 'flottitools')
+    fn_plugin.registerCommand(skinweightscmd.COMMAND_NAME, skinweightscmd.SetSkinWeightsCommand.creator)
+
+
+def uninitializePlugin(plugin):
+    fn_plugin = om.MFnPlugin(plugin)
+    fn_plugin.deregisterCommand(skinweightscmd.COMMAND_NAME)
@@ -1,8 +1,10 @@
+import numpy as np
 import pymel.core as pm
 
-import apmaya.utils.selectionutils as selectionutils
-import apmaya.utils.transformutils as xformutils
-import apmaya.utils.skinutils as skinutils
+import flottitools.utils.meshutils as meshutils
+import flottitools.utils.selectionutils as selectionutils
+import flottitools.utils.skinutils as skinutils
+import flottitools.utils.spatialutils as spatialutils
 
 
 class AverageWeights(object):
@@ -23,25 +25,120 @@ class AverageWeights(object):
 
         target_verts = selectionutils.convert_selection_to_verts()
         target_skincl = skinutils.get_skincluster(target_verts[0])
+        target_vert_indexes = skinutils.get_vert_indexes(target_verts)
         with pm.UndoChunk():
             with skinutils.max_influences_normalize_weights_disabled(target_skincl):
-                pm.skinPercent(target_skincl, target_verts, transformValue=pruned_inf_to_weight.items())
-            # Normalize weights after modifying them just our changes didn't equal exactly 1.0.
-            pm.skinPercent(target_skincl, target_verts, normalize=True)
+                set_influence_weights(target_skincl, target_vert_indexes, pruned_inf_to_weight)
 
     def apply_proximity_weights(self):
         if not self.sampled_verts:
             return
-        verts_infs_and_wts = get_verts_infs_and_wts(self.sampled_verts)
+        sample_points, sample_influences, sample_weights = get_orig_points_influences_and_weights(self.sampled_verts)
         target_verts = selectionutils.convert_selection_to_verts()
-        target_skincl = skinutils.get_skincluster(target_verts[0])
         with pm.UndoChunk():
-            with skinutils.max_influences_normalize_weights_disabled(target_skincl):
-                for target_vert in target_verts:
-                    infs_to_weights = get_scaled_influence_to_weight_totals(verts_infs_and_wts, target_vert)
-                    pruned_infs_to_weights = get_pruned_influences_to_weights(infs_to_weights)
-                    pm.skinPercent(target_skincl, target_vert, transformValue=pruned_infs_to_weights.items())
-            pm.skinPercent(target_skincl, target_verts, normalize=True)
+            for target_mesh, target_vert_indexes in get_mesh_to_vert_indexes(target_verts).items():
+                apply_proximity_weights_to_mesh(target_mesh, target_vert_indexes,
+                                                sample_points, sample_influences, sample_weights)
+
+
+def set_influence_weights(skin_cluster, vert_indexes, inf_to_weight):
+    """
+    Sets the weight of only the influences in inf_to_weight on every vertex, like skinPercent -transformValue.
+    The other influences keep their weights and each vertex is normalized afterwards, in case our changes
+    didn't equal exactly 1.0. Influences that are not in skin_cluster are ignored.
+
+    :param inf_to_weight: {influence: weight} influences can be PyNodes or names.
+    """
+    skin_weights = skinutils.SkinWeights.from_skin_cluster(skin_cluster, vert_indexes)
+    for inf, weight in inf_to_weight.items():
+        column = skin_weights.influence_to_column.get(pm.PyNode(inf))
+        if column is not None:
+            skin_weights.weights[:, column] = weight
+    skin_weights.apply(normalize=True)
+
+
+def apply_proximity_weights_to_mesh(target_mesh, target_vert_indexes, sample_points, sample_influences,
+                                    sample_weights, max_influences=4):
+    """
+    Sets the weights of the sample influences on each target vertex to the sample weights scaled by their
+    inverse distance to it, pruned to max_influences. Like set_influence_weights() the other influences keep
+    their weights and each vertex is normalized afterwards. Positions come from the original
+    (pre-deformation) shapes. Sample influences that are not in the target skinCluster are ignored.
+
+    :param sample_points: original world space positions of the sample vertices shaped (sample_count, 3)
+    :param sample_influences: PyNode influence of each column of sample_weights
+    :param sample_weights: array shaped (sample_count, len(sample_influences))
+    """
+    if not len(target_vert_indexes):
+        # from_skin_cluster would read every vertex
+        return
+    target_skincl = skinutils.get_skincluster(target_mesh)
+    skin_weights = skinutils.SkinWeights.from_skin_cluster(target_skincl, target_vert_indexes)
+    target_points = get_orig_points(target_mesh, target_skincl)[skin_weights.vert_indexes]
+    sample_columns = []
+    target_columns = []
+    for sample_column, inf in enumerate(sample_influences):
+        target_column = skin_weights.influence_to_column.get(inf)
+        if target_column is not None:
+            sample_columns.append(sample_column)
+            target_columns.append(target_column)
+    mapped_sample_weights = np.zeros((len(sample_weights), len(skin_weights.influences)), dtype=np.float64)
+    mapped_sample_weights[:, target_columns] = sample_weights[:, sample_columns]
+
+    scalers = spatialutils.get_inverse_distance_scalers(target_points, sample_points)
+    weights = scalers.dot(mapped_sample_weights)
+    skinutils.prune_weights(weights, max_influences=max_influences,
+                            tie_break_ranks=skin_weights.get_tie_break_ranks(), normalize=False)
+    skin_weights.weights[:, target_columns] = weights[:, target_columns]
+    with skinutils.max_influences_normalize_weights_disabled(target_skincl):
+        # normalize just in case our changes didn't equal exactly 1.0.
+        skin_weights.apply(normalize=True)
+
+
+def get_orig_points_influences_and_weights(verts):
+    """
+    Reads the original world space position and the weights of every vertex with one bulk read per mesh.
+
+    :param verts: flat list of PyNode MeshVertex. They can belong to different skinned meshes.
+    :returns: (points, influences, weights) points shaped (len(verts), 3), the union of every mesh's influences
+              and weights shaped (len(verts), len(influences)). Rows follow the order of verts.
+    """
+    mesh_to_rows = {}
+    for row, vert in enumerate(verts):
+        mesh_to_rows.setdefault(vert.node(), []).append(row)
+    points = np.zeros((len(verts), 3), dtype=np.float64)
+    influences = []
+    influence_columns = {}
+    mesh_rows_and_weights = []
+    for mesh, rows in mesh_to_rows.items():
+        vert_indexes = [verts[row].index() for row in rows]
+        skincl = skinutils.get_skincluster(mesh)
+        points[rows] = get_orig_points(mesh, skincl)[vert_indexes]
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(skincl, vert_indexes)
+        columns = []
+        for inf in skin_weights.influences:
+            if inf not in influence_columns:
+                influence_columns[inf] = len(influences)
+                influences.append(inf)
+            columns.append(influence_columns[inf])
+        mesh_weights = skin_weights.weights[skin_weights.rows_from_vert_indexes(vert_indexes)]
+        mesh_rows_and_weights.append((rows, columns, mesh_weights))
+
+    weights = np.zeros((len(verts), len(influences)), dtype=np.float64)
+    for rows, columns, mesh_weights in mesh_rows_and_weights:
+        weights[np.ix_(rows, columns)] = mesh_weights
+    return points, influences, weights
+
+
+def get_mesh_to_vert_indexes(verts):
+    """
+    :param verts: flat list of PyNode MeshVertex
+    :returns: {mesh shape: list of vertex indexes}
+    """
+    mesh_to_vert_indexes = {}
+    for vert in verts:
+        mesh_to_vert_indexes.setdefault(vert.node(), []).append(vert.index())
+    return mesh_to_vert_indexes
 
 
 def get_shape_to_skincl_and_vert_to_infs_wts(verts):
@@ -71,20 +168,6 @@ def get_influence_to_weight_totals(vert_to_infs_wts):
     return influence_to_weight_totals
 
 
-def get_scaled_influence_to_weight_totals(verts_infs_and_wts, target_vert):
-    target_pos = get_orig_vert_position(target_vert)
-    verts, infs, weights, sample_positions = zip(*[(vert, infs, wts, get_orig_vert_position(vert))
-                                                   for vert, infs, wts in verts_infs_and_wts])
-    scalers = xformutils.get_distance_scalers(target_pos, sample_positions)
-    infs_to_weights = {}
-    for vert, infs, wts, scaler in zip(verts, infs, weights, scalers):
-        for inf, wt in zip(infs, wts):
-            scaled_weight = wt * scaler
-            current_weight = infs_to_weights.get(inf, 0.0)
-            infs_to_weights[inf] = current_weight + scaled_weight
-    return infs_to_weights
-
-
 def get_pruned_influences_to_weights(inf_to_wt_totals, divisor=1.0):
     to_sort = list(inf_to_wt_totals.values())
     to_sort.sort(reverse=True)
@@ -103,37 +186,25 @@ def get_pruned_influences_to_weights(inf_to_wt_totals, divisor=1.0):
     return pruned_inf_to_weight
 
 
-def get_orig_vert_position(vertex):
-    orig_vert = get_orig_vert_from_vert(vertex)
-    return xformutils.get_worldspace_vector(orig_vert)
+def get_orig_points(mesh, skin_cl=None):
+    """Returns the world space points of the mesh's original shape, before the skinCluster deforms it."""
+    return meshutils.get_points_array(get_orig_shape(mesh, skin_cl))
 
 
-def get_orig_vert_from_vert(vertex):
-    skin_cl = skinutils.get_skincluster(vertex)
+def get_orig_shape(mesh, skin_cl=None):
+    skin_cl = skin_cl or skinutils.get_skincluster(mesh)
     try:
-        orig_shape_node = skin_cl.originalGeometry.inputs(shapes=True)[0]
+        return skin_cl.originalGeometry.inputs(shapes=True)[0]
     except IndexError:
-        shape_node = vertex.node()
-        shapes = vertex.listHistory(type='shape', future=False)
+        try:
+            shape_node = mesh.getShape()
+        except AttributeError:
+            shape_node = mesh
+        shapes = shape_node.listHistory(type='shape', future=False)
         shapes.remove(shape_node)
-        orig_shape_node = shapes[0]
-    orig_vert = orig_shape_node.vtx[vertex.index()]
-    return orig_vert
+        return shapes[0]
 
 
-def get_verts_infs_and_wts(verts):
-    shape_nodes = pm.ls(verts, objectsOnly=True)
-    shapes_no_dups = set(shape_nodes)
-    shape_to_skincl = {}
-    for shape in shapes_no_dups:
-        skincl = skinutils.get_skincluster(shape)
-        shape_to_skincl[shape] = skincl
-
-    vert_infs_and_wts = []
-    for vert in verts:
-        skincl = skinutils.get_skincluster(vert)
-        influences = pm.skinPercent(skincl, vert, query=True, transform=None)
-        weights = pm.skinPercent(skincl, vert, query=True, value=True)
-        vert_infs_and_wts.append((vert, influences, weights))
-
-    return vert_infs_and_wts
\ No newline at end of file
+def get_orig_vert_from_vert(vertex):
+    orig_shape_node = get_orig_shape(vertex.node())
+    return orig_shape_node.vtx[vertex.index()]
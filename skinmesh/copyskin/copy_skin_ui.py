@@ -10,6 +10,7 @@ QtWidgets = flottiui.QtWidgets
 QtGui = flottiui.QtGui
 
 COPYSKIN_UI = None
+COPY_MAX_WORKERS = os.cpu_count()
 
 
 def copy_skin_launch():
@@ -81,26 +82,17 @@ class CopySkinWeightsMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
         copy_method()
 
     def _copy_vert_order(self):
-        mapping_methods = self._get_inf_mapping_methods()
-        target_meshes = self.target_meshes
-        if self.use_selection:
-            target_meshes = skinutils.get_skinned_meshes_from_selection()
-        for target_mesh in target_meshes:
-            if target_mesh == self.source_mesh:
-                pm.warning('Skipping target mesh {}. Target mesh must be a different mesh than the source mesh.'.format(
-                    target_mesh.shortName()))
-                continue
-            skinutils.copy_weights_vert_order(self.source_mesh, target_mesh, mapping_methods=mapping_methods)
+        self._copy_with_transfer(skinutils.SURFACE_ASSOCIATION_VERT_ORDER)
 
     def _copy_worldspace(self):
-        self._copy_with_surface_association('closestPoint')
+        self._copy_with_transfer(skinutils.SURFACE_ASSOCIATION_CLOSEST_POINT)
 
     def _copy_raycast(self):
         # copySkinWeights - noMirror - surfaceAssociation rayCast - influenceAssociation label - influenceAssociation name - influenceAssociation closestJoint - normalize;
         self._copy_with_surface_association('rayCast')
 
     def _copy_closest_component(self):
-        self._copy_with_surface_association('closestComponent')
+        self._copy_with_transfer(skinutils.SURFACE_ASSOCIATION_CLOSEST_VERTEX)
 
     def _copy_uv_space(self):
         # copySkinWeights -noMirror -surfaceAssociation closestPoint -uvSpace UVChannel_1 map1 -influenceAssociation label -influenceAssociation name -influenceAssociation closestJoint -normalize;
@@ -146,6 +138,43 @@ class CopySkinWeightsMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
             print('Copied weights from {0} to {1} via {2}'.format(
                 self.source_mesh.nodeName(), target_mesh.nodeName(), surface_association))
 
+    def _copy_with_transfer(self, surface_association):
+        # the source mesh is read and indexed once for every target
+        transfer = skinutils.SkinWeightTransfer(self.source_mesh)
+        mapping_methods = self._get_inf_mapping_methods()
+        target_meshes = self.target_meshes
+        if self.use_selection:
+            sel = pm.selected()
+            try:
+                if isinstance(sel[0], pm.MeshVertex):
+                    target_mesh_to_vertices = {}
+                    for vertices in [x for x in sel if isinstance(x, pm.MeshVertex)]:
+                        target_mesh_to_vertices.setdefault(vertices.node(), []).append(vertices)
+                    with pm.UndoChunk():
+                        for target_mesh, vertices in target_mesh_to_vertices.items():
+                            transfer.copy_to(target_mesh, surface_association, mapping_methods=mapping_methods,
+                                             vertices=vertices)
+                    print('Copied weights from {0} to {1} via {2}'.format(
+                        self.source_mesh.nodeName(), sel, surface_association))
+                    return
+                target_meshes = skinutils.get_skinned_meshes_from_selection()
+            except IndexError:
+                pm.warning('Nothing selected. Select a skinned mesh or skinned vertices to copy weights with "Use Selection" enabled.')
+                return
+        valid_target_meshes = []
+        for target_mesh in target_meshes:
+            if target_mesh == self.source_mesh:
+                pm.warning('Skipping target mesh {}. Target mesh must be a different mesh than the source mesh.'.format(
+                    target_mesh.shortName()))
+                continue
+            valid_target_meshes.append(target_mesh)
+        with pm.UndoChunk():
+            transfer.copy_to_meshes(valid_target_meshes, surface_association, mapping_methods=mapping_methods,
+                                    max_workers=COPY_MAX_WORKERS)
+        for target_mesh in valid_target_meshes:
+            print('Copied weights from {0} to {1} via {2}'.format(
+                self.source_mesh.nodeName(), target_mesh.nodeName(), surface_association))
+
     def _source_line_edit(self):
         text = self.ui.source_mesh_lineEdit.text()
         skinned_meshes = skinutils.get_skinned_meshes_from_scene()
@@ -0,0 +1,185 @@
+"""
+Binary skin weights files.
+
+A .skw file holds, for every skinned mesh: its world space points, triangles and topology hash,
+its influence names, joint labels and bind matrices, and its weights as a sparse CSR matrix.
+Reading only parses the JSON header and memory maps the arrays, so this module does not need Maya.
+
+File layout:
+    8 bytes     magic b'FLOTSKW\\0'
+    4 bytes     uint32 format version
+    8 bytes     uint64 header length
+    header      utf-8 JSON. Array offsets, dtypes and shapes for each mesh are stored here.
+    arrays      raw little-endian arrays, each aligned to 64 bytes.
+"""
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+
+SKIN_FILE_EXTENSION = '.skw'
+MAGIC = b'FLOTSKW\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sIQ')
+
+ARRAY_DTYPES = {'points': '<f8',
+                'triangles': '<i4',
+                'bind_matrices': '<f8',
+                'weights_indptr': '<i8',
+                'weights_indices': '<i4',
+                'weights_data': '<f4'}
+
+
+class SkinnedMeshData(object):
+    """The skinning of one mesh. Arrays read from a file are read-only memory maps."""
+    def __init__(self, mesh_name, mesh_long_name, topology_hash, influence_names, influence_labels,
+                 points, triangles, bind_matrices, weights_indptr, weights_indices, weights_data):
+        """
+        :param mesh_name: mesh name without namespace.
+        :param mesh_long_name: mesh long name without namespace.
+        :param influence_labels: (side, type, other_type) joint label of each influence.
+        :param points: world space points shaped (vertex_count, 3)
+        :param triangles: vertex indexes shaped (triangle_count, 3)
+        :param bind_matrices: world space bind matrix of each influence shaped (influence_count, 4, 4)
+        :param weights_indptr, weights_indices, weights_data: CSR weights shaped (vertex_count, influence_count)
+        """
+        self.mesh_name = mesh_name
+        self.mesh_long_name = mesh_long_name
+        self.topology_hash = topology_hash
+        self.influence_names = list(influence_names)
+        self.influence_labels = [tuple(label) for label in influence_labels]
+        self.points = points
+        self.triangles = triangles
+        self.bind_matrices = bind_matrices
+        self.weights_indptr = weights_indptr
+        self.weights_indices = weights_indices
+        self.weights_data = weights_data
+
+    @classmethod
+    def from_dense_weights(cls, mesh_name, mesh_long_name, topology_hash, influence_names, influence_labels,
+                           points, triangles, bind_matrices, weights):
+        rows, columns = np.nonzero(weights)
+        weights_indptr = np.zeros(len(weights) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(weights)), out=weights_indptr[1:])
+        return cls(mesh_name, mesh_long_name, topology_hash, influence_names, influence_labels, points, triangles,
+                   bind_matrices, weights_indptr, columns, weights[rows, columns])
+
+    @property
+    def vertex_count(self):
+        return len(self.points)
+
+    @property
+    def influence_positions(self):
+        """World space bind position of each influence."""
+        return np.asarray(self.bind_matrices)[:, 3, :3]
+
+    # nodeName() and name() mimic PyNode so mesh data can be paired with meshutils.get_mesh_pairs_by_name_with_fallback()
+    def nodeName(self, stripNamespace=True):
+        return self.mesh_name
+
+    def name(self, stripNamespace=True):
+        return self.mesh_long_name
+
+    def get_mapped_weights(self, rows, influence_columns_map, influence_count, row_scalers=None):
+        """
+        Returns a dense (len(rows) x influence_count) array of the weights of rows with every influence moved
+        to the columns in influence_columns_map.
+
+        :param rows: source vertex index of each output row.
+        :param influence_columns_map: list of target columns for each source influence.
+        :param row_scalers: weight multiplier for each output row.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        weights = np.zeros((len(rows), influence_count), dtype=np.float64)
+        starts = self.weights_indptr[rows]
+        counts = self.weights_indptr[rows + 1] - starts
+        output_rows = np.repeat(np.arange(len(rows)), counts)
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        source_columns = np.asarray(self.weights_indices[positions], dtype=np.int64)
+        values = np.asarray(self.weights_data[positions], dtype=np.float64)
+        if row_scalers is not None:
+            values *= np.asarray(row_scalers)[output_rows]
+        # a source influence can map to more than one target influence so map one layer at a time
+        layer_count = max([len(target_columns) for target_columns in influence_columns_map] or [0])
+        for layer in range(layer_count):
+            target_columns = np.array([cols[layer] if layer < len(cols) else -1 for cols in influence_columns_map],
+                                      dtype=np.int64)
+            mapped_columns = target_columns[source_columns]
+            is_mapped = mapped_columns >= 0
+            np.add.at(weights, (output_rows[is_mapped], mapped_columns[is_mapped]), values[is_mapped])
+        return weights
+
+
+def is_skin_file_path(path):
+    return Path(path).suffix.lower() == SKIN_FILE_EXTENSION
+
+
+def write_skin_file(path, skinned_mesh_datas):
+    mesh_headers = []
+    arrays = []
+    offset = 0
+    for skin_data in skinned_mesh_datas:
+        array_headers = {}
+        for array_name, dtype in ARRAY_DTYPES.items():
+            array = np.ascontiguousarray(getattr(skin_data, array_name), dtype=dtype)
+            offset = _align(offset)
+            array_headers[array_name] = {'offset': offset, 'dtype': dtype, 'shape': list(array.shape)}
+            arrays.append((offset, array))
+            offset += array.nbytes
+        mesh_headers.append({'mesh_name': skin_data.mesh_name,
+                             'mesh_long_name': skin_data.mesh_long_name,
+                             'topology_hash': skin_data.topology_hash,
+                             'influence_names': skin_data.influence_names,
+                             'influence_labels': [list(label) for label in skin_data.influence_labels],
+                             'arrays': array_headers})
+    header = json.dumps({'meshes': mesh_headers}).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_skin_file(path):
+    """Returns a SkinnedMeshData for every mesh in the file. Its arrays are memory mapped, not read into memory."""
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        try:
+            magic, version, header_length = _PREAMBLE.unpack(preamble)
+        except struct.error:
+            raise InvalidSkinFile(path)
+        if magic != MAGIC or version > FORMAT_VERSION:
+            raise InvalidSkinFile(path)
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    data_start = _align(_PREAMBLE.size + header_length)
+
+    skinned_mesh_datas = []
+    for mesh_header in header['meshes']:
+        arrays = {}
+        for array_name, array_header in mesh_header['arrays'].items():
+            shape = tuple(array_header['shape'])
+            if not np.prod(shape):
+                # zero length arrays cannot be memory mapped
+                arrays[array_name] = np.zeros(shape, dtype=array_header['dtype'])
+                continue
+            arrays[array_name] = np.memmap(path, dtype=array_header['dtype'], mode='r',
+                                           offset=data_start + array_header['offset'], shape=shape)
+        skinned_mesh_datas.append(SkinnedMeshData(mesh_header['mesh_name'], mesh_header['mesh_long_name'],
+                                                  mesh_header['topology_hash'], mesh_header['influence_names'],
+                                                  mesh_header['influence_labels'], **arrays))
+    return skinned_mesh_datas
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class InvalidSkinFile(ValueError):
+    def __init__(self, skin_file_path):
+        super(InvalidSkinFile, self).__init__('{} is not a valid skin weights file.'.format(skin_file_path))
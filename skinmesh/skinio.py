@@ -1,15 +1,18 @@
 import os
 from pathlib import Path
 
+import numpy as np
 import pymel.core as pm
 
+import flottitools.skinmesh.skinfile as skinfile
 import flottitools.utils.ioutils as ioutils
 import flottitools.utils.meshutils as meshutils
 import flottitools.utils.namespaceutils as nsutils
 import flottitools.utils.pathutils as pathutils
 import flottitools.utils.selectionutils as selutils
+import flottitools.utils.skeletonutils as skelutils
 import flottitools.utils.skinutils as skinutils
-import flottitools.utils.transformutils as transformutils
+import flottitools.utils.spatialutils as spatialutils
 
 
 NAMESPACE_SKINCOPY_EXPORT = 'FlottiCopySkinWeightsExport'
@@ -23,15 +26,26 @@ def export_skinned_mesh(skinned_mesh, output_path, go_to_bind_pose=True):
 
 
 def export_skinned_meshes(skinned_meshes, output_path, go_to_bind_pose=True):
+    """Paths ending in .skw are written in the binary skin file format. Anything else is exported as mayaAscii."""
+    if skinfile.is_skin_file_path(output_path):
+        export_skinned_meshes_to_skin_file(skinned_meshes, output_path, go_to_bind_pose=go_to_bind_pose)
+    else:
+        export_skinned_meshes_to_maya_file(skinned_meshes, output_path, go_to_bind_pose=go_to_bind_pose)
+
+
+def export_skinned_meshes_to_skin_file(skinned_meshes, output_path, go_to_bind_pose=True):
+    with pm.UndoChunk():
+        went_to_bind_pose = go_to_bind_pose and _go_to_bind_poses(skinned_meshes)
+        skinned_mesh_datas = [get_skinned_mesh_data(skinned_mesh) for skinned_mesh in skinned_meshes]
+    if went_to_bind_pose:
+        pm.undo()
+    skinfile.write_skin_file(output_path, skinned_mesh_datas)
+
+
+def export_skinned_meshes_to_maya_file(skinned_meshes, output_path, go_to_bind_pose=True):
     with pm.UndoChunk():
         if go_to_bind_pose:
-            try:
-                bind_poses = [skinutils.get_bind_pose_from_skinned_mesh(skm) for skm in skinned_meshes]
-                # remove duplicate bind poses
-                bind_poses = set(bind_poses)
-                [pm.dagPose(bp, restore=True, g=True) for bp in bind_poses]
-            except:
-                pass
+            _go_to_bind_poses(skinned_meshes)
         with selutils.preserve_selection():
             to_select = []
             dup_meshes_roots_and_clusters = skinutils.duplicate_skinned_meshes_and_skeleton(
@@ -46,6 +60,32 @@ def export_skinned_meshes(skinned_meshes, output_path, go_to_bind_pose=True):
     pm.undo()
 
 
+def _go_to_bind_poses(skinned_meshes):
+    """Returns True if any bind pose was restored."""
+    try:
+        bind_poses = [skinutils.get_bind_pose_from_skinned_mesh(skm) for skm in skinned_meshes]
+        # remove duplicate bind poses
+        bind_poses = set([bp for bp in bind_poses if bp])
+        [pm.dagPose(bp, restore=True, g=True) for bp in bind_poses]
+        return bool(bind_poses)
+    except:
+        return False
+
+
+def get_skinned_mesh_data(skinned_mesh, skin_cluster=None):
+    skin_cluster = skin_cluster or skinutils.get_skincluster(skinned_mesh)
+    skin_weights = skinutils.SkinWeights.from_skin_cluster(skin_cluster)
+    metadata = skelutils.InfluenceMetadata()
+    influence_names = [metadata.get_name(inf) for inf in skin_weights.influences]
+    influence_labels = [metadata.get_label(inf) for inf in skin_weights.influences]
+    bind_matrices = skinutils.get_bind_matrices(skin_cluster, skin_weights.influence_indexes)
+    return skinfile.SkinnedMeshData.from_dense_weights(
+        skinned_mesh.nodeName(stripNamespace=True), skinned_mesh.name(stripNamespace=True),
+        meshutils.get_topology_hash(skinned_mesh), influence_names, influence_labels,
+        meshutils.get_points_array(skinned_mesh), meshutils.get_triangles_array(skinned_mesh),
+        bind_matrices, skin_weights.weights)
+
+
 def import_skinning(target_mesh, skinweights_path, copy_weights_method=None, go_to_bindpose=True, bind_unskinned=True, get_mesh_pairs_method=None):
     if copy_weights_method == SKINNING_METHOD_BEST_GUESS:
         copy_weights_method = None
@@ -61,9 +101,13 @@ def import_skinning_on_meshes_in_scene(skinweights_path, copy_weights_method=Non
 
 def import_skinning_on_meshes(target_meshes, skinweights_path, copy_weights_method=None,
                               go_to_bindpose=True, bind_unskinned=True, get_mesh_pairs_method=None):
-    def default_get_mesh_pairs(source_sk_meshes, target_sk_meshes):
-        return meshutils.get_mesh_pairs_by_name_with_fallback(source_sk_meshes, target_sk_meshes, fallback_mesh_name=skinutils.FALLBACK_MESH_NAME)
-    get_mesh_pairs_method = get_mesh_pairs_method or default_get_mesh_pairs
+    """.skw skin files are read directly. Any other path is imported as a Maya file."""
+    if skinfile.is_skin_file_path(skinweights_path):
+        import_skin_file_on_meshes(target_meshes, skinweights_path, copy_weights_method=copy_weights_method,
+                                   go_to_bindpose=go_to_bindpose, bind_unskinned=bind_unskinned,
+                                   get_mesh_pairs_method=get_mesh_pairs_method)
+        return
+    get_mesh_pairs_method = get_mesh_pairs_method or _default_get_mesh_pairs
     scene_joints = None
     if bind_unskinned:
         scene_joints = pm.ls(type=pm.nt.Joint)
@@ -75,12 +119,7 @@ def import_skinning_on_meshes(target_meshes, skinweights_path, copy_weights_meth
         source_target_mesh_pairs = get_mesh_pairs_method(source_skinned_meshes, target_meshes)
 
         if go_to_bindpose:
-            try:
-                bind_poses = [skinutils.get_bind_pose_from_skinned_mesh(skm) for skm in target_meshes]
-                bind_poses = set(bind_poses)
-                [pm.dagPose(bp, restore=True, g=True) for bp in bind_poses]
-            except:
-                pass
+            _go_to_bind_poses(target_meshes)
 
         for source_skinned_mesh, target_mesh in source_target_mesh_pairs:
             if bind_unskinned:
@@ -98,6 +137,126 @@ def import_skinning_on_meshes(target_meshes, skinweights_path, copy_weights_meth
         pm.mel.eval('doEnableNodeItems true all;')
 
 
+def _default_get_mesh_pairs(source_sk_meshes, target_sk_meshes):
+    return meshutils.get_mesh_pairs_by_name_with_fallback(source_sk_meshes, target_sk_meshes,
+                                                          fallback_mesh_name=skinutils.FALLBACK_MESH_NAME)
+
+
+def import_skin_file_on_meshes(target_meshes, skinweights_path, copy_weights_method=None,
+                               go_to_bindpose=True, bind_unskinned=True, get_mesh_pairs_method=None):
+    """
+    Applies the skinning in a .skw skin file without importing anything into the scene.
+
+    :param copy_weights_method: skinutils.copy_weights_vert_order copies by vertex order. Any other method copies
+                                from the closest point. If None vertex order is used when the topology matches.
+    """
+    get_mesh_pairs_method = get_mesh_pairs_method or _default_get_mesh_pairs
+    skinned_mesh_datas = skinfile.read_skin_file(skinweights_path)
+    if not skinned_mesh_datas:
+        raise MissingSkinnedMesh(skinweights_path)
+    source_target_mesh_pairs = get_mesh_pairs_method(skinned_mesh_datas, target_meshes)
+    scene_joints = None
+    if bind_unskinned:
+        scene_joints = pm.ls(type=pm.nt.Joint)
+    if go_to_bindpose:
+        _go_to_bind_poses(target_meshes)
+
+    for skin_data, target_mesh in source_target_mesh_pairs:
+        target_skincluster = skinutils.get_skincluster(target_mesh)
+        if not target_skincluster:
+            if not bind_unskinned:
+                continue
+            target_skincluster = bind_mesh_to_skinned_mesh_data_joints(skin_data, target_mesh, scene_joints)
+        vert_order = _use_vert_order(skin_data, target_mesh, copy_weights_method)
+        print('Copying skinning {0} from mesh: {1} to mesh: {2}'.format(
+            'by vertex order' if vert_order else 'by closest point', skin_data.mesh_name, target_mesh.nodeName()))
+        apply_skinned_mesh_data(skin_data, target_mesh, vert_order=vert_order, target_skincluster=target_skincluster)
+
+
+def _use_vert_order(skin_data, target_mesh, copy_weights_method=None):
+    if copy_weights_method is skinutils.copy_weights_vert_order:
+        return True
+    if copy_weights_method not in (None, SKINNING_METHOD_BEST_GUESS):
+        return False
+    return skin_data.topology_hash == meshutils.get_topology_hash(target_mesh)
+
+
+def bind_mesh_to_skinned_mesh_data_joints(skin_data, target_mesh, scene_joints=None):
+    scene_joints = scene_joints or pm.ls(type=pm.nt.Joint)
+    joints_by_name = dict([(j.nodeName(stripNamespace=True), j) for j in reversed(scene_joints)])
+    joints = [joints_by_name[name] for name in skin_data.influence_names if name in joints_by_name]
+    return skinutils.bind_mesh_to_joints(target_mesh, joints)
+
+
+def apply_skinned_mesh_data(skin_data, target_mesh, vert_order=True, target_skincluster=None):
+    target_skincluster = target_skincluster or skinutils.get_skincluster(target_mesh)
+    target_influences = target_skincluster.influenceObjects()
+    influence_columns_map = get_influence_columns_map(skin_data, target_influences)
+    if vert_order:
+        source_rows = np.arange(min(skin_data.vertex_count, len(target_mesh.vtx)))
+        weights = skin_data.get_mapped_weights(source_rows, influence_columns_map, len(target_influences))
+    else:
+        # interpolate the weights of the closest point on the source surface
+        grid = spatialutils.TriangleGrid(skin_data.points, skin_data.triangles)
+        closest_triangles, barycentrics = grid.closest_triangles(meshutils.get_points_array(target_mesh))
+        corners = np.asarray(skin_data.triangles)[closest_triangles]
+        weights = sum([skin_data.get_mapped_weights(corners[:, i], influence_columns_map, len(target_influences),
+                                                    row_scalers=barycentrics[:, i]) for i in range(3)])
+    if target_skincluster.maintainMaxInfluences.get():
+        skinutils.prune_weights(weights, max_influences=target_skincluster.maxInfluences.get())
+    with skinutils.max_influences_normalize_weights_disabled(target_skincluster):
+        skinutils.set_weights_array(target_skincluster, np.arange(len(weights)), weights)
+
+
+def get_influence_columns_map(skin_data, target_influences, tolerance=0.001, influence_metadata=None):
+    """
+    Maps each influence in skin_data to target influence columns by label, then name, then worldspace position
+    like skinutils.copy_weights_vert_order. Any source influences left over use the closest target influence.
+
+    :returns: list of target influence columns for each source influence.
+    """
+    metadata = influence_metadata or skelutils.InfluenceMetadata()
+    target_labels = [metadata.get_label(inf) for inf in target_influences]
+    target_names = [metadata.get_name(inf) for inf in target_influences]
+    target_positions = metadata.get_positions(target_influences)
+    source_positions = np.asarray(skin_data.influence_positions)
+    influence_columns_map = [[] for _ in skin_data.influence_names]
+    unmapped_sources = list(range(len(skin_data.influence_names)))
+    unmapped_targets = list(range(len(target_influences)))
+
+    def label_key(label):
+        # unlabeled influences never match
+        return None if label[1] == skelutils.LABEL_INT_NONE else tuple(label)
+
+    mapping_methods = [
+        lambda sources, targets: skelutils.get_matching_key_indexes(
+            [label_key(skin_data.influence_labels[i]) for i in sources], [label_key(target_labels[i]) for i in targets]),
+        lambda sources, targets: skelutils.get_matching_key_indexes(
+            [skin_data.influence_names[i] for i in sources], [target_names[i] for i in targets]),
+        lambda sources, targets: skelutils.get_matching_position_indexes(
+            source_positions[sources], target_positions[targets], tolerance=tolerance),
+        lambda sources, targets: skelutils.get_closest_position_indexes(
+            source_positions[sources], target_positions[targets])]
+    for mapping_method in mapping_methods:
+        if not unmapped_sources:
+            break
+        if not unmapped_targets:
+            # like skelutils.get_influence_map start re-using targets once they have all been used
+            unmapped_targets = list(range(len(target_influences)))
+        matching_indexes = mapping_method(unmapped_sources, unmapped_targets)
+        for source_index, target_index in matching_indexes:
+            influence_columns_map[unmapped_sources[source_index]].append(unmapped_targets[target_index])
+        mapped_sources = set([unmapped_sources[i] for i, _ in matching_indexes])
+        mapped_targets = set([unmapped_targets[i] for _, i in matching_indexes])
+        unmapped_sources = [i for i in unmapped_sources if i not in mapped_sources]
+        unmapped_targets = [i for i in unmapped_targets if i not in mapped_targets]
+    for source in unmapped_sources:
+        # more sources than targets. Nothing should lose its weights so share the closest target.
+        distances = np.linalg.norm(target_positions - source_positions[source], axis=1)
+        influence_columns_map[source].append(int(distances.argmin()))
+    return influence_columns_map
+
+
 def _get_best_guess_copy_weights_method(source_mesh, target_mesh, vert_order_check_method=None):
     def default_method(source, target):
         return len(source.vtx) == len(target.vtx)
@@ -133,7 +292,7 @@ def get_skindata_path_from_dialogue(start_dir=None, file_mode=0):
     start_dir = start_dir or get_skindata_path()
     try:
         return pm.fileDialog2(fileMode=file_mode,
-                              fileFilter="Maya Files (*.ma);;Maya ASCII (*.ma)",
+                              fileFilter="Skin Weights (*.skw *.ma);;Skin Weights Binary (*.skw);;Maya ASCII (*.ma)",
                               startingDirectory=start_dir)[0]
     except IndexError:
         return
@@ -0,0 +1,59 @@
+import numpy as np
+import pymel.core as pm
+
+import flottitools.test as mayatest
+import flottitools.skinmesh.averageweights.averageweights as avgwts
+
+
+class TestApplyProximityWeights(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestApplyProximityWeights, self).setUp()
+        self.test_cube, self.test_joints, self.skin_cluster = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(self.skin_cluster, self.test_cube.vtx, transformValue=(self.test_joints[0], 1.0))
+        pm.skinPercent(self.skin_cluster, self.test_cube.vtx[1], transformValue=(self.test_joints[1], 1.0))
+
+    def test_reads_orig_points_and_weights(self):
+        points, influences, weights = avgwts.get_orig_points_influences_and_weights(
+            [self.test_cube.vtx[1], self.test_cube.vtx[0]])
+        np.testing.assert_allclose([[0.5, -0.5, 0.5], [-0.5, -0.5, 0.5]], points)
+        self.assertListEqual(self.test_joints, influences)
+        np.testing.assert_allclose([[0.0, 1.0], [1.0, 0.0]], weights)
+
+    def test_scales_weights_by_inverse_distance(self):
+        sample_data = avgwts.get_orig_points_influences_and_weights([self.test_cube.vtx[0], self.test_cube.vtx[1]])
+        avgwts.apply_proximity_weights_to_mesh(self.test_cube.getShape(), [2], *sample_data)
+        root_two = np.sqrt(2.0)
+        expected = [root_two / (1.0 + root_two), 1.0 / (1.0 + root_two)]
+        result = pm.skinPercent(self.skin_cluster, self.test_cube.vtx[2], q=True, value=True)
+        np.testing.assert_allclose(expected, result)
+
+    def test_keeps_weights_of_unsampled_influences(self):
+        test_cube, test_joints, skin_cluster = self.create_skinned_cube(joint_count=3)
+        pm.skinPercent(skin_cluster, test_cube.vtx, transformValue=(test_joints[0], 1.0))
+        pm.skinPercent(skin_cluster, test_cube.vtx[1], transformValue=(test_joints[1], 1.0))
+        pm.skinPercent(skin_cluster, test_cube.vtx[2], transformValue=[(test_joints[0], 0.5), (test_joints[2], 0.5)])
+        points, influences, weights = avgwts.get_orig_points_influences_and_weights(
+            [test_cube.vtx[0], test_cube.vtx[1]])
+        avgwts.apply_proximity_weights_to_mesh(test_cube.getShape(), [2], points, influences[:2], weights[:, :2])
+        root_two = np.sqrt(2.0)
+        expected = np.array([root_two / (1.0 + root_two), 1.0 / (1.0 + root_two), 0.5]) / 1.5
+        result = pm.skinPercent(skin_cluster, test_cube.vtx[2], q=True, value=True)
+        np.testing.assert_allclose(expected, result)
+
+    def test_uses_orig_positions(self):
+        pm.move(self.test_joints[1], (0.0, 10.0, 0.0), relative=True)
+        sample_data = avgwts.get_orig_points_influences_and_weights([self.test_cube.vtx[0], self.test_cube.vtx[1]])
+        avgwts.apply_proximity_weights_to_mesh(self.test_cube.getShape(), [3], *sample_data)
+        root_two = np.sqrt(2.0)
+        expected = [1.0 / (1.0 + root_two), root_two / (1.0 + root_two)]
+        result = pm.skinPercent(self.skin_cluster, self.test_cube.vtx[3], q=True, value=True)
+        np.testing.assert_allclose(expected, result)
+
+
+class TestSetInfluenceWeights(mayatest.MayaTestCase):
+    def test_keeps_weights_of_other_influences(self):
+        test_cube, test_joints, skin_cluster = self.create_skinned_cube(joint_count=3)
+        pm.skinPercent(skin_cluster, test_cube.vtx[2], transformValue=[(test_joints[0], 0.5), (test_joints[2], 0.5)])
+        avgwts.set_influence_weights(skin_cluster, [2], {test_joints[0].name(): 1.0, test_joints[1]: 0.0})
+        result = pm.skinPercent(skin_cluster, test_cube.vtx[2], q=True, value=True)
+        np.testing.assert_allclose([2.0 / 3.0, 0.0, 1.0 / 3.0], result)
@@ -200,6 +200,47 @@ class TestImportSkinning(mayatest.MayaTestCase):
         self.assertListEqual(result, expected)
 
 
+class TestImportSkinFile(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestImportSkinFile, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube()
+        pm.skinPercent(test_skincluster, test_cube.vtx[:4], transformValue=(test_joints[2], 1.0))
+        pm.skinPercent(test_skincluster, test_cube.vtx[4:], transformValue=(test_joints[1], 1.0))
+        self.skin_path = os.path.join(self.tmp_dir, 'test_skinning.skw')
+        skinio.export_skinned_mesh(test_cube, self.skin_path)
+        pm.delete(self.scene_nodes)
+
+    def tearDown(self):
+        super(TestImportSkinFile, self).tearDown()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_copies_weights_vert_order(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube()
+        skinio.import_skinning(test_cube, self.skin_path)
+        self.assertEqual({test_joints[2]: 1.0}, skinutils.get_weighted_influences(test_cube.vtx[0]))
+        self.assertEqual({test_joints[1]: 1.0}, skinutils.get_weighted_influences(test_cube.vtx[4]))
+
+    def test_copies_weights_closest_point(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube()
+        skinio.import_skinning(test_cube, self.skin_path, copy_weights_method=skinutils.copy_weights)
+        self.assertEqual({test_joints[2]: 1.0}, skinutils.get_weighted_influences(test_cube.vtx[0]))
+        self.assertEqual({test_joints[1]: 1.0}, skinutils.get_weighted_influences(test_cube.vtx[4]))
+
+    def test_does_not_add_nodes(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube()
+        expected_nodes = pm.ls()
+        skinio.import_skinning(test_cube, self.skin_path)
+        self.assertListEqual(expected_nodes, pm.ls())
+
+    def test_imports_on_unskinned_meshes(self):
+        test_cube = self.create_cube()
+        test_joints = [self.create_joint(position=(i, i, i), absolute=True) for i in range(5)]
+        skinio.import_skinning_on_meshes_in_scene(self.skin_path, bind_unskinned=True)
+        skin_cluster = skinutils.get_skincluster(test_cube)
+        self.assertListEqual(test_joints, skin_cluster.getInfluence())
+
+
 class TestGetSkinDataPath(mayatest.MayaTestCase):
     def test_if_mesh_referenced_path_to_referenced_file_dir(self):
         pass
@@ -18,6 +18,7 @@ except ImportError:
   from shiboken2 import wrapInstance
 
 import flottitools.path_consts as path_consts
+import flottitools.utils.progressutils as progressutils
 
 
 CANCEL_STRING = 'Cancel'
@@ -205,6 +206,10 @@ class MayaProgressBar(QtWidgets.QProgressBar):
 
 
 class ProgressBarWithLabel(QtWidgets.QWidget):
+    """
+    A progress bar with a label and a cancel button.
+    Updates go through a throttled QtProgressReporter, so loops can report every step without repainting every step.
+    """
     def __init__(self):
         super(ProgressBarWithLabel, self).__init__()
         layout = QtWidgets.QVBoxLayout()
@@ -212,58 +217,79 @@ class ProgressBarWithLabel(QtWidgets.QWidget):
         self.setLayout(layout)
         self.progress_bar = MayaProgressBar()
         self.label = QtWidgets.QLabel()
+        self.cancel_button = QtWidgets.QPushButton(CANCEL_STRING)
+        label_layout = QtWidgets.QHBoxLayout()
+        label_layout.addWidget(self.label, stretch=1)
+        label_layout.addWidget(self.cancel_button)
         layout.addWidget(self.progress_bar)
-        layout.addWidget(self.label)
+        layout.addLayout(label_layout)
+        self.reporter = QtProgressReporter(self)
+        self.cancel_button.clicked.connect(self.reporter.cancel)
+
+    def begin(self):
+        self.reporter.begin()
+
+    def finish(self):
+        self.reporter.finish()
 
     def reset(self):
-        self.label.setText('')
-        self.progress_bar.reset()
+        self.reporter.reset()
 
     def set_maximum(self, maximum):
-        self.progress_bar.setMaximum(maximum)
+        self.reporter.set_maximum(maximum)
 
     def update_value(self, value):
-        self.progress_bar.update_value(value)
+        self.reporter.update_value(value)
 
     def iterate_value(self, step_size=1):
-        self.progress_bar.iterate_value(step_size)
+        self.reporter.iterate_value(step_size)
 
     def update_iterate_value(self, step_size=1):
-        self.progress_bar.update_iterate_value(step_size)
+        self.reporter.update_iterate_value(step_size)
 
     def update_label_and_iter_val(self, text):
-        self.progress_bar.setValue(self.progress_bar.value()+1)
-        self.label.setText(text)
-        pm.refresh()
+        self.reporter.update_label_and_iter_val(text)
 
     def update_label_and_add_val(self, text, value):
-        self.progress_bar.setValue(self.progress_bar.value()+value)
-        self.label.setText(text)
-        pm.refresh()
+        self.reporter.update_label_and_add_val(text, value)
+
+    def get_label(self):
+        return self.reporter.get_label()
+
+    def is_refresh_due(self):
+        return self.reporter.is_refresh_due()
 
     def update_label(self, text):
-        self.label.setText(text)
-        pm.refresh()
+        self.reporter.update_label(text)
 
     def update_label_and_value(self, text, value):
-        self.progress_bar.setValue(value)
-        self.label.setText(text)
-        pm.refresh()
+        self.reporter.update_label_and_value(text, value)
 
     def iterate_chunk(self):
-        self.progress_bar.iterate_chunk()
+        self.reporter.iterate_chunk()
 
     def set_chunks(self, chunk_max_values):
-        self.progress_bar.set_chunks(chunk_max_values)
+        self.reporter.set_chunks(chunk_max_values)
 
     def update_iterate_chunk(self):
-        self.iterate_chunk()
-        pm.refresh()
+        self.reporter.update_iterate_chunk()
 
     def update_label_and_iter_chunk(self, text):
-        self.iterate_chunk()
-        self.label.setText(text)
+        self.reporter.update_label_and_iter_chunk(text)
+
+
+class QtProgressReporter(progressutils.ProgressReporter):
+    """Shows progress on a ProgressBarWithLabel. Processes Qt events when it does so its cancel button responds."""
+    def __init__(self, progress_bar_with_label, max_refresh_rate=progressutils.MAX_REFRESH_RATE):
+        super(QtProgressReporter, self).__init__(max_refresh_rate)
+        self.widget = progress_bar_with_label
+
+    def show(self):
+        self.widget.progress_bar.setMaximum(int(self.maximum))
+        self.widget.progress_bar.setValue(int(self.value))
+        self.widget.label.setText(self.label)
         pm.refresh()
+        QtWidgets.QApplication.processEvents()
 
 
 def unsaved_changes_prompt():
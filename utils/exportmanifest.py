@@ -0,0 +1,151 @@
+"""
+A record of what every exported FBX was exported from, so batch exports can skip assets that didn't change.
+
+Before exporting, an exporter builds a fingerprint of its inputs: the files the export reads, like the scene,
+the referenced rig or the skeleton, and settings like the clip frame range and the FbxExportOptions values.
+After a successful export the fingerprint is written to a file next to the FBX, named like the FBX with
+FINGERPRINT_FILE_SUFFIX added. The next export of that FBX can be skipped if the FBX still exists and its
+fingerprint is the same.
+
+Files are compared by content hash. A fingerprint keeps the size and modification time of every file it
+hashed, and a file whose size and time still match is not hashed again. Checking an export reads no file
+that didn't change and never opens Maya.
+
+Every FBX has its own fingerprint file, so exports running in parallel never write the same file. Fingerprint
+files are replaced atomically. Failing to write one is logged and only means that FBX is exported again.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+
+FINGERPRINT_FILE_SUFFIX = '.flotti.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def get_file_hash(path):
+    file_hash = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_file_state(path, known_state=None):
+    """
+    Returns {'path', 'size', 'mtime', 'hash'} of the file at path, or None if there is no file.
+
+    :param known_state: a state returned earlier for the same file. Its hash is reused if the size and
+        modification time of the file still match.
+    """
+    path = os.path.normpath(os.path.abspath(str(path)))
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    state = {'path': path, 'size': stat_result.st_size, 'mtime': stat_result.st_mtime}
+    if known_state and all([known_state.get(k) == state[k] for k in ('path', 'size', 'mtime')]):
+        state['hash'] = known_state['hash']
+    else:
+        state['hash'] = get_file_hash(path)
+    return state
+
+
+def get_fingerprint(files, settings, known_fingerprint=None):
+    """
+    Returns the fingerprint of an export.
+
+    :param files: {role: path} of the files the export reads, like {'scene': scene_path, 'rig': rig_path}.
+        A path that is None or doesn't exist makes the fingerprint incomplete. It never matches another one.
+    :param settings: JSON serializable values that change the export, like the export options.
+    :param known_fingerprint: a recorded fingerprint whose hashes are reused for files that didn't change.
+    """
+    known_files = (known_fingerprint or {}).get('files', {})
+    file_states = {}
+    for role, path in files.items():
+        file_states[role] = get_file_state(path, known_files.get(role)) if path else None
+    # round trip so tuples compare equal to the lists a loaded fingerprint has
+    settings = json.loads(json.dumps(settings, sort_keys=True))
+    return {'files': file_states, 'settings': settings}
+
+
+def is_same_fingerprint(fingerprint, other_fingerprint):
+    if not fingerprint or not other_fingerprint:
+        return False
+    if fingerprint['settings'] != other_fingerprint['settings']:
+        return False
+    files = fingerprint['files']
+    other_files = other_fingerprint['files']
+    if set(files) != set(other_files):
+        return False
+    for role, state in files.items():
+        other_state = other_files[role]
+        if state is None or other_state is None:
+            return False
+        if state['path'] != other_state['path'] or state['hash'] != other_state['hash']:
+            return False
+    return True
+
+
+def get_fingerprint_path(export_path):
+    return os.path.abspath(str(export_path)) + FINGERPRINT_FILE_SUFFIX
+
+
+def read_fingerprint(export_path):
+    """Returns the recorded fingerprint of export_path, or None."""
+    try:
+        with open(get_fingerprint_path(export_path)) as f:
+            fingerprint = json.load(f)
+    except (OSError, ValueError):
+        # a missing or broken fingerprint file only means the export is done again
+        return None
+    return fingerprint if isinstance(fingerprint, dict) else None
+
+
+def write_fingerprint(export_path, fingerprint):
+    fingerprint_path = get_fingerprint_path(export_path)
+    file_descriptor, tmp_path = tempfile.mkstemp(dir=os.path.dirname(fingerprint_path),
+                                                 prefix=os.path.basename(fingerprint_path))
+    try:
+        with os.fdopen(file_descriptor, 'w') as f:
+            json.dump(fingerprint, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, fingerprint_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def remove_fingerprint(export_path):
+    try:
+        os.remove(get_fingerprint_path(export_path))
+    except FileNotFoundError:
+        pass
+
+
+def get_export_fingerprint(export_path, files, settings):
+    """Returns the fingerprint of exporting export_path, reusing the hashes recorded for it."""
+    return get_fingerprint(files, settings, read_fingerprint(export_path))
+
+
+def is_export_up_to_date(export_path, fingerprint):
+    """True if export_path exists and was exported from the same inputs as fingerprint."""
+    if not os.path.exists(str(export_path)):
+        return False
+    return is_same_fingerprint(fingerprint, read_fingerprint(export_path))
+
+
+def record_export(export_path, fingerprint):
+    """Records that export_path was exported from fingerprint. A None fingerprint forgets the export, so
+    it is not skipped next time. Never raises for file errors, which are logged instead. The export itself
+    succeeded, and an unrecorded export is only exported again."""
+    try:
+        if fingerprint is None:
+            remove_fingerprint(export_path)
+        else:
+            write_fingerprint(export_path, fingerprint)
+    except OSError as e:
+        logger.warning('Could not record the fingerprint of %s: %s', export_path, e)
@@ -0,0 +1,125 @@
+"""
+An index of the scene shared by everything that queries it during a validation run or an export.
+
+SceneInventory lists every node with its type in one ls call and derives the lookups the validators and
+exporters need from that, instead of each of them running its own pm.ls over the whole scene. While
+scene_inventory_cache() is active, scene callbacks mark the inventory stale whenever nodes are added,
+removed, renamed, reparented or connected, and it is rebuilt the next time it is asked for something.
+"""
+from contextlib import contextmanager
+
+import maya.api.OpenMaya as om
+import maya.cmds as cmds
+import pymel.core as pm
+
+import flottitools.utils.skeletonutils as skelutils
+
+
+class SceneInventory(object):
+    def __init__(self):
+        self._callback_ids = []
+        self.invalidate()
+
+    def invalidate(self, *args):
+        """Drops everything. The inventory is rebuilt from the scene when it is next used."""
+        self._type_to_names = None
+        self._type_to_nodes = {}
+        self._mesh_to_skin_cluster = None
+        self._skin_cluster_to_influences = {}
+        self._skin_cluster_to_root_joint = {}
+        self._shading_engine_to_members = {}
+
+    def get_nodes(self, type_name):
+        """Returns every node of type_name or a type derived from it, like pm.ls(type=type_name)."""
+        if self._type_to_names is None:
+            self._build()
+        if type_name not in self._type_to_nodes:
+            type_names = set([type_name] + (cmds.nodeType(type_name, derived=True, isTypeName=True) or []))
+            names = [name for t in type_names for name in self._type_to_names.get(t, [])]
+            self._type_to_nodes[type_name] = pm.ls(names)
+        return list(self._type_to_nodes[type_name])
+
+    def get_mesh_transforms(self):
+        return list(set([m.getParent() for m in self.get_nodes('mesh')]))
+
+    def get_skinned_mesh_transforms(self):
+        self._build_skin_cluster_map()
+        return list(set([m.getParent() for m in self._mesh_to_skin_cluster if isinstance(m, pm.nt.Mesh)]))
+
+    def get_skin_cluster(self, node):
+        """Returns the skinCluster deforming node, a mesh shape or its transform. None if it is not known."""
+        self._build_skin_cluster_map()
+        return self._mesh_to_skin_cluster.get(node)
+
+    def get_influences(self, skin_cluster):
+        if skin_cluster not in self._skin_cluster_to_influences:
+            self._skin_cluster_to_influences[skin_cluster] = skin_cluster.influenceObjects()
+        return list(self._skin_cluster_to_influences[skin_cluster])
+
+    def get_root_joint(self, skin_cluster):
+        """Returns the top most joint above the first influence of skin_cluster, like
+        skeletonutils.get_root_joint_from_child()."""
+        if skin_cluster not in self._skin_cluster_to_root_joint:
+            influence = self.get_influences(skin_cluster)[0]
+            self._skin_cluster_to_root_joint[skin_cluster] = skelutils.get_root_joint_from_child(influence)
+        return self._skin_cluster_to_root_joint[skin_cluster]
+
+    def get_shading_engine_members(self, shading_engine):
+        if shading_engine not in self._shading_engine_to_members:
+            self._shading_engine_to_members[shading_engine] = shading_engine.members()
+        return list(self._shading_engine_to_members[shading_engine])
+
+    def watch(self):
+        """Invalidates the inventory whenever the scene's nodes or their connections change."""
+        if self._callback_ids:
+            return
+        self._callback_ids = [om.MDGMessage.addNodeAddedCallback(self.invalidate),
+                              om.MDGMessage.addNodeRemovedCallback(self.invalidate),
+                              om.MDGMessage.addConnectionCallback(self.invalidate),
+                              om.MNodeMessage.addNameChangedCallback(om.MObject(), self.invalidate),
+                              om.MDagMessage.addAllDagChangesCallback(self.invalidate),
+                              om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeNew, self.invalidate),
+                              om.MSceneMessage.addCallback(om.MSceneMessage.kBeforeOpen, self.invalidate)]
+
+    def close(self):
+        om.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+
+    def _build(self):
+        names_and_types = cmds.ls(long=True, showType=True) or []
+        self._type_to_names = {}
+        for name, type_name in zip(names_and_types[::2], names_and_types[1::2]):
+            self._type_to_names.setdefault(type_name, []).append(name)
+
+    def _build_skin_cluster_map(self):
+        if self._mesh_to_skin_cluster is not None:
+            return
+        self._mesh_to_skin_cluster = {}
+        for skin_cluster in self.get_nodes('skinCluster'):
+            for shape in skin_cluster.getGeometry():
+                self._mesh_to_skin_cluster.setdefault(shape, skin_cluster)
+                self._mesh_to_skin_cluster.setdefault(shape.getParent(), skin_cluster)
+
+
+_active_inventory = None
+
+
+@contextmanager
+def scene_inventory_cache():
+    """Scene queries inside this context share one SceneInventory. Nested contexts reuse the outer one."""
+    global _active_inventory
+    if _active_inventory is not None:
+        yield _active_inventory
+        return
+    _active_inventory = SceneInventory()
+    _active_inventory.watch()
+    try:
+        yield _active_inventory
+    finally:
+        _active_inventory.close()
+        _active_inventory = None
+
+
+def get_active_scene_inventory():
+    """Returns the SceneInventory of the active scene_inventory_cache(), or None outside of one."""
+    return _active_inventory
@@ -1,5 +1,7 @@
 import pymel.core as pm
 
+import flottitools.utils.inventoryutils as invutils
+
 
 def get_all_materials_in_scene():
     return pm.ls(mat=True)
@@ -7,6 +9,12 @@ def get_all_materials_in_scene():
 
 def get_used_materials_in_scene():
     used_materials = []
+    inventory = invutils.get_active_scene_inventory()
+    if inventory:
+        for shading_engine in inventory.get_nodes('shadingEngine'):
+            if inventory.get_shading_engine_members(shading_engine):
+                used_materials.extend(shading_engine.surfaceShader.listConnections())
+        return used_materials
     for shading_engine in pm.ls(type=pm.nt.ShadingEngine):
         if shading_engine.members():
             used_materials.extend(shading_engine.surfaceShader.listConnections())
@@ -1,14 +1,30 @@
+import hashlib
+from contextlib import contextmanager
+
+import numpy as np
 import maya.api.OpenMaya as om
 import pymel.core as pm
 
+import flottitools.utils.inventoryutils as invutils
 import flottitools.utils.openmayautils as omutils
+import flottitools.utils.spatialutils as spatialutils
 
 
 MESH_SUFFIX = '_MESH'
 NO_VERTEX_COLOR = om.MColor((-1, -1, -1, -1))
 
+COMPONENT_VERTEX = 'vtx'
+COMPONENT_EDGE = 'e'
+COMPONENT_FACE = 'f'
+COMPONENT_MFN_TYPES = {COMPONENT_VERTEX: om.MFn.kMeshVertComponent,
+                       COMPONENT_EDGE: om.MFn.kMeshEdgeComponent,
+                       COMPONENT_FACE: om.MFn.kMeshPolygonComponent}
+
 
 def get_meshes_from_scene():
+    inventory = invutils.get_active_scene_inventory()
+    if inventory:
+        return inventory.get_mesh_transforms()
     meshes = list(set([m.getParent() for m in pm.ls(type=pm.nt.Mesh)]))
     return meshes
 
@@ -45,6 +61,234 @@ def get_mesh_nodes(node):
     return []
 
 
+def get_mesh_dagpath(mesh):
+    """:param mesh: mesh transform or shape PyNode, or the name of a mesh shape"""
+    if isinstance(mesh, str):
+        return omutils.get_dagpath_or_dependnode_from_name(mesh)
+    try:
+        shape = mesh.getShape()
+    except AttributeError:
+        shape = mesh
+    return omutils.get_dagpath_or_dependnode(shape)
+
+
+def get_points_array(mesh, space=om.MSpace.kWorld):
+    """Returns the mesh's points as a float array shaped (vertex_count, 3)."""
+    points = om.MFnMesh(get_mesh_dagpath(mesh)).getPoints(space)
+    return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+def get_triangles_array(mesh):
+    """Returns the vertex indexes of the mesh's triangulation shaped (triangle_count, 3)."""
+    triangle_counts, triangle_verts = om.MFnMesh(get_mesh_dagpath(mesh)).getTriangles()
+    return np.array(triangle_verts, dtype=np.int32).reshape(-1, 3)
+
+
+def get_topology_hash(mesh):
+    """Returns a hash of the mesh's face vertex counts and face vertex indexes.
+    Meshes with the same hash have the same vertex order.
+    """
+    poly_vert_counts, poly_verts = om.MFnMesh(get_mesh_dagpath(mesh)).getVertices()
+    topology_hash = hashlib.sha1(np.array(poly_vert_counts, dtype=np.int32).tobytes())
+    topology_hash.update(np.array(poly_verts, dtype=np.int32).tobytes())
+    return topology_hash.hexdigest()
+
+
+class MeshScan(object):
+    """
+    Bulk reads of a mesh for the static mesh checks.
+
+    Each array is read from MFnMesh with a single call the first time it is used, so every check run on the
+    same MeshScan shares one read instead of walking its own MItMeshPolygon or MItMeshVertex.
+    """
+    def __init__(self, mesh):
+        """:param mesh: mesh transform or shape PyNode, or the name of a mesh"""
+        self.dag_path = get_mesh_dagpath(mesh)
+        self.fn_mesh = om.MFnMesh(self.dag_path)
+        self.object_name = self.dag_path.getPath()
+        self._poly_vert_counts = None
+        self._poly_verts = None
+        self._uv_counts = None
+        self._uv_ids = None
+        self._points = None
+        self._vertex_colors = None
+
+    @property
+    def poly_vert_counts(self):
+        """Vertex count of each face."""
+        if self._poly_vert_counts is None:
+            self._read_vertices()
+        return self._poly_vert_counts
+
+    @property
+    def poly_verts(self):
+        """Vertex indexes of every face, face after face."""
+        if self._poly_verts is None:
+            self._read_vertices()
+        return self._poly_verts
+
+    @property
+    def uv_counts(self):
+        """Number of UVs assigned to each face in the current UV set."""
+        if self._uv_counts is None:
+            self._read_assigned_uvs()
+        return self._uv_counts
+
+    @property
+    def uv_ids(self):
+        """UV indexes of every face in the current UV set, face after face."""
+        if self._uv_ids is None:
+            self._read_assigned_uvs()
+        return self._uv_ids
+
+    @property
+    def points(self):
+        """Object space points shaped (vertex_count, 3)."""
+        if self._points is None:
+            points = self.fn_mesh.getPoints(om.MSpace.kObject)
+            self._points = np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+        return self._points
+
+    @property
+    def vertex_colors(self):
+        """Average color of each vertex in the current color set shaped (vertex_count, 4).
+        Vertices without a color are NO_VERTEX_COLOR.
+        """
+        if self._vertex_colors is None:
+            if self.fn_mesh.numColorSets:
+                colors = self.fn_mesh.getVertexColors(defaultUnsetColor=NO_VERTEX_COLOR)
+                self._vertex_colors = np.array(colors, dtype=np.float64).reshape(-1, 4)
+            else:
+                self._vertex_colors = np.tile(np.array(tuple(NO_VERTEX_COLOR)), (self.fn_mesh.numVertices, 1))
+        return self._vertex_colors
+
+    def get_ngon_indexes(self):
+        return np.flatnonzero(self.poly_vert_counts > 4)
+
+    def get_hash(self, *array_names):
+        """Returns a hash of the named arrays, like get_hash('poly_vert_counts', 'poly_verts')."""
+        array_hash = hashlib.sha1()
+        for array_name in array_names:
+            array_hash.update(np.ascontiguousarray(getattr(self, array_name)).tobytes())
+        return array_hash.hexdigest()
+
+    def get_missing_uv_indexes(self):
+        return np.flatnonzero(self.uv_counts < self.poly_vert_counts)
+
+    def get_overlapping_vertex_indexes(self, tolerance):
+        return spatialutils.get_coincident_point_indexes(self.points, tolerance)
+
+    def get_vertex_color_indexes(self, skip_color_values=(NO_VERTEX_COLOR,)):
+        """Returns the indexes of every vertex whose color is not in skip_color_values."""
+        colors = self.vertex_colors
+        if not len(skip_color_values):
+            return np.arange(len(colors))
+        # compare as MColor so the skip values get the same float precision as the mesh colors
+        skip_colors = np.array([tuple(om.MColor(color_value)) for color_value in skip_color_values])
+        is_skipped = np.any(np.all(colors[:, np.newaxis, :] == skip_colors[np.newaxis, :, :], axis=2), axis=1)
+        return np.flatnonzero(~is_skipped)
+
+    def get_vertex_colors(self, skip_color_values=(NO_VERTEX_COLOR,)):
+        """Returns {vert_index: (r, g, b, a)} of every vertex whose color is not in skip_color_values."""
+        vert_indexes = self.get_vertex_color_indexes(skip_color_values)
+        return dict(zip(vert_indexes.tolist(), [tuple(color) for color in self.vertex_colors[vert_indexes].tolist()]))
+
+    def _read_vertices(self):
+        poly_vert_counts, poly_verts = self.fn_mesh.getVertices()
+        self._poly_vert_counts = np.array(poly_vert_counts, dtype=np.int64)
+        self._poly_verts = np.array(poly_verts, dtype=np.int64)
+
+    def _read_assigned_uvs(self):
+        uv_counts, uv_ids = self.fn_mesh.getAssignedUVs()
+        self._uv_counts = np.array(uv_counts, dtype=np.int64)
+        self._uv_ids = np.array(uv_ids, dtype=np.int64)
+
+
+class ComponentSet(object):
+    """
+    Components of one kind on one mesh, stored as an index array.
+
+    PyNodes and component names are only made when they are asked for. Indexing or iterating returns PyNode
+    components so a ComponentSet can stand in for a list of them.
+    """
+    def __init__(self, mesh, indexes, kind=COMPONENT_VERTEX):
+        """
+        :param mesh: mesh shape PyNode
+        :param indexes: component indexes. They are sorted and duplicates are removed.
+        :param kind: one of COMPONENT_VERTEX, COMPONENT_EDGE or COMPONENT_FACE
+        """
+        self.mesh = mesh
+        self.indexes = np.unique(np.asarray(indexes, dtype=np.int64))
+        self.kind = kind
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return self.subset(self.indexes[item])
+        return getattr(self.mesh, self.kind)[int(self.indexes[item])]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __str__(self):
+        return str(self.get_range_names())
+
+    def __repr__(self):
+        return 'ComponentSet({0!r}, {1} {2})'.format(self.mesh, len(self), self.kind)
+
+    def subset(self, rows):
+        """Returns a ComponentSet of only the components at rows."""
+        return ComponentSet(self.mesh, self.indexes[np.asarray(rows, dtype=np.int64)], self.kind)
+
+    def get_names(self):
+        """Returns a component name like 'pCubeShape1.vtx[3]' for every component."""
+        mesh_name = self.mesh.name()
+        return ['{0}.{1}[{2}]'.format(mesh_name, self.kind, i) for i in self.indexes.tolist()]
+
+    def get_range_names(self):
+        """Returns as few component names as possible, like ['pCubeShape1.f[0:3]', 'pCubeShape1.f[7]']."""
+        return get_component_range_names(self.mesh.name(), self.indexes, self.kind)
+
+    def get_selection_list(self):
+        """Returns an om.MSelectionList holding every component as a single component object."""
+        selection_list = om.MSelectionList()
+        component = omutils.create_component(self.indexes, COMPONENT_MFN_TYPES[self.kind])
+        selection_list.add((get_mesh_dagpath(self.mesh), component))
+        return selection_list
+
+    def select(self, add=False):
+        list_adjustment = om.MGlobal.kAddToList if add else om.MGlobal.kReplaceList
+        om.MGlobal.setActiveSelectionList(self.get_selection_list(), list_adjustment)
+
+
+_active_mesh_scans = None
+
+
+@contextmanager
+def mesh_scan_cache():
+    """Every get_mesh_scan() call inside this context reuses one MeshScan per mesh."""
+    global _active_mesh_scans
+    previous_scans = _active_mesh_scans
+    _active_mesh_scans = previous_scans if previous_scans is not None else {}
+    try:
+        yield _active_mesh_scans
+    finally:
+        _active_mesh_scans = previous_scans
+
+
+def get_mesh_scan(mesh):
+    """Returns a MeshScan of mesh. Inside mesh_scan_cache() the same MeshScan is returned for the same mesh."""
+    if _active_mesh_scans is None:
+        return MeshScan(mesh)
+    key = get_mesh_dagpath(mesh).fullPathName()
+    if key not in _active_mesh_scans:
+        _active_mesh_scans[key] = MeshScan(mesh)
+    return _active_mesh_scans[key]
+
+
 def get_ngons(node):
     mesh_nodes = get_mesh_nodes(node)
     ngons = []
@@ -54,70 +298,55 @@ def get_ngons(node):
 
 
 def get_ngons_from_mesh_node(mesh_node):
-    face_names = get_ngons_from_mesh_name(mesh_node.name())
-    faces = [pm.PyNode(v) for v in face_names]
-    return faces
+    """:returns: ComponentSet of faces"""
+    return ComponentSet(mesh_node, get_mesh_scan(mesh_node).get_ngon_indexes(), COMPONENT_FACE)
 
 
 def get_ngons_from_mesh_name(mesh_node_name):
-    ngons = []
-    dag_path = omutils.get_dagpath_or_dependnode_from_name(mesh_node_name)
-    faceIt = om.MItMeshPolygon(dag_path)
-    objectName = dag_path.getPath()
-    while not faceIt.isDone():
-        numOfEdges = faceIt.getEdges()
-        if len(numOfEdges) > 4:
-            faceIndex = faceIt.index()
-            componentName = str(objectName) + '.f[' + str(faceIndex) + ']'
-            ngons.append(componentName)
-        else:
-            pass
-        faceIt.next()
-    return ngons
+    mesh_scan = get_mesh_scan(mesh_node_name)
+    return ['{0}.f[{1}]'.format(mesh_scan.object_name, i) for i in mesh_scan.get_ngon_indexes().tolist()]
 
 
-def get_overlapping_vertices(node, decimal_place_accuracy=5):
+def get_overlapping_vertices(node, decimal_place_accuracy=5, tolerance=None):
+    """
+    :param decimal_place_accuracy: vertices closer than half of this decimal place overlap.
+    :param tolerance: maximum distance between overlapping vertices. Overrides decimal_place_accuracy.
+    """
     mesh_nodes = get_mesh_nodes(node)
     overlapping_vertices = []
     for mesh_node in mesh_nodes:
-        overlapping_vertices.extend(get_overlapping_vertices_from_mesh_node(mesh_node, decimal_place_accuracy))
+        overlapping_vertices.extend(get_overlapping_vertices_from_mesh_node(mesh_node, decimal_place_accuracy,
+                                                                            tolerance))
     return overlapping_vertices
 
 
-def get_overlapping_vertices_from_mesh_node(mesh_node, decimal_place_accuracy=5):
-    vert_names = get_overlapping_vertices_from_mesh_name(mesh_node.name(), decimal_place_accuracy)
-    vertices = [pm.PyNode(v) for v in vert_names]
-    return vertices
-
-
-def get_overlapping_vertices_from_mesh_name(mesh_node_name, decimal_place_accuracy=5):
-    # warning
-    overlapping_verts = []
-    positions = []
-    vertex_indices = []
-    used_indices = []
-    dag_path = omutils.get_dagpath_or_dependnode_from_name(mesh_node_name)
-    vertexIt = om.MItMeshVertex(dag_path)
-    object_name = dag_path.getPath()
-    while not vertexIt.isDone():
-        position = om.MVector(vertexIt.position())
-        rounded_position = [round(n, decimal_place_accuracy) for n in position]
-        vertex_index = vertexIt.index()
-        try:
-            i = positions.index(rounded_position)
-            other_index = vertex_indices[i]
-            if other_index not in used_indices:
-                other_vertex_name = '{0}.vtx[{1}]'.format(str(object_name), str(other_index))
-                overlapping_verts.append(other_vertex_name)
-                used_indices.append(other_index)
-            vertex_name = '{0}.vtx[{1}]'.format(str(object_name), str(vertex_index))
-            overlapping_verts.append(vertex_name)
-        except ValueError:
-            pass
-        vertex_indices.append(vertex_index)
-        positions.append(rounded_position)
-        vertexIt.next()
-    return overlapping_verts
+def get_overlapping_vertices_from_mesh_node(mesh_node, decimal_place_accuracy=5, tolerance=None):
+    """:returns: ComponentSet of vertices"""
+    vert_indexes = get_overlapping_vertex_indexes(mesh_node, decimal_place_accuracy, tolerance)
+    return ComponentSet(mesh_node, vert_indexes, COMPONENT_VERTEX)
+
+
+def get_overlapping_vertices_from_mesh_name(mesh_node_name, decimal_place_accuracy=5, tolerance=None):
+    mesh_scan = get_mesh_scan(mesh_node_name)
+    vert_indexes = mesh_scan.get_overlapping_vertex_indexes(_get_overlap_tolerance(decimal_place_accuracy, tolerance))
+    return ['{0}.vtx[{1}]'.format(mesh_scan.object_name, i) for i in vert_indexes.tolist()]
+
+
+def get_overlapping_vertex_indexes(mesh, decimal_place_accuracy=5, tolerance=None):
+    """
+    Returns the sorted indexes of every vertex that is within tolerance of another vertex, in object space.
+
+    :param mesh: mesh transform or shape PyNode, or the name of a mesh shape
+    :param decimal_place_accuracy: used to derive the tolerance if tolerance is None.
+    :returns: int64 numpy array
+    """
+    return get_mesh_scan(mesh).get_overlapping_vertex_indexes(_get_overlap_tolerance(decimal_place_accuracy, tolerance))
+
+
+def _get_overlap_tolerance(decimal_place_accuracy, tolerance=None):
+    if tolerance is None:
+        tolerance = 0.5 * 10.0 ** -decimal_place_accuracy
+    return tolerance
 
 
 def get_faces_with_missing_uvs(node):
@@ -129,36 +358,24 @@ def get_faces_with_missing_uvs(node):
 
 
 def get_faces_with_missing_uvs_from_mesh_node(mesh_node):
-    face_names = get_faces_with_missing_uvs_from_mesh_name(mesh_node.name())
-    faces = [pm.PyNode(v) for v in face_names]
-    return faces
+    """:returns: ComponentSet of faces"""
+    return ComponentSet(mesh_node, get_mesh_scan(mesh_node).get_missing_uv_indexes(), COMPONENT_FACE)
 
 
 def get_faces_with_missing_uvs_from_mesh_name(mesh_node_name):
     # error
-    missing_uvs = []
-    dag_path = omutils.get_dagpath_or_dependnode_from_name(mesh_node_name)
-    face_iterator = om.MItMeshPolygon(dag_path)
-    object_name = dag_path.getPath()
-    while not face_iterator.isDone():
-        if not face_iterator.hasUVs():
-            component_name = '{0}.f[{1}]'.format(object_name, face_iterator.index())
-            missing_uvs.append(component_name)
-        face_iterator.next()
-    return missing_uvs
+    mesh_scan = get_mesh_scan(mesh_node_name)
+    return ['{0}.f[{1}]'.format(mesh_scan.object_name, i) for i in mesh_scan.get_missing_uv_indexes().tolist()]
+
+
+def get_colored_vertices_from_mesh_node(mesh_node, skip_color_values=(NO_VERTEX_COLOR,)):
+    """:returns: ComponentSet of the vertices whose color is not in skip_color_values"""
+    vert_indexes = get_mesh_scan(mesh_node).get_vertex_color_indexes(skip_color_values)
+    return ComponentSet(mesh_node, vert_indexes, COMPONENT_VERTEX)
 
 
 def get_vertex_colors_from_mesh_name(mesh_node_name, skip_color_values=(NO_VERTEX_COLOR,)):
-    vert_index_to_color = {}
-    dag_path = omutils.get_dagpath_or_dependnode_from_name(mesh_node_name)
-    vertex_iterator = om.MItMeshVertex(dag_path)
-    while not vertex_iterator.isDone():
-        m_color = vertex_iterator.getColor()
-        if m_color not in skip_color_values:
-            # PyMel doesn't seem to like MColor. So convert it to tuple to use in PyMel later.
-            vert_index_to_color[vertex_iterator.index()] = tuple(m_color)
-        vertex_iterator.next()
-    return vert_index_to_color
+    return get_mesh_scan(mesh_node_name).get_vertex_colors(skip_color_values=skip_color_values)
 
 
 def get_vertex_colors_from_node(node, skip_color_values=(NO_VERTEX_COLOR,)):
@@ -179,6 +396,30 @@ def get_vertex_colors_from_mesh_node(mesh_node, skip_color_values=(NO_VERTEX_COL
     return get_vertex_colors_from_mesh_name(mesh_node.name(), skip_color_values=skip_color_values)
 
 
+def get_vert_range_names(mesh_name, vert_indexes):
+    """Returns component names like ['pCubeShape1.vtx[0:3]', 'pCubeShape1.vtx[7]'] covering vert_indexes.
+    Consecutive indexes are collapsed into a single range.
+    """
+    return get_component_range_names(mesh_name, vert_indexes, COMPONENT_VERTEX)
+
+
+def get_component_range_names(mesh_name, indexes, kind=COMPONENT_VERTEX):
+    """See get_vert_range_names(). kind is the component attribute name like 'vtx' or 'f'."""
+    indexes = np.unique(np.asarray(indexes, dtype=np.int64))
+    if not len(indexes):
+        return []
+    run_starts = np.flatnonzero(np.diff(indexes) != 1) + 1
+    starts = indexes[np.concatenate(([0], run_starts))].tolist()
+    ends = indexes[np.concatenate((run_starts - 1, [len(indexes) - 1]))].tolist()
+    range_names = []
+    for start, end in zip(starts, ends):
+        if start == end:
+            range_names.append('{0}.{1}[{2}]'.format(mesh_name, kind, start))
+        else:
+            range_names.append('{0}.{1}[{2}:{3}]'.format(mesh_name, kind, start, end))
+    return range_names
+
+
 def get_mesh_pairs_by_name(meshes_a, meshes_b):
     pairs = []
     # copy meshes_b, so we can pop members of it for optimization without mutating meshes_b
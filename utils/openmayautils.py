@@ -11,3 +11,15 @@ def get_dagpath_or_dependnode_from_name(name):
         return sellist.getDagPath(0)
     except TypeError:
         return sellist.getDependNode(0)
+
+
+def create_vertex_component(vert_indexes):
+    return create_component(vert_indexes, om.MFn.kMeshVertComponent)
+
+
+def create_component(indexes, component_type):
+    """:param component_type: om.MFn component type like om.MFn.kMeshPolygonComponent"""
+    single_id_comp = om.MFnSingleIndexedComponent()
+    component = single_id_comp.create(component_type)
+    single_id_comp.addElements([int(i) for i in indexes])
+    return component
@@ -0,0 +1,159 @@
+"""
+Progress reporting for long running loops.
+
+Loops report every step, but a display is only refreshed MAX_REFRESH_RATE times a second. Repainting Qt
+widgets or the main progress bar in Maya is expensive, and refreshing on every vertex can cost more than
+the work itself.
+
+ProgressReporter keeps track of the value and label without showing them. Use it directly when there is
+nothing to show progress on, like in mayapy. Subclasses override show() to display progress.
+
+Any reporter can be canceled. The next update after cancel() raises ProgressCanceled, so loops stop
+without checking for cancellation themselves.
+"""
+import time
+
+import pymel.core as pm
+
+
+MAX_REFRESH_RATE = 20
+
+
+class ProgressCanceled(Exception):
+    pass
+
+
+class ProgressReporter(object):
+    def __init__(self, max_refresh_rate=MAX_REFRESH_RATE):
+        self.min_refresh_interval = 1.0 / max_refresh_rate if max_refresh_rate else 0.0
+        self.value = 0
+        self.maximum = 0
+        self.label = ''
+        self.chunks = []
+        self.current_chunk_index = 0
+        self.canceled = False
+        self._last_refresh_time = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.finish()
+
+    def show(self):
+        """Displays value, maximum and label. Headless reporters show nothing."""
+        pass
+
+    def finish(self):
+        """Shows the final state. Call when the work is done."""
+        self.refresh(force=True)
+
+    def begin(self):
+        """Clears a previous cancel and resets. Call before starting new work."""
+        self.canceled = False
+        self.reset()
+
+    def cancel(self):
+        self.canceled = True
+
+    def is_refresh_due(self):
+        """True if the next update would call show(). Lets loops skip building labels nobody will see."""
+        if self._last_refresh_time is None:
+            return True
+        return time.monotonic() - self._last_refresh_time >= self.min_refresh_interval
+
+    def refresh(self, force=False):
+        """Calls show() if it wasn't called in the last min_refresh_interval seconds or if force is True.
+        Raises ProgressCanceled after cancel() unless force is True.
+        """
+        if force or self.is_refresh_due():
+            self._last_refresh_time = time.monotonic()
+            self.show()
+        if self.canceled and not force:
+            raise ProgressCanceled()
+
+    def reset(self):
+        self.value = 0
+        self.label = ''
+        self.chunks = []
+        self.current_chunk_index = 0
+        self.refresh(force=True)
+
+    def set_maximum(self, maximum):
+        self.maximum = maximum
+        self.refresh(force=True)
+
+    def set_chunks(self, chunk_max_values):
+        """Each call to iterate_chunk() adds the next chunk to the value."""
+        # the small first chunk starts the bar reading 0% rather than just blank
+        self.chunks = [0.01] + list(chunk_max_values)
+        self.current_chunk_index = 0
+        self.set_maximum(sum(chunk_max_values))
+
+    def update_value(self, value):
+        self.value = value
+        self.refresh()
+
+    def iterate_value(self, step_size=1):
+        self.value += step_size
+
+    def update_iterate_value(self, step_size=1):
+        self.update_value(self.value + step_size)
+
+    def iterate_chunk(self):
+        self.value += self.chunks[self.current_chunk_index]
+        self.current_chunk_index += 1
+
+    def update_iterate_chunk(self):
+        self.iterate_chunk()
+        self.refresh()
+
+    def get_label(self):
+        return self.label
+
+    def update_label(self, text):
+        self.label = text
+        self.refresh()
+
+    def update_label_and_value(self, text, value):
+        self.label = text
+        self.update_value(value)
+
+    def update_label_and_add_val(self, text, value):
+        self.update_label_and_value(text, self.value + value)
+
+    def update_label_and_iter_val(self, text):
+        self.update_label_and_value(text, self.value + 1)
+
+    def update_label_and_iter_chunk(self, text):
+        self.iterate_chunk()
+        self.update_label(text)
+
+
+class MainProgressReporter(ProgressReporter):
+    """Shows progress on Maya's main progress bar. Pressing Esc cancels."""
+    def __init__(self, max_refresh_rate=MAX_REFRESH_RATE):
+        super(MainProgressReporter, self).__init__(max_refresh_rate)
+        self.progress_bar_name = pm.mel.eval('$tmp = $gMainProgressBar')
+        self._is_showing = False
+
+    def show(self):
+        if not self._is_showing:
+            pm.progressBar(self.progress_bar_name, edit=True, beginProgress=True, isInterruptable=True)
+            self._is_showing = True
+        pm.progressBar(self.progress_bar_name, edit=True, maxValue=max(int(self.maximum), 1),
+                       progress=int(self.value), status=self.label)
+        if pm.progressBar(self.progress_bar_name, query=True, isCancelled=True):
+            self.cancel()
+
+    def finish(self):
+        if self._is_showing:
+            pm.progressBar(self.progress_bar_name, edit=True, endProgress=True)
+            self._is_showing = False
+
+
+def get_main_progress_reporter():
+    """Returns a MainProgressReporter in interactive Maya and a headless ProgressReporter in batch mode."""
+    if pm.about(batch=True):
+        return ProgressReporter()
+    return MainProgressReporter()
@@ -5,6 +5,7 @@ import maya.api.OpenMaya as om
 import pymel.core as pm
 
 import flottitools.path_consts as path_consts
+import flottitools.utils.inventoryutils as invutils
 import flottitools.utils.skeletonutils as skelutils
 import flottitools.utils.skinutils as skinutils
 import flottitools.utils.stringutils as stringutils
@@ -514,10 +515,12 @@ def select_all_controllers():
 
 
 def get_all_controllers():
-    all_transforms = pm.ls(type=pm.nt.Transform)
+    inventory = invutils.get_active_scene_inventory()
+    all_transforms = inventory.get_nodes('transform') if inventory else pm.ls(type=pm.nt.Transform)
     controller_transform_nodes = [n for n in all_transforms if n.nodeName().lower().endswith('_ctr') or n.nodeName().lower().endswith('_ctrl')]
     set_members = []
-    for selection_set in pm.ls(type=pm.nt.ObjectSet):
+    object_sets = inventory.get_nodes('objectSet') if inventory else pm.ls(type=pm.nt.ObjectSet)
+    for selection_set in object_sets:
         # pm.ls(type=pm.nt.ObjectSet) returns a bunch of ShaderEngine nodes because they inherit from ObjectSet
         if not selection_set.type() == 'objectSet':
             continue
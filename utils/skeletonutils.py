@@ -1,3 +1,7 @@
+import collections
+from contextlib import contextmanager
+
+import numpy as np
 import maya.api.OpenMaya as om
 from pymel import core as pm
 
@@ -151,7 +155,12 @@ def get_joint_label(joint_node):
     return label_side, label_type, label_other_string
 
 
-def get_influence_map(source_influences, target_influences, mapping_methods=None):
+def get_influence_map(source_influences, target_influences, mapping_methods=None, influence_metadata=None):
+    """
+    :param influence_metadata: InfluenceMetadata shared by every mapping method.
+                               Pass one in to reuse it across calls. By default the one of an enclosing
+                               influence_metadata_cache() is used, or a new one for this call.
+    """
     # mapping methods should try to have one source to one target.
     # If there are more targets than sources then all sources should be used and extra targets are left unmapped.
     # If there are more sources than targets then targets should be used by multiple sources
@@ -163,70 +172,187 @@ def get_influence_map(source_influences, target_influences, mapping_methods=None
     influence_map = {}
     unmapped_target_infs = target_influences
     unmapped_source_infs = source_influences
-    for mapping_method in mapping_methods:
-        if not unmapped_source_infs:
-            # If every source influence has one target influence then we're done.
-            break
-        if not unmapped_target_infs:
-            # If we still have unmapped source influences but we've used all the target influences
-            # then we need to start re-using target influences until all sources have a target.
-            unmapped_target_infs = target_influences
-        influence_map, unmapped_target_infs, unmapped_source_infs = mapping_method(
-            unmapped_source_infs, unmapped_target_infs, influence_map)
+    with influence_metadata_cache(influence_metadata):
+        for mapping_method in mapping_methods:
+            if not unmapped_source_infs:
+                # If every source influence has one target influence then we're done.
+                break
+            if not unmapped_target_infs:
+                # If we still have unmapped source influences but we've used all the target influences
+                # then we need to start re-using target influences until all sources have a target.
+                unmapped_target_infs = target_influences
+            influence_map, unmapped_target_infs, unmapped_source_infs = mapping_method(
+                unmapped_source_infs, unmapped_target_infs, influence_map)
     return influence_map, unmapped_target_infs, unmapped_source_infs
 
 
+class InfluenceMetadata(object):
+    """
+    The joint label, name without namespace and world space position of influences.
+    Each is read from Maya the first time it is asked for and cached after that.
+    """
+    def __init__(self):
+        self._labels = {}
+        self._names = {}
+        self._positions = {}
+
+    def get_label(self, influence):
+        """Returns the influence's joint label. Influences that are not joints have no label."""
+        if influence not in self._labels:
+            try:
+                self._labels[influence] = get_joint_label(influence)
+            except AttributeError:
+                self._labels[influence] = (LABEL_SIDE_NONE, LABEL_INT_NONE, None)
+        return self._labels[influence]
+
+    def get_name(self, influence):
+        if influence not in self._names:
+            self._names[influence] = influence.nodeName(stripNamespace=True)
+        return self._names[influence]
+
+    def get_position(self, influence):
+        if influence not in self._positions:
+            self._positions[influence] = tuple(xformutils.get_worldspace_vector(influence))
+        return self._positions[influence]
+
+    def get_positions(self, influences):
+        """Returns the world space positions of influences shaped (len(influences), 3)."""
+        return np.array([self.get_position(inf) for inf in influences], dtype=np.float64).reshape(-1, 3)
+
+
+_active_influence_metadata = None
+
+
+@contextmanager
+def influence_metadata_cache(influence_metadata=None):
+    """Every update_inf_map_by_* call inside this context shares influence_metadata rather than making its own."""
+    global _active_influence_metadata
+    previous_metadata = _active_influence_metadata
+    _active_influence_metadata = influence_metadata or previous_metadata or InfluenceMetadata()
+    try:
+        yield _active_influence_metadata
+    finally:
+        _active_influence_metadata = previous_metadata
+
+
+def _get_influence_metadata():
+    return _active_influence_metadata or InfluenceMetadata()
+
+
 def update_inf_map_by_label(source_infs, target_infs, influence_map=None):
     """influence_map data structure: {source_inf: [target_inf1]}"""
-    def _match_label(source_influence, target_influences):
-        source_label_parts = get_joint_label(source_influence)
-        for target_inf in target_influences:
-            target_label_parts = get_joint_label(target_inf)
-            if target_label_parts[1] == LABEL_INT_NONE:
-                continue
-            if all([x == y for x, y in zip(source_label_parts, target_label_parts)]):
-                return target_inf
-    return _update_inf_map(source_infs, target_infs, influence_map, _match_label)
+    metadata = _get_influence_metadata()
 
+    def target_label(target_inf):
+        label = metadata.get_label(target_inf)
+        # unlabeled targets never match
+        return None if label[1] == LABEL_INT_NONE else label
+    return _update_inf_map_by_keys(source_infs, target_infs, influence_map,
+                                   [metadata.get_label(inf) for inf in source_infs],
+                                   [target_label(inf) for inf in target_infs])
 
-def update_inf_map_by_name(source_joints, target_joints, influence_map=None):
-    influence_map = influence_map or {}
 
-    def names_match(source_influence, target_influences):
-        for target_influence in target_influences:
-            if source_influence.nodeName(stripNamespace=True) == target_influence.nodeName(stripNamespace=True):
-                return target_influence
-    return _update_inf_map(source_joints, target_joints, influence_map, names_match)
+def update_inf_map_by_name(source_joints, target_joints, influence_map=None):
+    metadata = _get_influence_metadata()
+    return _update_inf_map_by_keys(source_joints, target_joints, influence_map,
+                                   [metadata.get_name(inf) for inf in source_joints],
+                                   [metadata.get_name(inf) for inf in target_joints])
 
 
 def update_inf_map_by_worldspace_position(source_joints, target_joints, influence_map=None, tolerance=0.001):
-    influence_map = influence_map or {}
-
-    def worldspace_position_matches(source_influence, target_influences):
-        source_pos = xformutils.get_worldspace_vector(source_influence)
-        for target_influence in target_influences:
-            if xformutils.node_almost_matches_worldspace_position(target_influence, source_pos, tolerance=tolerance):
-                return target_influence
-    return _update_inf_map(source_joints, target_joints, influence_map, worldspace_position_matches)
+    metadata = _get_influence_metadata()
+    matching_indexes = get_matching_position_indexes(metadata.get_positions(source_joints),
+                                                     metadata.get_positions(target_joints), tolerance=tolerance)
+    return _update_inf_map_by_indexes(source_joints, target_joints, influence_map, matching_indexes)
 
 
 def update_inf_map_by_closest_inf(source_infs, target_infs, influence_map=None):
-    influence_map = influence_map or {}
-
-    def find_closest_inf(source_influence, target_influences):
-        source_position = xformutils.get_worldspace_vector(source_influence)
-        min_dis = None
-        min_dis_target_inf = None
-        for target_influence in target_influences:
-            target_position = xformutils.get_worldspace_vector(target_influence)
-            distance = abs((source_position - target_position).length())
-            min_dis = min_dis or distance
-            min_dis_target_inf = min_dis_target_inf or target_influence
-            if distance < min_dis:
-                min_dis = distance
-                min_dis_target_inf = target_influence
-        return min_dis_target_inf
-    return _update_inf_map(source_infs, target_infs, influence_map, find_closest_inf)
+    metadata = _get_influence_metadata()
+    matching_indexes = get_closest_position_indexes(metadata.get_positions(source_infs),
+                                                    metadata.get_positions(target_infs))
+    return _update_inf_map_by_indexes(source_infs, target_infs, influence_map, matching_indexes)
+
+
+def get_matching_key_indexes(source_keys, target_keys):
+    """
+    Pairs each source key with the first unused target with an equal key, in source order.
+    Keys that are None never match.
+
+    :returns: list of (source index, target index) pairs.
+    """
+    key_to_target_indexes = {}
+    for target_index, target_key in enumerate(target_keys):
+        if target_key is not None:
+            key_to_target_indexes.setdefault(target_key, collections.deque()).append(target_index)
+    matching_indexes = []
+    for source_index, source_key in enumerate(source_keys):
+        target_indexes = key_to_target_indexes.get(source_key)
+        if target_indexes:
+            matching_indexes.append((source_index, target_indexes.popleft()))
+    return matching_indexes
+
+
+def get_matching_position_indexes(source_positions, target_positions, tolerance=0.001):
+    """
+    Pairs each source position with the first unused target position less than tolerance away, in source order.
+    Target positions are hashed into cells the size of tolerance so each source only checks its neighboring cells.
+
+    :returns: list of (source index, target index) pairs.
+    """
+    cell_to_target_indexes = {}
+    for target_index, target_cell in enumerate(np.floor(target_positions / tolerance).astype(np.int64).tolist()):
+        cell_to_target_indexes.setdefault(tuple(target_cell), []).append(target_index)
+    neighbor_offsets = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)]
+    used_targets = set()
+    matching_indexes = []
+    source_cells = np.floor(source_positions / tolerance).astype(np.int64).tolist()
+    for source_index, (x, y, z) in enumerate(source_cells):
+        candidates = []
+        for offset_x, offset_y, offset_z in neighbor_offsets:
+            candidates.extend(cell_to_target_indexes.get((x + offset_x, y + offset_y, z + offset_z), []))
+        candidates = sorted([i for i in candidates if i not in used_targets])
+        for target_index in candidates:
+            distance = np.linalg.norm(target_positions[target_index] - source_positions[source_index])
+            if distance < tolerance:
+                matching_indexes.append((source_index, target_index))
+                used_targets.add(target_index)
+                break
+    return matching_indexes
+
+
+def get_closest_position_indexes(source_positions, target_positions):
+    """
+    Pairs each source position with the closest unused target position, in source order.
+    Every source is paired until the targets run out.
+
+    :returns: list of (source index, target index) pairs.
+    """
+    if not len(source_positions) or not len(target_positions):
+        return []
+    # every distance is computed at once. After that each source only needs an argmin.
+    distances = np.linalg.norm(source_positions[:, np.newaxis] - target_positions[np.newaxis], axis=2)
+    matching_indexes = []
+    for source_index in range(min(len(source_positions), len(target_positions))):
+        target_index = int(distances[source_index].argmin())
+        matching_indexes.append((source_index, target_index))
+        distances[:, target_index] = np.inf
+    return matching_indexes
+
+
+def _update_inf_map_by_keys(source_infs, target_infs, influence_map, source_keys, target_keys):
+    matching_indexes = get_matching_key_indexes(source_keys, target_keys)
+    return _update_inf_map_by_indexes(source_infs, target_infs, influence_map, matching_indexes)
+
+
+def _update_inf_map_by_indexes(source_infs, target_infs, influence_map, matching_indexes):
+    inf_map = influence_map or {}
+    for source_index, target_index in matching_indexes:
+        append_target_to_influence_map(inf_map, source_infs[source_index], target_infs[target_index])
+    mapped_sources = set([source_index for source_index, _ in matching_indexes])
+    mapped_targets = set([target_index for _, target_index in matching_indexes])
+    unmapped_target_infs = [inf for i, inf in enumerate(target_infs) if i not in mapped_targets]
+    unmapped_source_infs = [inf for i, inf in enumerate(source_infs) if i not in mapped_sources]
+    return inf_map, unmapped_target_infs, unmapped_source_infs
 
 
 def update_inf_map_by_influence_order(source_joints, target_joints, influence_map=None):
@@ -247,19 +373,6 @@ def append_target_to_influence_map(influence_map, map_key, value_to_append):
         source_inf_value.append(value_to_append)
 
 
-def _update_inf_map(source_infs, target_infs, influence_map=None, get_matching_influence_method=None):
-    inf_map = influence_map or {}
-    unmapped_target_infs = target_infs[:]
-    unmapped_source_infs = source_infs[:]
-    for source_inf in source_infs:
-        matching_target_inf = get_matching_influence_method(source_inf, unmapped_target_infs)
-        if matching_target_inf:
-            append_target_to_influence_map(inf_map, source_inf, matching_target_inf)
-            unmapped_target_infs.remove(matching_target_inf)
-            unmapped_source_infs.remove(source_inf)
-    return inf_map, unmapped_target_infs, unmapped_source_infs
-
-
 def duplicate_skeleton(root_joint, dup_parent=None, dup_namespace=None):
     dup_namespace = dup_namespace or pm.namespaceInfo(currentNamespace=True)
     dup_root = namespaceutils.duplicate_to_namespace(
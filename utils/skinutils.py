@@ -1,13 +1,20 @@
+import collections
+import concurrent.futures
 from contextlib import contextmanager
 
+import numpy as np
 import maya.api.OpenMaya as om
 import maya.api.OpenMayaAnim as omanim
 import pymel.core as pm
 
+import flottitools.utils.inventoryutils as invutils
 import flottitools.utils.meshutils as meshutils
 import flottitools.utils.namespaceutils as nsutils
+import flottitools.utils.openmayautils as omutils
 import flottitools.utils.selectionutils as selutils
 import flottitools.utils.skeletonutils as skelutils
+import flottitools.utils.skinweightscmd as skinweightscmd
+import flottitools.utils.spatialutils as spatialutils
 
 
 DEFAULT_SKINCLUSTER_KWARGS = {'bindMethod': 0,
@@ -18,6 +25,11 @@ DEFAULT_SKINCLUSTER_KWARGS = {'bindMethod': 0,
                               'dropoffRate': 4,
                               'removeUnusedInfluence': False}
 FALLBACK_MESH_NAME = 'fallback{}'.format(meshutils.MESH_SUFFIX)
+SURFACE_ASSOCIATION_VERT_ORDER = 'vertexOrder'
+SURFACE_ASSOCIATION_CLOSEST_POINT = 'closestPoint'
+SURFACE_ASSOCIATION_CLOSEST_VERTEX = 'closestComponent'
+# how far the total weight of a vertex may be from 1.0 before it counts as not normalized
+NORMALIZED_TOLERANCE = .000001
 
 
 def get_skincluster(pynode):
@@ -27,6 +39,10 @@ def get_skincluster(pynode):
     :param pynode: Any pynode that has a skinCluster connected to it.
     :return: nt.SkinCluster
     """
+    inventory = invutils.get_active_scene_inventory()
+    skin_cluster = inventory.get_skin_cluster(pynode) if inventory else None
+    if skin_cluster:
+        return skin_cluster
     try:
         shape_node = pynode.getShape()
     except AttributeError:
@@ -119,15 +135,15 @@ def bind_mesh_delta_mush(mesh, joints, cleanup=False, **skinCluster_kwargs):
 
 def get_vert_indexes_with_exceeding_influences(skinned_mesh, skin_cluster=None, max_influences=4):
     skin_cluster = skin_cluster or get_skincluster(skinned_mesh)
-    exceeding_verts = {}
-    verts_to_weighted_influences = get_vert_indexes_to_weighted_influences(skin_cluster)
-    for vert, influences_to_weights in verts_to_weighted_influences.items():
-        if len(influences_to_weights.values()) > max_influences:
-            exceeding_verts[vert] = influences_to_weights
-    return exceeding_verts
+    skin_weights = SkinWeights.from_skin_cluster(skin_cluster)
+    exceeding_rows = np.flatnonzero(skin_weights.nonzero_counts() > max_influences)
+    return skin_weights.to_dict(exceeding_rows)
 
 
 def get_skinned_meshes_from_scene():
+    inventory = invutils.get_active_scene_inventory()
+    if inventory:
+        return inventory.get_skinned_mesh_transforms()
     skinned_meshes = _get_skinned_meshes()
     return skinned_meshes
 
@@ -159,19 +175,75 @@ def prune_exceeding_influences_vertex(vertex, skin_cluster=None, influences_to_w
     skin_cluster = skin_cluster or get_skincluster(vertex)
     influences_to_weights = influences_to_weights or get_weighted_influences(vertex, skin_cluster)
     pruned_infs_to_weights = get_pruned_influences_to_weights(influences_to_weights, max_influences=max_influences)
-    pm.skinPercent(skin_cluster, vertex, transformValue=pruned_infs_to_weights.items())
+    set_weights({vertex.index(): pruned_infs_to_weights}, skin_cluster=skin_cluster)
 
 
 def prune_exceeding_skinned_mesh(skinned_mesh, vert_indexes_to_infs_and_wts=None, skincluster=None, max_influences=4):
+    """Prunes and renormalizes every vertex of skinned_mesh that exceeds max_influences in a single setWeights call.
+
+    :param vert_indexes_to_infs_and_wts: {vert_index: {influence: weight}} like get_vert_indexes_with_exceeding_influences
+                                         returns. Only its vertex indexes are used to limit which vertices are read.
+                                         If None every vertex is checked.
+    """
     skincluster = skincluster or get_skincluster(skinned_mesh)
-    vert_indexes_to_infs_and_wts = vert_indexes_to_infs_and_wts or get_vert_indexes_with_exceeding_influences(
-        skinned_mesh)
-    with max_influences_normalize_weights_disabled(skincluster, normalize_on_exit=True):
-        pruned_verts_to_infs_wts = {}
-        for vert_index, infs_to_wts in vert_indexes_to_infs_and_wts.items():
-            pruned_infs_to_weights = get_pruned_influences_to_weights(infs_to_wts, max_influences=max_influences)
-            pruned_verts_to_infs_wts[vert_index] = pruned_infs_to_weights
-        set_weights(pruned_verts_to_infs_wts, skinned_mesh=skinned_mesh, skin_cluster=skincluster)
+    vertices = None
+    if vert_indexes_to_infs_and_wts:
+        vertices = list(vert_indexes_to_infs_and_wts.keys())
+    skin_weights = SkinWeights.from_skin_cluster(skincluster, vertices)
+    pruned_rows = skin_weights.prune(max_influences=max_influences)
+    if not len(pruned_rows):
+        return
+    with max_influences_normalize_weights_disabled(skincluster):
+        skin_weights.apply(pruned_rows, normalize=False)
+
+
+def prune_weights(weights, max_influences=4, tie_break_ranks=None, normalize=True):
+    """Vectorized get_pruned_influences_to_weights for a (vertices x influences) weights array.
+
+    Only rows with more than max_influences non-zero weights are changed. The same tie-breaking rules are used:
+    when the weights either side of the max_influences cut-off are equal both are pruned, and if too many equal
+    weights survive the ones with the lowest tie_break_ranks are kept.
+
+    :param weights: numpy array shaped (vertex_count, influence_count). It is modified in place.
+    :param tie_break_ranks: sort order of each influence column. If None the column order is used.
+    :param normalize: renormalize the pruned rows.
+    :returns: indexes of the rows that were pruned.
+    """
+    exceeding_rows = np.flatnonzero(np.count_nonzero(weights, axis=1) > max_influences)
+    if not len(exceeding_rows) or max_influences < 1:
+        return exceeding_rows
+    inf_count = weights.shape[1]
+    if tie_break_ranks is None:
+        tie_break_ranks = np.arange(inf_count)
+    tie_break_ranks = np.asarray(tie_break_ranks)
+    exceeding = weights[exceeding_rows]
+
+    # the highest max_influences+1 weights of each row sorted from highest to lowest
+    kth = np.arange(max_influences + 1)
+    sorted_weights = -np.partition(-exceeding, kth, axis=1)[:, :max_influences + 1]
+    prune_vals = sorted_weights[:, max_influences - 1]
+    tied = sorted_weights[:, max_influences - 1] == sorted_weights[:, max_influences]
+    if max_influences > 1:
+        tied_prune_vals = sorted_weights[:, max_influences - 2]
+    else:
+        # get_pruned_influences_to_weights falls back to the lowest weight in the row
+        tied_prune_vals = np.where(exceeding != 0.0, exceeding, np.inf).min(axis=1)
+    prune_vals = np.where(tied, tied_prune_vals, prune_vals)
+    keep = (exceeding >= prune_vals[:, np.newaxis]) & (exceeding != 0.0)
+
+    # very rare edge case where too many influences have equal weight and exceed max
+    too_many = np.flatnonzero(np.count_nonzero(keep, axis=1) > max_influences)
+    if len(too_many):
+        ranks = np.where(keep[too_many], tie_break_ranks[np.newaxis, :], inf_count)
+        kept_columns = np.argpartition(ranks, max_influences - 1, axis=1)[:, :max_influences]
+        keep[too_many] = False
+        keep[too_many[:, np.newaxis], kept_columns] = True
+
+    exceeding = np.where(keep, exceeding, 0.0)
+    if normalize:
+        exceeding /= exceeding.sum(axis=1)[:, np.newaxis]
+    weights[exceeding_rows] = exceeding
+    return exceeding_rows
 
 
 def get_pruned_influences_to_weights(influences_to_weights, max_influences=4, divisor=1.0):
@@ -200,16 +272,19 @@ def get_pruned_influences_to_weights(influences_to_weights, max_influences=4, di
     return pruned_inf_to_weight
 
 
-def get_non_normalized_vert_indexes(vertices, skin_cluster=None, tolerance=.000001):
+def get_non_normalized_vert_indexes(vertices=None, skin_cluster=None, tolerance=NORMALIZED_TOLERANCE):
+    """
+    Returns {vert_index: total_weight} of every vertex whose weights don't add up to 1.0.
+
+    :param vertices: PyNode MeshVertex, a list of them or a list of vertex indexes.
+                     If None check every vertex of skin_cluster's mesh.
+    """
     skin_cluster = skin_cluster or get_skincluster(vertices[0])
-    non_normalized_vert_indexes_to_total_weight = {}
-    vert_inf_wts = get_vert_indexes_to_weighted_influences(skin_cluster, vertices)
-    for vert_index, infs_wts in vert_inf_wts.items():
-        weights = infs_wts.values()
-        total_weight = sum(weights)
-        if abs(total_weight - 1.0) > tolerance:
-            non_normalized_vert_indexes_to_total_weight[vert_index] = total_weight
-    return non_normalized_vert_indexes_to_total_weight
+    skin_weights = SkinWeights.from_skin_cluster(skin_cluster, vertices)
+    total_weights = skin_weights.row_sums()
+    non_normalized_rows = skin_weights.get_non_normalized_rows(tolerance)
+    return dict(zip(skin_weights.vert_indexes[non_normalized_rows].tolist(),
+                    total_weights[non_normalized_rows].tolist()))
 
 
 def move_weight_to_parent_and_remove_influence(influence_origin, skin_cluster):
@@ -239,7 +314,7 @@ def remove_influences_from_skincluster(skin_cluster, influences):
 def move_weights_single_vert(skin_cluster, vertex, origin_inf, destination_inf):
     """Sets origin_inf weight to 0.0 and adds its original weight to destination_inf."""
     infs_to_weights = get_move_weights_data(skin_cluster, vertex, origin_inf, destination_inf)
-    pm.skinPercent(skin_cluster, vertex, transformValue=infs_to_weights.items())
+    set_weights({vertex.index(): infs_to_weights}, skin_cluster=skin_cluster)
 
 
 def get_move_weights_data(skin_cluster, vertex, origin_inf, destination_inf):
@@ -261,10 +336,22 @@ def normalize_skinned_meshes(skinned_meshes):
         normalize_skinned_mesh(skinned_mesh)
 
 
-def normalize_skinned_mesh(skinned_mesh):
-    skin_cluster = get_skincluster(skinned_mesh)
-    skin_cluster.forceNormalizeWeights()
-    skin_cluster.setNormalizeWeights(1)
+def normalize_skinned_mesh(skinned_mesh, vert_indexes=None, skin_cluster=None, tolerance=NORMALIZED_TOLERANCE):
+    """Normalizes only the vertices whose weights don't add up to 1.0, in a single setWeights call.
+
+    :param vert_indexes: only read and normalize these vertices. If None check every vertex.
+    :returns: indexes of the vertices that were normalized.
+    """
+    skin_cluster = skin_cluster or get_skincluster(skinned_mesh)
+    if vert_indexes is not None and not len(vert_indexes):
+        return np.array([], dtype=np.int64)
+    skin_weights = SkinWeights.from_skin_cluster(skin_cluster, vert_indexes)
+    rows = skin_weights.get_non_normalized_rows(tolerance)
+    skin_weights.normalize(rows)
+    with pm.UndoChunk():
+        skin_weights.apply(rows, normalize=False)
+        skin_cluster.setNormalizeWeights(1)
+    return skin_weights.vert_indexes[rows]
 
 
 def apply_delta_mush_skinning(skinned_mesh, skin_cluster=None, max_influences=4,
@@ -360,11 +447,12 @@ def bake_deformer_to_skin(source_mesh, target_mesh, source_skeleton=None, target
     target_skin_cluster = get_skincluster(target_mesh)
     if cleanup:
         # bakeDeformer does not seem to respect max influences or normalize weights.
-        # these cleanup operations are behind a feature flag because they are very slow, but effective.
         prune_exceeding_skinned_mesh(target_mesh, skincluster=target_skin_cluster, max_influences=max_influences)
-        target_skin_cluster.forceNormalizeWeights()
-    pm.warning(
-        "Bake Deformer process complete. You should probably save your work and restart Maya now. This process takes tons of memory and does not give it back when it's done.")
+        # normalize without normalize_skinned_mesh, which would also change the skinCluster's normalize mode
+        skin_weights = SkinWeights.from_skin_cluster(target_skin_cluster)
+        rows = skin_weights.get_non_normalized_rows()
+        skin_weights.normalize(rows)
+        skin_weights.apply(rows, normalize=False)
     return target_skin_cluster
 
 
@@ -394,6 +482,9 @@ def copy_weights_uv_space(source_mesh, target_nodes, **copySkinWeights_kwargs):
 
 def get_root_joint_from_skinned_mesh(skinned_mesh):
     skin_cluster = get_skincluster(skinned_mesh)
+    inventory = invutils.get_active_scene_inventory()
+    if inventory:
+        return inventory.get_root_joint(skin_cluster)
     influences = skin_cluster.getInfluence()
     return skelutils.get_root_joint_from_child(influences[0])
 
@@ -472,6 +563,52 @@ def copy_weights_vert_order_inf_order(source_mesh, target_mesh, source_skinclust
                             source_skincluster=source_skincluster, target_skincluster=target_skincluster)
 
 
+def copy_weights_closest_point(source_mesh, target_mesh, influence_map=None, mapping_methods=None,
+                               source_skincluster=None, target_skincluster=None, vertices=None):
+    """Like copy_weights with surfaceAssociation closestPoint.
+    Each target vertex gets the weights of the closest point on the source mesh's surface interpolated
+    from the corners of its triangle, and the whole result is set in a single setWeights call.
+
+    :param vertices: only copy weights to these target vertices.
+    """
+    return _copy_weights_by_proximity(source_mesh, target_mesh, influence_map, mapping_methods,
+                                      source_skincluster, target_skincluster, vertices, closest_vertex=False)
+
+
+def copy_weights_closest_vertex(source_mesh, target_mesh, influence_map=None, mapping_methods=None,
+                                source_skincluster=None, target_skincluster=None, vertices=None):
+    """Like copy_weights with surfaceAssociation closestComponent. Each target vertex gets the weights of the
+    closest source vertex.
+
+    :param vertices: only copy weights to these target vertices.
+    """
+    return _copy_weights_by_proximity(source_mesh, target_mesh, influence_map, mapping_methods,
+                                      source_skincluster, target_skincluster, vertices, closest_vertex=True)
+
+
+def _copy_weights_by_proximity(source_mesh, target_mesh, influence_map, mapping_methods,
+                               source_skincluster, target_skincluster, vertices, closest_vertex):
+    surface_association = SURFACE_ASSOCIATION_CLOSEST_VERTEX if closest_vertex else SURFACE_ASSOCIATION_CLOSEST_POINT
+    transfer = SkinWeightTransfer(source_mesh, source_skincluster=source_skincluster)
+    return transfer.copy_to(target_mesh, surface_association, influence_map=influence_map,
+                            mapping_methods=mapping_methods, target_skincluster=target_skincluster,
+                            vertices=vertices)
+
+
+def get_influence_map_matrix(influence_map, source_influences, target_influences):
+    """Returns influence_map as an array shaped (len(source_influences), len(target_influences)).
+    Multiplying source weights by it moves every source weight to its mapped target influences.
+
+    :param influence_map: {source_inf: [target_inf1]} like skelutils.get_influence_map returns.
+    """
+    target_to_column = dict([(inf, i) for i, inf in enumerate(target_influences)])
+    matrix = np.zeros((len(source_influences), len(target_influences)), dtype=np.float64)
+    for row, source_inf in enumerate(source_influences):
+        for target_inf in influence_map.get(source_inf, []):
+            matrix[row, target_to_column[target_inf]] = 1.0
+    return matrix
+
+
 def update_inf_map_by_skincluster_index(source_influences, target_influences,
                                         source_skincluster, target_skincluster, influence_map=None):
     influence_map = influence_map or {}
@@ -500,6 +637,20 @@ def get_bind_pose_from_skincluster(skin_cluster):
         return
 
 
+def get_bind_matrices(skin_cluster, influence_indexes=None):
+    """
+    Returns the world space bind matrix of each influence shaped (influence_count, 4, 4).
+
+    :param influence_indexes: skinCluster logical influence indexes. Defaults to every influence.
+    """
+    if influence_indexes is None:
+        influence_indexes = [skin_cluster.indexForInfluenceObject(inf) for inf in skin_cluster.influenceObjects()]
+    bind_pre_matrices = [skin_cluster.bindPreMatrix[int(i)].get() for i in influence_indexes]
+    bind_pre_matrices = np.array(bind_pre_matrices, dtype=np.float64).reshape(-1, 4, 4)
+    # bindPreMatrix is the inverse of the influence's world matrix at bind time
+    return np.linalg.inv(bind_pre_matrices)
+
+
 def get_skinned_meshes_from_selection():
     sel = pm.selected()
     return [x for x in sel if get_skincluster(x)]
@@ -527,129 +678,405 @@ def duplicate_triangulate_mesh(skinned_mesh, dup_namespace=None, dup_parent=None
     return dup_skinned_mesh_tri, dup_skin_cluster
 
 
+class SkinWeights(object):
+    """
+    A skinCluster's weights as a (vertices x influences) float array.
+
+    The weights are read with a single MFnSkinCluster.getWeights() call rather than walking the
+    weightList plugs one vertex and one influence at a time.
+    Columns follow the order of skinCluster.influenceObjects(). Because influence indices can diverge from that
+    order once influences have been removed, the logical index of each column is kept in influence_indexes.
+    """
+    def __init__(self, skin_cluster, weights, vert_indexes, influences, influence_indexes):
+        """
+        :param skin_cluster: PyNode SkinCluster
+        :param weights: numpy array shaped (len(vert_indexes), len(influences))
+        :param vert_indexes: numpy array of the vertex index of each row. Sorted and unique.
+        :param influences: PyNode influences in skinCluster.influenceObjects() order.
+        :param influence_indexes: numpy array of the skinCluster's logical index for each influence.
+        """
+        self.skin_cluster = skin_cluster
+        self.weights = weights
+        self.vert_indexes = vert_indexes
+        self.influences = influences
+        self.influence_indexes = influence_indexes
+        self.influence_to_column = dict([(inf, i) for i, inf in enumerate(influences)])
+
+    @classmethod
+    def from_skin_cluster(cls, skin_cluster, vertices=None):
+        """
+        :param skin_cluster: PyNode SkinCluster
+        :param vertices: PyNode MeshVertex, a list of them or a list of vertex indexes.
+                         If None read every vertex of the skinned mesh.
+        """
+        fn_skincl = get_mfn_skincluster(skin_cluster)
+        mesh_path = get_mesh_path_from_mfn_skincluster(fn_skincl)
+        inf_dags = fn_skincl.influenceObjects()
+        influences = [pm.PyNode(inf_dag) for inf_dag in inf_dags]
+        influence_indexes = np.array([fn_skincl.indexForInfluenceObject(inf_dag) for inf_dag in inf_dags],
+                                     dtype=np.int64)
+        if vertices is not None and len(vertices):
+            vert_indexes = np.unique(np.array(get_vert_indexes(vertices), dtype=np.int64))
+        else:
+            vert_indexes = np.arange(om.MFnMesh(mesh_path).numVertices, dtype=np.int64)
+        vertex_comp = omutils.create_vertex_component(vert_indexes)
+        weight_data = fn_skincl.getWeights(mesh_path, vertex_comp)[0]
+        weights = np.array(weight_data, dtype=np.float64).reshape(len(vert_indexes), len(influences))
+        return cls(skin_cluster, weights, vert_indexes, influences, influence_indexes)
+
+    def rows_from_vert_indexes(self, vert_indexes):
+        """Returns the row of each vertex index. Raises KeyError for vertices that were not read."""
+        vert_indexes = np.asarray(vert_indexes, dtype=np.int64)
+        rows = np.searchsorted(self.vert_indexes, vert_indexes)
+        rows = np.minimum(rows, len(self.vert_indexes) - 1)
+        if len(vert_indexes) and (not len(self.vert_indexes) or np.any(self.vert_indexes[rows] != vert_indexes)):
+            raise KeyError('Not all vertex indexes were read from {}.'.format(self.skin_cluster))
+        return rows
+
+    def row_sums(self):
+        return self.weights.sum(axis=1)
+
+    def nonzero_counts(self):
+        return np.count_nonzero(self.weights, axis=1)
+
+    def get_non_normalized_rows(self, tolerance=NORMALIZED_TOLERANCE):
+        return np.flatnonzero(np.abs(self.row_sums() - 1.0) > tolerance)
+
+    def normalize(self, rows=None):
+        """Scales rows (or every row if None) in place so they add up to 1.0. Rows without weights are left alone."""
+        rows = np.arange(len(self.vert_indexes)) if rows is None else np.asarray(rows, dtype=np.int64)
+        totals = self.weights[rows].sum(axis=1)
+        rows = rows[totals > 0.0]
+        self.weights[rows] /= totals[totals > 0.0][:, np.newaxis]
+
+    def top_k(self, k):
+        """
+        Returns the columns and weights of the k highest weighted influences of every row,
+        each sorted from highest to lowest weight.
+
+        :returns: (columns, weights) both shaped (vertex_count, min(k, influence_count))
+        """
+        k = min(k, self.weights.shape[1])
+        if k < self.weights.shape[1]:
+            columns = np.argpartition(-self.weights, k - 1, axis=1)[:, :k]
+        else:
+            columns = np.tile(np.arange(k), (self.weights.shape[0], 1))
+        top_weights = np.take_along_axis(self.weights, columns, axis=1)
+        order = np.argsort(-top_weights, axis=1, kind='stable')
+        return np.take_along_axis(columns, order, axis=1), np.take_along_axis(top_weights, order, axis=1)
+
+    def get_tie_break_ranks(self):
+        """Returns the position of each influence column when influences are sorted by name."""
+        names = [str(inf) for inf in self.influences]
+        ranks = np.empty(len(names), dtype=np.int64)
+        ranks[sorted(range(len(names)), key=names.__getitem__)] = np.arange(len(names))
+        return ranks
+
+    def prune(self, max_influences=4, normalize=True):
+        """Prunes every row that exceeds max_influences in place. See prune_weights().
+
+        :returns: indexes of the rows that were pruned.
+        """
+        return prune_weights(self.weights, max_influences=max_influences,
+                             tie_break_ranks=self.get_tie_break_ranks(), normalize=normalize)
+
+    def apply(self, rows=None, normalize=True):
+        """Writes rows (or every row if None) back to the skinCluster in a single setWeights call."""
+        if rows is None:
+            rows = np.arange(len(self.vert_indexes))
+        set_weights_array(self.skin_cluster, self.vert_indexes[rows], self.weights[rows], normalize=normalize)
+
+    def to_dict(self, rows=None):
+        """
+        Returns {vert_index: {influence: weight}} for rows (or every row if None).
+        Only influences that have non-zero weights are included.
+        """
+        if rows is None:
+            rows = np.arange(len(self.vert_indexes))
+        rows = np.asarray(rows, dtype=np.int64)
+        vert_index_to_infs_wts = dict([(vert_index, {}) for vert_index in self.vert_indexes[rows].tolist()])
+        nonzero_rows, nonzero_columns = np.nonzero(self.weights[rows])
+        vert_indexes = self.vert_indexes[rows][nonzero_rows].tolist()
+        weights = self.weights[rows[nonzero_rows], nonzero_columns].tolist()
+        for vert_index, column, weight in zip(vert_indexes, nonzero_columns.tolist(), weights):
+            vert_index_to_infs_wts[vert_index][self.influences[column]] = weight
+        return vert_index_to_infs_wts
+
+
+# everything SkinWeightTransfer reads from Maya for one target mesh
+_CopyJob = collections.namedtuple('_CopyJob', ['target_mesh', 'target_skincluster', 'target_points',
+                                               'influence_map_matrix', 'surface_association',
+                                               'target_vert_indexes'])
+
+
+class SkinWeightTransfer(object):
+    """
+    The source side of a weight copy: its weights, points and spatial index are gathered once and reused
+    for every target mesh copied to.
+
+    Influence maps are cached by target influences, so targets bound to the same joints only map them once.
+    """
+    def __init__(self, source_mesh, source_skincluster=None, default_mapping_methods=None):
+        """
+        :param default_mapping_methods: skeletonutils influence mapping methods used when copy_to() is not given any.
+                                        Defaults to the same influenceAssociation copy_weights uses.
+        """
+        self.source_mesh = source_mesh
+        self.source_skincluster = source_skincluster or get_skincluster(source_mesh)
+        self.source_weights = SkinWeights.from_skin_cluster(self.source_skincluster)
+        self.default_mapping_methods = default_mapping_methods or [skelutils.update_inf_map_by_label,
+                                                                   skelutils.update_inf_map_by_name,
+                                                                   skelutils.update_inf_map_by_closest_inf]
+        self._source_points = None
+        self._source_triangles = None
+        self._grids = {}
+        self._influence_map_matrices = {}
+        # source influences are only read from Maya once however many targets they are mapped to
+        self.influence_metadata = skelutils.InfluenceMetadata()
+
+    @property
+    def source_points(self):
+        if self._source_points is None:
+            self._source_points = meshutils.get_points_array(self.source_mesh)
+        return self._source_points
+
+    @property
+    def source_triangles(self):
+        if self._source_triangles is None:
+            self._source_triangles = meshutils.get_triangles_array(self.source_mesh)
+        return self._source_triangles
+
+    def get_grid(self, surface_association):
+        """Returns the spatial index of the source mesh for surface_association. It is built on first use."""
+        if surface_association not in self._grids:
+            if surface_association == SURFACE_ASSOCIATION_CLOSEST_VERTEX:
+                self._grids[surface_association] = spatialutils.TriangleGrid.from_points(self.source_points)
+            else:
+                self._grids[surface_association] = spatialutils.TriangleGrid(self.source_points,
+                                                                             self.source_triangles)
+        return self._grids[surface_association]
+
+    def get_influence_map_matrix(self, target_influences, mapping_methods=None, influence_map=None):
+        mapping_methods = mapping_methods or self.default_mapping_methods
+        if influence_map is not None:
+            return get_influence_map_matrix(influence_map, self.source_weights.influences, target_influences)
+        key = (tuple(target_influences), tuple(mapping_methods))
+        if key not in self._influence_map_matrices:
+            influence_map, _, _ = skelutils.get_influence_map(self.source_weights.influences, target_influences,
+                                                              mapping_methods,
+                                                              influence_metadata=self.influence_metadata)
+            self._influence_map_matrices[key] = get_influence_map_matrix(
+                influence_map, self.source_weights.influences, target_influences)
+        return self._influence_map_matrices[key]
+
+    def get_weights(self, target_points, influence_map_matrix, surface_association, target_vert_indexes=None):
+        """
+        Returns the source weights moved onto target points, shaped (len(target_vert_indexes), target influence count).
+        Does not touch Maya, so it can run on a worker thread.
+
+        :param target_points: every target vertex position shaped (vertex_count, 3).
+        :param target_vert_indexes: target vertices to return weights for. Defaults to every vertex.
+        """
+        if target_vert_indexes is None:
+            target_vert_indexes = np.arange(len(target_points))
+        source_weights = self.source_weights.weights
+        if surface_association == SURFACE_ASSOCIATION_VERT_ORDER:
+            weights = source_weights[target_vert_indexes]
+        elif surface_association == SURFACE_ASSOCIATION_CLOSEST_VERTEX:
+            closest_verts, _ = self.get_grid(surface_association).closest_triangles(target_points[target_vert_indexes])
+            weights = source_weights[closest_verts]
+        else:
+            closest_triangles, barycentrics = self.get_grid(surface_association).closest_triangles(
+                target_points[target_vert_indexes])
+            corners = self.source_triangles[closest_triangles]
+            weights = source_weights[corners[:, 0]] * barycentrics[:, 0:1]
+            weights += source_weights[corners[:, 1]] * barycentrics[:, 1:2]
+            weights += source_weights[corners[:, 2]] * barycentrics[:, 2:3]
+        return np.dot(weights, influence_map_matrix)
+
+    def copy_to(self, target_mesh, surface_association=SURFACE_ASSOCIATION_CLOSEST_POINT, influence_map=None,
+                mapping_methods=None, target_skincluster=None, vertices=None):
+        """
+        Copies the source weights to target_mesh in a single setWeights call.
+
+        :param vertices: only copy weights to these target vertices.
+        :returns: size in bytes of the undo record.
+        """
+        job = self._get_copy_job(target_mesh, surface_association, influence_map, mapping_methods,
+                                 target_skincluster, vertices)
+        return self._write(job, self._get_job_weights(job))
+
+    def copy_to_meshes(self, target_meshes, surface_association=SURFACE_ASSOCIATION_CLOSEST_POINT,
+                       mapping_methods=None, max_workers=None):
+        """
+        Copies the source weights to every target mesh.
+
+        Maya is only read from and written to on the calling thread. With max_workers the NumPy work for
+        each target runs on a thread pool while the other targets are being read and written.
+
+        :param max_workers: number of worker threads. If None every target is copied in turn.
+        :returns: list of target meshes that were copied to.
+        """
+        jobs = [self._get_copy_job(target_mesh, surface_association, None, mapping_methods, None, None)
+                for target_mesh in target_meshes]
+        if not max_workers:
+            [self._write(job, self._get_job_weights(job)) for job in jobs]
+            return [job.target_mesh for job in jobs]
+        if surface_association != SURFACE_ASSOCIATION_VERT_ORDER:
+            # build the index before the workers share it
+            self.get_grid(surface_association)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_job = dict([(executor.submit(self._get_job_weights, job), job) for job in jobs])
+            for future in concurrent.futures.as_completed(future_to_job):
+                self._write(future_to_job[future], future.result())
+        return [job.target_mesh for job in jobs]
+
+    def _get_copy_job(self, target_mesh, surface_association, influence_map, mapping_methods,
+                      target_skincluster, vertices):
+        target_skincluster = target_skincluster or get_skincluster(target_mesh)
+        target_influences = target_skincluster.influenceObjects()
+        influence_map_matrix = self.get_influence_map_matrix(target_influences, mapping_methods, influence_map)
+        target_points = meshutils.get_points_array(target_mesh)
+        target_vert_indexes = np.arange(len(target_points))
+        if vertices is not None:
+            target_vert_indexes = np.unique(get_vert_indexes(vertices))
+        if surface_association == SURFACE_ASSOCIATION_VERT_ORDER:
+            target_vert_indexes = target_vert_indexes[target_vert_indexes < len(self.source_weights.vert_indexes)]
+        return _CopyJob(target_mesh, target_skincluster, target_points, influence_map_matrix, surface_association,
+                        target_vert_indexes)
+
+    def _get_job_weights(self, job):
+        return self.get_weights(job.target_points, job.influence_map_matrix, job.surface_association,
+                                job.target_vert_indexes)
+
+    @staticmethod
+    def _write(job, weights):
+        if job.target_skincluster.maintainMaxInfluences.get():
+            # interpolating between vertices can add influences
+            prune_weights(weights, max_influences=job.target_skincluster.maxInfluences.get())
+        return set_weights_array(job.target_skincluster, job.target_vert_indexes, weights)
+
+
+def get_vert_indexes(vertices):
+    """Returns a flat list of vertex indexes from a PyNode MeshVertex, a list of them or a list of ints."""
+    try:
+        return list(vertices.indices())
+    except AttributeError:
+        pass
+    vert_indexes = []
+    for vertex in vertices:
+        try:
+            vert_indexes.extend(vertex.indices())
+        except AttributeError:
+            vert_indexes.append(int(vertex))
+    return vert_indexes
+
+
+def get_mfn_skincluster(skin_cluster):
+    skincl_depend_node = get_dagpath_or_dependnode_from_name(skin_cluster.name())
+    return omanim.MFnSkinCluster(skincl_depend_node)
+
+
+def get_mesh_path_from_mfn_skincluster(fn_skincl):
+    output_shapes = fn_skincl.getOutputGeometry()
+    return om.MDagPath.getAPathTo(output_shapes[0])
+
+
 def get_vert_indexes_to_weighted_influences(skin_cluster, vertices=None):
     """
     Return a dictionary of vertex indices as keys and influence to weights dictionaries as values.
     Only returns influences that have greater-than zero weights.
 
-    Original code from Tyler Thorncok https://www.charactersetup.com/tutorial_skinWeights.html
-    Tweaked to use PyNode influences and only check the vertices passed in (or all vertices if None).
-    Refactored to use latest OpenMaya API instead of the old one.
+    This is a view over SkinWeights. Use SkinWeights directly when working with many vertices.
 
     :param skin_cluster: PyNode SkinCluster
     :param vertices: PyNode MeshVertex Return weights for only the vertices provided.
                      If None return values for all vertices.
     :returns: {vert_index: {influence: weight_value}}
     """
-    skincl_depend_node = get_dagpath_or_dependnode_from_name(skin_cluster.name())
-    fn_skincl = omanim.MFnSkinCluster(skincl_depend_node)
-
-    # get the MDagPath for all influence
-    inf_dags = fn_skincl.influenceObjects()
-
-    # Get PyNodes for influences.
-    # They have the advantage of containing more information like the influence name.
-    # Their index can be derived from the skinCluster using skin_cluster.indexForInfluenceObject(influence)
-    influences = [pm.PyNode(inf_dag) for inf_dag in inf_dags]
-    # need a influence index to influences mapping because influence indices can diverge from the order they come from
-    # skinCluster.influenceObjects() if methods like removeInfluence() have been used on the skinCluster before.
-    inf_index_to_infs = {}
-    for influence in influences:
-        inf_index = get_influence_index(influence, skin_cluster)
-        inf_index_to_infs[inf_index] = influence
-
-    # get the MPlug for the weightList and weights attributes
-    weight_list_plug = fn_skincl.findPlug('weightList', True)
-    weights_plug = fn_skincl.findPlug('weights', True)
-    wlAttr = weight_list_plug.attribute()
-    wAttr = weights_plug.attribute()
-
-    # the weights are stored in dictionary, the key is the vertId,
-    # the value is another dictionary whose key is the influence id and
-    # value is the weight for that influence
-    vert_index_to_infs_wts = {}
-    if vertices:
-        # get influences and weights for only the vertices passed in
-        vert_indices = [v.index() for v in vertices]
-    else:
-        # get influences and weights for all vertices affected by the skin_cluster
-        vert_indices = range(weight_list_plug.numElements())
-    for vert_index in vert_indices:
-        infs_to_weights = {}
-        # tell the weights attribute which vertex id it represents
-        weights_plug.selectAncestorLogicalIndex(vert_index, wlAttr)
-        # get the indices of all non-zero weights for this vert
-        inf_indices = weights_plug.getExistingArrayAttributeIndices()
-        # create a copy of the current wPlug
-        # infPlug = OpenMaya.MPlug(weights_plug)
-        inf_plug = om.MPlug()
-        inf_plug.copy(weights_plug)
-        for inf_index in inf_indices:
-            # tell the infPlug it represents the current influence id
-            inf_plug.selectAncestorLogicalIndex(inf_index, wAttr)
-            # add this influence and its weight to this verts weights
-            if inf_plug.asDouble() != 0.0:
-                try:
-                    influence = inf_index_to_infs[inf_index]
-                    infs_to_weights[influence] = inf_plug.asDouble()
-                except KeyError:
-                    # this is super weird Maya BS. It seems as though the weightList sometimes remembers the
-                    # weight values of influences that were removed from the skinCluster.
-                    # This results in a KeyError in our inf_index_to_infs dict.
-                    # I think we can safely catch and ignore these key errors and everything works as intended o.O
-                    pass
-        vert_index_to_infs_wts[vert_index] = infs_to_weights
-    return vert_index_to_infs_wts
+    return SkinWeights.from_skin_cluster(skin_cluster, vertices).to_dict()
 
 
 def set_weights(vert_indices_to_infs_wts, skinned_mesh=None, skin_cluster=None):
     """
+    Only the vertices in vert_indices_to_infs_wts are written. Influences missing from a vertex's dict are set to 0.0.
+
     :param vert_indices_to_infs_wts: {vert_index: {influence: 1.0}}
-    :param skinned_mesh: if None will be derived from the first vert in vert_indices_to_infs_wts
+    :param skinned_mesh: if None will be derived from skin_cluster
     :param skin_cluster: if None will be derived from skinned_mesh
     """
     if skinned_mesh is None and skin_cluster is None:
         raise ValueError('At least one of either skin_cluster or skinned_mesh must be provided.')
-    skinned_mesh = skinned_mesh or get_skinned_mesh_from_skin_cluster(skin_cluster)
     skin_cluster = skin_cluster or get_skincluster(skinned_mesh)
-    mesh_path = get_dagpath_or_dependnode_from_name(skinned_mesh.getShape().name())
-    mesh_node = mesh_path.node()
-    skincl_depend_node = get_dagpath_or_dependnode_from_name(skin_cluster.name())
-    mfn_skincl = omanim.MFnSkinCluster(skincl_depend_node)
-
-    mfn_mesh_vert_iterator = om.MItMeshVertex(mesh_node)
-    indices = range(mfn_mesh_vert_iterator.count())
+    vert_indexes, weights = get_weights_array_from_dict(skin_cluster, vert_indices_to_infs_wts)
+    set_weights_array(skin_cluster, vert_indexes, weights)
 
-    single_id_comp = om.MFnSingleIndexedComponent()
-    vertex_comp = single_id_comp.create(om.MFn.kMeshVertComponent)
-    single_id_comp.addElements(indices)
 
-    inf_dags = mfn_skincl.influenceObjects()
-    inf_indexes = om.MIntArray(len(inf_dags), 0)
-    for x in range(len(inf_dags)):
-        inf_indexes[x] = int(mfn_skincl.indexForInfluenceObject(inf_dags[x]))
-
-    '''
-    one-dimensional list of length (influence_count * component_count) so that the "weights" for one 
-    vertex is at the subset weight_list[this_vert_weight_index: this_vert_weight_index + inf_count]
-    '''
-    current_weight_data = mfn_skincl.getWeights(mesh_path, vertex_comp)[0]
-    new_weight_data = format_api_weight_data_from_dict(skin_cluster, vert_indices_to_infs_wts,
-                                                       current_weight_data=current_weight_data)
+def set_weights_array(skin_cluster, vert_indexes, weights, normalize=True):
+    """
+    Sets every influence weight of only the vertices in vert_indexes with a single undoable
+    flottiSetSkinWeights command. Its undo record only keeps the weights that changed.
+    See skinweightscmd.
+
+    :param vert_indexes: vertex index of each row of weights.
+    :param weights: numpy array, scipy.sparse matrix or (data, indices, indptr, shape) CSR tuple
+                    shaped (len(vert_indexes), influence_count) in skinCluster.influenceObjects() order.
+    :returns: size in bytes of the undo record. 0 if nothing was set or the skinPercent fallback was used.
+    """
+    weights = get_dense_weights(weights)
+    vert_indexes = np.asarray(vert_indexes, dtype=np.int64)
+    if not len(vert_indexes):
+        return 0
+    order = np.argsort(vert_indexes, kind='stable')
+    vert_indexes = vert_indexes[order]
+    weights = weights[order]
 
-    with pm.UndoChunk():
-        try:
-            # skinFn.setWeights() does not get added to the undo queue.
-            # However, we can trick Maya into adding it to the undo queue
-            # by wrapping it in an UndoChunk with and undoable command.
-            pm.skinPercent(skin_cluster, skinned_mesh, normalize=False, pruneWeights=0.0)
-            # set weights for all influences for all vertices in one call
-            mfn_skincl.setWeights(mesh_path, vertex_comp, inf_indexes, new_weight_data)
-        except RuntimeError:
-            # workaround for an error that I couldn't determine the cause of:
-            # RuntimeError: (kInvalidParameter): Object is incompatible with this method
-            for vert_index, infs_to_wts in vert_indices_to_infs_wts.items():
-                pm.skinPercent(skin_cluster, skinned_mesh.vtx[vert_index], transformValue=infs_to_wts.items())
+    try:
+        return skinweightscmd.set_weights(skin_cluster, vert_indexes, weights, normalize=normalize)
+    except RuntimeError as e:
+        # workaround for an error that I couldn't determine the cause of:
+        # RuntimeError: (kInvalidParameter): Object is incompatible with this method
+        if 'kInvalidParameter' not in str(e):
+            raise
+        mesh_name = get_mesh_path_from_mfn_skincluster(get_mfn_skincluster(skin_cluster)).partialPathName()
+        influences = skin_cluster.influenceObjects()
+        with pm.UndoChunk():
+            for vert_index, row in zip(vert_indexes.tolist(), weights.tolist()):
+                pm.skinPercent(skin_cluster, '{0}.vtx[{1}]'.format(mesh_name, vert_index),
+                               transformValue=list(zip(influences, row)), normalize=normalize)
+        return 0
+
+
+def get_dense_weights(weights):
+    """Returns weights as a float numpy array.
+    weights can be an array, a scipy.sparse matrix or a (data, indices, indptr, shape) CSR tuple.
+    """
+    if hasattr(weights, 'toarray'):
+        return np.asarray(weights.toarray(), dtype=np.float64)
+    if isinstance(weights, tuple):
+        data, indices, indptr, shape = weights
+        dense_weights = np.zeros(shape, dtype=np.float64)
+        rows = np.repeat(np.arange(shape[0]), np.diff(indptr))
+        dense_weights[rows, indices] = data
+        return dense_weights
+    return np.asarray(weights, dtype=np.float64)
+
+
+def get_weights_array_from_dict(skin_cluster, verts_infs_wts_dict):
+    """
+    :param verts_infs_wts_dict: {vert_index: {influence: weight}} influences can be PyNodes or names.
+    :returns: (vert_indexes, weights) sorted vertex indexes and a (vertices x influences) array
+              in skinCluster.influenceObjects() order.
+    """
+    infs = skin_cluster.influenceObjects()
+    infs_to_indices = dict([(inf.name(), i) for i, inf in enumerate(infs)])
+    infs_to_indices.update([(inf, i) for i, inf in enumerate(infs)])
+    vert_indexes = np.array(sorted(verts_infs_wts_dict.keys()), dtype=np.int64)
+    weights = np.zeros((len(vert_indexes), len(infs)), dtype=np.float64)
+    for row, vert_index in enumerate(vert_indexes.tolist()):
+        for inf, weight in verts_infs_wts_dict[vert_index].items():
+            weights[row, infs_to_indices[inf]] = weight
+    return vert_indexes, weights
 
 
 def get_dagpath_or_dependnode_from_name(name):
@@ -660,24 +1087,6 @@ def get_dagpath_or_dependnode_from_name(name):
         return sellist.getDependNode(0)
 
 
-def format_api_weight_data_from_dict(skin_cluster, verts_infs_wts_dict, current_weight_data=None):
-    infs = skin_cluster.influenceObjects()
-    infs_to_indices = dict([(inf, i) for i, inf in enumerate(infs)])
-    inf_length = len(infs)
-    current_weight_data = current_weight_data or [0.0] * (len(verts_infs_wts_dict.keys()) * inf_length)
-    new_weight_data = current_weight_data[:]
-    for vert, inf_wts in verts_infs_wts_dict.items():
-        vert_start = vert * inf_length
-        vert_end = vert_start + inf_length
-        weight_values = [0.0] * inf_length
-        for inf, weight in inf_wts.items():
-            index = infs_to_indices[inf]
-            weight_values[index] = weight
-        new_weight_data[vert_start:vert_end] = weight_values
-
-    return new_weight_data
-
-
 def get_skinned_mesh_from_skin_cluster(skin_cluster):
     return skin_cluster.getGeometry()[0].getParent()
 
@@ -0,0 +1,206 @@
+"""
+Undoable skin weight writes.
+
+MFnSkinCluster.setWeights() is not undoable on its own. Every write made through set_weights() runs the
+flottiSetSkinWeights command, which keeps only the (vertex, influence, old weight, new weight) deltas
+of that write so undo and redo only touch the weights that actually changed.
+
+The undo records of all live commands share a memory limit. When it is exceeded the oldest records are released
+and undoing past them becomes a no-op.
+"""
+import os
+
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as omanim
+import maya.cmds as cmds
+
+import flottitools.path_consts as path_consts
+import flottitools.utils.openmayautils as omutils
+
+
+COMMAND_NAME = 'flottiSetSkinWeights'
+PLUGIN_NAME = 'flottiSkinWeights'
+PLUGIN_PATH = os.path.join(path_consts.PLUGINS_DIR, PLUGIN_NAME + '.py')
+UNDO_MEMORY_LIMIT_OPTIONVAR = 'flottiSkinWeightsUndoMemoryLimit'
+DEFAULT_UNDO_MEMORY_LIMIT = 512 * 1024 * 1024
+
+# records waiting to be picked up by the next flottiSetSkinWeights command
+_pending_records = []
+# records owned by commands that are still in the undo queue, oldest first
+_undo_records = []
+
+
+class WeightDeltaRecord(object):
+    """The (vertex, influence, old weight, new weight) deltas of a single skin weight write."""
+    def __init__(self, skin_cluster_handle, vert_indexes, inf_indexes, old_weights, new_weights):
+        """
+        :param skin_cluster_handle: om.MObjectHandle of the skinCluster
+        :param vert_indexes: vertex index of each delta
+        :param inf_indexes: skinCluster logical influence index of each delta
+        """
+        self.skin_cluster_handle = skin_cluster_handle
+        self.vert_indexes = vert_indexes
+        self.inf_indexes = inf_indexes
+        self.old_weights = old_weights
+        self.new_weights = new_weights
+        self.released = False
+
+    @classmethod
+    def from_weights(cls, skin_cluster_name, vert_indexes, weights):
+        """Returns a record of the weights that differ from the skinCluster's current weights.
+
+        :param vert_indexes: sorted unique vertex indexes
+        :param weights: array shaped (len(vert_indexes), influence_count) in influenceObjects() order.
+        """
+        skincl_node = omutils.get_dagpath_or_dependnode_from_name(skin_cluster_name)
+        fn_skincl = omanim.MFnSkinCluster(skincl_node)
+        mesh_path = _get_mesh_path(fn_skincl)
+        influence_indexes = np.array([fn_skincl.indexForInfluenceObject(inf_dag)
+                                      for inf_dag in fn_skincl.influenceObjects()], dtype=np.int32)
+        vertex_comp = omutils.create_vertex_component(vert_indexes)
+        current_weights = np.array(fn_skincl.getWeights(mesh_path, vertex_comp)[0], dtype=np.float64)
+        current_weights = current_weights.reshape(len(vert_indexes), len(influence_indexes))
+        changed_rows, changed_columns = np.nonzero(current_weights != weights)
+        return cls(om.MObjectHandle(skincl_node),
+                   np.asarray(vert_indexes, dtype=np.int32)[changed_rows],
+                   influence_indexes[changed_columns],
+                   current_weights[changed_rows, changed_columns],
+                   weights[changed_rows, changed_columns])
+
+    @property
+    def nbytes(self):
+        if self.released:
+            return 0
+        return sum([a.nbytes for a in (self.vert_indexes, self.inf_indexes, self.old_weights, self.new_weights)])
+
+    def __len__(self):
+        return len(self.vert_indexes)
+
+    def apply_new(self):
+        self._write(self.new_weights)
+
+    def apply_old(self):
+        self._write(self.old_weights)
+
+    def release(self):
+        self.vert_indexes = self.inf_indexes = self.old_weights = self.new_weights = None
+        self.released = True
+
+    def _write(self, values):
+        if self.released:
+            om.MGlobal.displayWarning('Skin weight undo data was released to stay under the undo memory limit. '
+                                      'Use set_undo_memory_limit() to keep more.')
+            return
+        if not self.skin_cluster_handle.isValid():
+            return
+        fn_skincl = omanim.MFnSkinCluster(self.skin_cluster_handle.object())
+        mesh_path = _get_mesh_path(fn_skincl)
+        # only read and write the block of vertices and influences touched by the deltas
+        vert_indexes, rows = np.unique(self.vert_indexes, return_inverse=True)
+        inf_indexes, columns = np.unique(self.inf_indexes, return_inverse=True)
+        vertex_comp = omutils.create_vertex_component(vert_indexes)
+        influence_array = om.MIntArray(inf_indexes.tolist())
+        block = np.array(fn_skincl.getWeights(mesh_path, vertex_comp, influence_array), dtype=np.float64)
+        block = block.reshape(len(vert_indexes), len(inf_indexes))
+        block[rows, columns] = values
+        fn_skincl.setWeights(mesh_path, vertex_comp, influence_array, om.MDoubleArray(block.ravel().tolist()), False)
+
+
+class SetSkinWeightsCommand(om.MPxCommand):
+    """Applies the next pending WeightDeltaRecord. Use set_weights() rather than running the command directly."""
+    def __init__(self):
+        super(SetSkinWeightsCommand, self).__init__()
+        self.record = None
+
+    @staticmethod
+    def creator():
+        return SetSkinWeightsCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        if not _pending_records:
+            raise RuntimeError('{0} can only be run through skinweightscmd.set_weights()'.format(COMMAND_NAME))
+        self.record = _pending_records.pop(0)
+        self.redoIt()
+        _undo_records.append(self.record)
+        enforce_undo_memory_limit()
+
+    def redoIt(self):
+        self.record.apply_new()
+        self.setResult(self.record.nbytes)
+
+    def undoIt(self):
+        self.record.apply_old()
+
+    def __del__(self):
+        # Maya deletes the command when it is flushed from the undo queue.
+        if self.record in _undo_records:
+            _undo_records.remove(self.record)
+        if self.record is not None:
+            self.record.release()
+
+
+def set_weights(skin_cluster, vert_indexes, weights, normalize=True):
+    """
+    Sets every influence weight of the vertices in vert_indexes as a single undoable command.
+
+    :param skin_cluster: PyNode SkinCluster or its name
+    :param vert_indexes: sorted unique vertex indexes
+    :param weights: array shaped (len(vert_indexes), influence_count) in skinCluster.influenceObjects() order.
+    :param normalize: normalize each row before it is set.
+    :returns: size in bytes of the command's undo record. 0 if no weights changed.
+    """
+    weights = np.array(weights, dtype=np.float64)
+    if normalize:
+        totals = weights.sum(axis=1)
+        totals[totals == 0.0] = 1.0
+        weights /= totals[:, np.newaxis]
+    record = WeightDeltaRecord.from_weights(str(skin_cluster), vert_indexes, weights)
+    if not len(record):
+        return 0
+    load_plugin()
+    _pending_records.append(record)
+    try:
+        getattr(cmds, COMMAND_NAME)()
+    finally:
+        if record in _pending_records:
+            _pending_records.remove(record)
+    return record.nbytes
+
+
+def load_plugin():
+    if not cmds.pluginInfo(PLUGIN_NAME, q=True, loaded=True):
+        cmds.loadPlugin(PLUGIN_PATH, quiet=True)
+
+
+def get_undo_memory_limit():
+    """Returns the maximum number of bytes all skin weight undo records can use."""
+    if cmds.optionVar(exists=UNDO_MEMORY_LIMIT_OPTIONVAR):
+        return cmds.optionVar(q=UNDO_MEMORY_LIMIT_OPTIONVAR)
+    return DEFAULT_UNDO_MEMORY_LIMIT
+
+
+def set_undo_memory_limit(num_bytes):
+    cmds.optionVar(intValue=(UNDO_MEMORY_LIMIT_OPTIONVAR, int(num_bytes)))
+    enforce_undo_memory_limit()
+
+
+def get_undo_memory_usage():
+    return sum([record.nbytes for record in _undo_records])
+
+
+def enforce_undo_memory_limit():
+    """Releases the oldest undo records until the total is under the limit. The newest record is always kept."""
+    memory_limit = get_undo_memory_limit()
+    memory_usage = get_undo_memory_usage()
+    while memory_usage > memory_limit and len(_undo_records) > 1:
+        oldest_record = _undo_records.pop(0)
+        memory_usage -= oldest_record.nbytes
+        oldest_record.release()
+
+
+def _get_mesh_path(fn_skincl):
+    return om.MDagPath.getAPathTo(fn_skincl.getOutputGeometry()[0])
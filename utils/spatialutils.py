@@ -0,0 +1,367 @@
+"""
+Closest point and proximity queries on points and triangle meshes using NumPy. Does not need Maya.
+"""
+import numpy as np
+
+
+# maximum number of (point, triangle) pairs tested at once
+PAIR_BATCH_SIZE = 1 << 20
+
+
+class TriangleGrid(object):
+    """
+    A uniform grid spatial hash over the bounding boxes of a mesh's triangles.
+
+    Only occupied cells are stored, as sorted cell keys that index a flat array of triangle indexes,
+    so every query is a vectorized searchsorted over the query points rather than a per-point tree walk.
+    """
+    def __init__(self, points, triangles, cell_size=None):
+        """
+        :param points: vertex positions shaped (vertex_count, 3)
+        :param triangles: vertex indexes shaped (triangle_count, 3)
+        :param cell_size: grid cell size. By default the mean triangle size.
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        if not len(self.triangles):
+            raise ValueError('A TriangleGrid needs at least one triangle.')
+        corners = self.points[self.triangles]
+        self.corner_a, self.corner_b, self.corner_c = corners[:, 0], corners[:, 1], corners[:, 2]
+        triangle_mins = corners.min(axis=1)
+        triangle_maxs = corners.max(axis=1)
+        self.origin = triangle_mins.min(axis=0)
+        extent = triangle_maxs.max(axis=0) - self.origin
+        self.cell_size = cell_size or _get_default_cell_size(triangle_mins, triangle_maxs, extent)
+
+        while True:
+            self.dims = np.floor(extent / self.cell_size).astype(np.int64) + 1
+            lows = self._get_cells(triangle_mins)
+            highs = self._get_cells(triangle_maxs)
+            counts = np.prod(highs - lows + 1, axis=1)
+            # large triangles are added to every cell they overlap. Grow the cells if that gets out of hand.
+            if cell_size or counts.sum() <= 16 * len(self.triangles) + 4096:
+                break
+            self.cell_size *= 2.0
+        keys, triangle_indexes = self._get_box_keys(lows, highs, counts)
+        order = np.argsort(keys, kind='stable')
+        self.cell_keys, self.cell_starts = np.unique(keys[order], return_index=True)
+        self.cell_ends = np.append(self.cell_starts[1:], len(order))
+        self.cell_triangles = triangle_indexes[order]
+        self.cell_coords = np.stack([self.cell_keys // (self.dims[1] * self.dims[2]),
+                                     (self.cell_keys // self.dims[2]) % self.dims[1],
+                                     self.cell_keys % self.dims[2]], axis=1)
+
+    @classmethod
+    def from_points(cls, points, cell_size=None):
+        """Returns a grid where every point is a degenerate triangle, for closest vertex queries."""
+        vert_indexes = np.arange(len(points))
+        return cls(points, np.repeat(vert_indexes, 3).reshape(-1, 3), cell_size=cell_size)
+
+    def closest_triangles(self, query_points, chunk_size=4096):
+        """
+        Returns the closest triangle to each query point and the barycentric coordinates of the closest point on it.
+
+        :param query_points: array shaped (point_count, 3)
+        :returns: triangle indexes shaped (point_count,) and barycentric coordinates shaped (point_count, 3)
+        """
+        query_points = np.asarray(query_points, dtype=np.float64).reshape(-1, 3)
+        triangle_indexes = np.empty(len(query_points), dtype=np.int64)
+        for start in range(0, len(query_points), chunk_size):
+            triangle_indexes[start:start + chunk_size] = self._closest_triangles(query_points[start:start + chunk_size])
+        _, barycentrics = closest_points_on_triangles(query_points, self.corner_a[triangle_indexes],
+                                                      self.corner_b[triangle_indexes],
+                                                      self.corner_c[triangle_indexes])
+        return triangle_indexes, barycentrics
+
+    def closest_points(self, query_points, chunk_size=4096):
+        """Returns the closest point on the mesh to each query point shaped (point_count, 3)."""
+        triangle_indexes, barycentrics = self.closest_triangles(query_points, chunk_size=chunk_size)
+        corners = self.points[self.triangles[triangle_indexes]]
+        return (corners * barycentrics[:, :, np.newaxis]).sum(axis=1)
+
+    def _closest_triangles(self, query_points):
+        query_count = len(query_points)
+        best_triangles = np.full(query_count, -1, dtype=np.int64)
+        best_distances = np.full(query_count, np.inf)
+        # boxes spanning more columns of cells than this are cheaper to brute force against every triangle
+        max_box_columns = max(64, len(self.cell_keys) // 4)
+        brute_force = np.zeros(query_count, dtype=bool)
+        query_cells = self._get_cells(query_points)
+
+        # Grow a box of cells around each point until it holds any triangle. That gives an upper bound.
+        radius = 0
+        searching = np.arange(query_count)
+        while len(searching):
+            lows = self._clip_cells(query_cells[searching] - radius)
+            highs = self._clip_cells(query_cells[searching] + radius)
+            self._search_boxes(query_points, searching, lows, highs, max_box_columns,
+                               best_triangles, best_distances, brute_force)
+            searching = searching[(best_triangles[searching] < 0) & ~brute_force[searching]]
+            radius = max(1, radius * 2)
+
+        # Then search every cell within that bound of each point.
+        bounded = np.flatnonzero(~brute_force)
+        bounds = np.sqrt(best_distances[bounded])[:, np.newaxis] * (1.0 + 1e-9) + 1e-12
+        lows = self._get_cells(query_points[bounded] - bounds)
+        highs = self._get_cells(query_points[bounded] + bounds)
+        self._search_boxes(query_points, bounded, lows, highs, max_box_columns,
+                           best_triangles, best_distances, brute_force, skip_far_cells=True)
+
+        brute_force_rows = np.flatnonzero(brute_force)
+        if len(brute_force_rows):
+            rows_per_batch = max(1, PAIR_BATCH_SIZE // len(self.triangles))
+            for start in range(0, len(brute_force_rows), rows_per_batch):
+                rows = brute_force_rows[start:start + rows_per_batch]
+                pair_rows = np.repeat(rows, len(self.triangles))
+                pair_triangles = np.tile(np.arange(len(self.triangles)), len(rows))
+                self._update_best(query_points, pair_rows, pair_triangles, best_triangles, best_distances)
+        return best_triangles
+
+    def _search_boxes(self, query_points, rows, lows, highs, max_box_columns,
+                      best_triangles, best_distances, brute_force, skip_far_cells=False):
+        """
+        Tests the triangles in every occupied cell of each row's box of cells.
+        Cell keys are ordered by z last, so each (x, y) column of a box is one searchsorted range of occupied cells.
+
+        :param skip_far_cells: skip cells farther from the point than its current best distance.
+        """
+        column_counts = (highs[:, 0] - lows[:, 0] + 1) * (highs[:, 1] - lows[:, 1] + 1)
+        too_big = column_counts > max_box_columns
+        brute_force[rows[too_big]] = True
+        rows, lows, highs, column_counts = rows[~too_big], lows[~too_big], highs[~too_big], column_counts[~too_big]
+        # keep the number of columns looked up at once bounded
+        column_ends = np.cumsum(column_counts)
+        batch_start = 0
+        while batch_start < len(rows):
+            offset = column_ends[batch_start] - column_counts[batch_start]
+            batch_end = int(np.searchsorted(column_ends, offset + PAIR_BATCH_SIZE // 16, side='right'))
+            batch = slice(batch_start, max(batch_start + 1, batch_end))
+            batch_start = batch.stop
+            batch_rows, batch_lows, batch_highs = rows[batch], lows[batch], highs[batch]
+
+            column_rows = np.repeat(np.arange(len(batch_rows)), column_counts[batch])
+            local = np.arange(len(column_rows)) - np.repeat(column_ends[batch] - column_counts[batch] - offset,
+                                                            column_counts[batch])
+            box_widths = batch_highs[column_rows, 0] - batch_lows[column_rows, 0] + 1
+            column_keys = ((batch_lows[column_rows, 0] + local % box_widths) * self.dims[1] +
+                           batch_lows[column_rows, 1] + local // box_widths) * self.dims[2]
+            starts = np.searchsorted(self.cell_keys, column_keys + batch_lows[column_rows, 2], side='left')
+            ends = np.searchsorted(self.cell_keys, column_keys + batch_highs[column_rows, 2], side='right')
+            counts = ends - starts
+            cell_rows = batch_rows[np.repeat(column_rows, counts)]
+            cells = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            if skip_far_cells:
+                near = self._get_cell_distances(cells, query_points[cell_rows]) <= best_distances[cell_rows]
+                cell_rows, cells = cell_rows[near], cells[near]
+            pair_rows, pair_triangles = self._get_cell_triangles(cells, cell_rows)
+            self._update_best(query_points, pair_rows, pair_triangles, best_triangles, best_distances)
+
+    def _get_cell_triangles(self, cells, cell_rows):
+        """Returns (row, triangle index) pairs for every triangle in the occupied cells."""
+        starts = self.cell_starts[cells]
+        counts = self.cell_ends[cells] - starts
+        pair_rows = np.repeat(cell_rows, counts)
+        pair_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return pair_rows, self.cell_triangles[np.repeat(starts, counts) + pair_offsets]
+
+    def _get_cell_distances(self, cells, points):
+        """Returns the squared distance from each point to the bounds of its occupied cell."""
+        cell_mins = self.origin + self.cell_coords[cells] * self.cell_size
+        outside = np.maximum(np.maximum(cell_mins - points, points - (cell_mins + self.cell_size)), 0.0)
+        return (outside ** 2).sum(axis=1)
+
+    def _update_best(self, query_points, pair_rows, pair_triangles, best_triangles, best_distances):
+        """Keeps the closest triangle for each row. pair_rows must be sorted."""
+        if not len(pair_rows):
+            return
+        for start in range(0, len(pair_rows), PAIR_BATCH_SIZE):
+            rows = pair_rows[start:start + PAIR_BATCH_SIZE]
+            triangles = pair_triangles[start:start + PAIR_BATCH_SIZE]
+            points = query_points[rows]
+            closest, _ = closest_points_on_triangles(points, self.corner_a[triangles], self.corner_b[triangles],
+                                                     self.corner_c[triangles])
+            offsets = closest - points
+            distances = np.einsum('ij,ij->i', offsets, offsets)
+            # smallest distance for each run of rows. Ties go to the first pair.
+            row_starts = np.flatnonzero(np.diff(rows, prepend=-1))
+            row_counts = np.diff(np.append(row_starts, len(rows)))
+            row_minimums = np.minimum.reduceat(distances, row_starts)
+            minimum_pairs = np.flatnonzero(distances == np.repeat(row_minimums, row_counts))
+            first = minimum_pairs[np.flatnonzero(np.diff(rows[minimum_pairs], prepend=-1))]
+            rows, distances, triangles = rows[first], distances[first], triangles[first]
+            closer = distances < best_distances[rows]
+            best_distances[rows[closer]] = distances[closer]
+            best_triangles[rows[closer]] = triangles[closer]
+
+    def _get_cells(self, positions):
+        return self._clip_cells(np.floor((positions - self.origin) / self.cell_size).astype(np.int64))
+
+    def _clip_cells(self, cells):
+        return np.clip(cells, 0, self.dims - 1)
+
+    def _get_box_keys(self, lows, highs, counts):
+        """Returns the key of every cell in each box of cells and the index of the box it came from."""
+        box_indexes = np.repeat(np.arange(len(lows)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        box_sizes = (highs - lows + 1)[box_indexes]
+        cells = lows[box_indexes]
+        cells[:, 0] += local % box_sizes[:, 0]
+        cells[:, 1] += (local // box_sizes[:, 0]) % box_sizes[:, 1]
+        cells[:, 2] += local // (box_sizes[:, 0] * box_sizes[:, 1])
+        keys = (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+        return keys, box_indexes
+
+
+def _get_default_cell_size(triangle_mins, triangle_maxs, extent):
+    cell_size = (triangle_maxs - triangle_mins).max(axis=1).mean()
+    if cell_size <= 0.0:
+        # Degenerate triangles like TriangleGrid.from_points(). Assume the points cover a surface.
+        cell_size = 2.0 * extent.max() / np.sqrt(len(triangle_mins))
+    return cell_size if cell_size > 0.0 else 1.0
+
+
+def closest_points_on_triangles(points, corner_a, corner_b, corner_c):
+    """
+    Returns the closest point on each triangle to each point and its barycentric coordinates.
+    From Real-Time Collision Detection by Christer Ericson, 5.1.5.
+
+    :param points: array shaped (n, 3)
+    :param corner_a, corner_b, corner_c: triangle corners, each shaped (n, 3)
+    :returns: closest points shaped (n, 3) and barycentric coordinates shaped (n, 3)
+    """
+    ab = corner_b - corner_a
+    ac = corner_c - corner_a
+    ap = points - corner_a
+    bp = points - corner_b
+    cp = points - corner_c
+    d1 = np.einsum('ij,ij->i', ab, ap)
+    d2 = np.einsum('ij,ij->i', ac, ap)
+    d3 = np.einsum('ij,ij->i', ab, bp)
+    d4 = np.einsum('ij,ij->i', ac, bp)
+    d5 = np.einsum('ij,ij->i', ab, cp)
+    d6 = np.einsum('ij,ij->i', ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    # inside the triangle
+    total = va + vb + vc
+    v = vb / _nonzero(total)
+    w = vc / _nonzero(total)
+    barycentrics = np.stack([1.0 - v - w, v, w], axis=1)
+    # Ericson returns at the first region the point is in, so assign regions from last to first.
+    regions = []
+    edge_bc = (va <= 0.0) & (d4 - d3 >= 0.0) & (d5 - d6 >= 0.0)
+    w = (d4 - d3) / _nonzero((d4 - d3) + (d5 - d6))
+    regions.append((edge_bc, np.stack([np.zeros_like(w), 1.0 - w, w], axis=1)))
+    edge_ac = (vb <= 0.0) & (d2 >= 0.0) & (d6 <= 0.0)
+    w = d2 / _nonzero(d2 - d6)
+    regions.append((edge_ac, np.stack([1.0 - w, np.zeros_like(w), w], axis=1)))
+    regions.append(((d6 >= 0.0) & (d5 <= d6), np.array([0.0, 0.0, 1.0])))
+    edge_ab = (vc <= 0.0) & (d1 >= 0.0) & (d3 <= 0.0)
+    v = d1 / _nonzero(d1 - d3)
+    regions.append((edge_ab, np.stack([1.0 - v, v, np.zeros_like(v)], axis=1)))
+    regions.append(((d3 >= 0.0) & (d4 <= d3), np.array([0.0, 1.0, 0.0])))
+    regions.append(((d1 <= 0.0) & (d2 <= 0.0), np.array([1.0, 0.0, 0.0])))
+    for in_region, region_barycentrics in regions:
+        barycentrics = np.where(in_region[:, np.newaxis], region_barycentrics, barycentrics)
+
+    closest = (corner_a * barycentrics[:, 0:1] + corner_b * barycentrics[:, 1:2] +
+               corner_c * barycentrics[:, 2:3])
+    return closest, barycentrics
+
+
+def get_inverse_distance_scalers(query_points, sample_points):
+    """
+    Vectorized transformutils.get_distance_scalers() for many query points.
+    Each row holds the inverse distances from a query point to every sample point, normalized to sum to 1.0.
+    A query point that shares its position with a sample point gets a scaler of 1.0 for the first such sample
+    and 0.0 for the rest.
+
+    :param query_points: array shaped (query_count, 3)
+    :param sample_points: array shaped (sample_count, 3)
+    :returns: array shaped (query_count, sample_count)
+    """
+    query_points = np.asarray(query_points, dtype=np.float64)
+    sample_points = np.asarray(sample_points, dtype=np.float64)
+    scalers = np.empty((len(query_points), len(sample_points)), dtype=np.float64)
+    rows_per_batch = max(1, PAIR_BATCH_SIZE // max(1, len(sample_points)))
+    for start in range(0, len(query_points), rows_per_batch):
+        batch = query_points[start:start + rows_per_batch]
+        distances = np.sqrt(((batch[:, np.newaxis] - sample_points[np.newaxis]) ** 2).sum(axis=2))
+        coincident = distances == 0.0
+        inverse = 1.0 / np.where(coincident, 1.0, distances)
+        coincident_rows = np.flatnonzero(coincident.any(axis=1))
+        inverse[coincident_rows] = 0.0
+        inverse[coincident_rows, coincident[coincident_rows].argmax(axis=1)] = 1.0
+        scalers[start:start + len(batch)] = inverse / inverse.sum(axis=1)[:, np.newaxis]
+    return scalers
+
+
+def get_coincident_point_indexes(points, tolerance=0.0):
+    """
+    Returns the sorted indexes of every point that is within tolerance of at least one other point.
+
+    Exact duplicates are found with a sort. The remaining unique points are hashed into cells at least
+    tolerance wide so only points in the same or neighbouring cells are compared.
+
+    :param points: array shaped (point_count, 3)
+    :param tolerance: maximum distance between two points for them to count as coincident.
+    :returns: int64 array of point indexes
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 2:
+        return np.zeros(0, dtype=np.int64)
+    unique_points, unique_ids, unique_counts = np.unique(points, axis=0, return_inverse=True, return_counts=True)
+    unique_ids = unique_ids.ravel()
+    is_coincident = unique_counts > 1
+    if tolerance > 0.0 and len(unique_points) > 1:
+        for pair_a, pair_b in _get_neighbouring_pairs(unique_points, tolerance):
+            distances = ((unique_points[pair_a] - unique_points[pair_b]) ** 2).sum(axis=1)
+            within = distances <= tolerance * tolerance
+            is_coincident[pair_a[within]] = True
+            is_coincident[pair_b[within]] = True
+    return np.flatnonzero(is_coincident[unique_ids])
+
+
+# the cell itself and half of its 26 neighbours. The other half is covered when the neighbour is the first cell.
+_HALF_NEIGHBOUR_OFFSETS = [offset for offset in np.ndindex(3, 3, 3) if offset > (1, 1, 1)]
+
+
+def _get_neighbouring_pairs(points, cell_size):
+    """Yields (index_a, index_b) arrays of every pair of points in the same or in neighbouring cells."""
+    mins = points.min(axis=0)
+    # cells can grow beyond cell_size so that each axis fits in 20 bits of a single int64 key
+    cell_size = max(cell_size, (points.max(axis=0) - mins).max() / float((1 << 20) - 2))
+    cells = np.floor((points - mins) / cell_size).astype(np.int64) + 1
+    order = np.argsort(_get_cell_keys(cells), kind='stable')
+    cells = cells[order]
+    keys = _get_cell_keys(cells)
+    cell_keys, cell_starts, cell_counts = np.unique(keys, return_index=True, return_counts=True)
+    first_cells = cells[cell_starts]
+    for offset in [(1, 1, 1)] + _HALF_NEIGHBOUR_OFFSETS:
+        neighbour_keys = _get_cell_keys(first_cells + np.array(offset) - 1)
+        neighbours = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        has_neighbour = cell_keys[neighbours] == neighbour_keys
+        cell_a = np.flatnonzero(has_neighbour)
+        cell_b = neighbours[has_neighbour]
+        # every point of cell_a paired with every point of cell_b
+        counts_a = cell_counts[cell_a]
+        counts_b = cell_counts[cell_b]
+        pair_counts = counts_a * counts_b
+        pair_cells = np.repeat(np.arange(len(cell_a)), pair_counts)
+        pair_offsets = np.arange(pair_counts.sum()) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        index_a = cell_starts[cell_a][pair_cells] + pair_offsets // counts_b[pair_cells]
+        index_b = cell_starts[cell_b][pair_cells] + pair_offsets % counts_b[pair_cells]
+        if offset == (1, 1, 1):
+            is_pair = index_a < index_b
+            index_a, index_b = index_a[is_pair], index_b[is_pair]
+        yield order[index_a], order[index_b]
+
+
+def _get_cell_keys(cells):
+    return (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+
+
+def _nonzero(values):
+    return np.where(values == 0.0, 1.0, values)
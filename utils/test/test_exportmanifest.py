@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import flottitools.utils.exportmanifest as exportmanifest
+
+
+class TestExportManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.scene_path = self.write_file('scene.ma', 'scene')
+        self.rig_path = self.write_file('rig.ma', 'rig')
+        self.export_path = self.write_file('clip.fbx', 'fbx')
+        self.settings = {'frame_start': 0, 'frame_end': (1, 10)}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def get_fingerprint(self, settings=None):
+        files = {'scene': self.scene_path, 'rig': self.rig_path}
+        return exportmanifest.get_export_fingerprint(self.export_path, files, settings or self.settings)
+
+    def test_unchanged_export_is_up_to_date(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        self.assertTrue(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_unrecorded_export_is_not_up_to_date(self):
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_changed_file_is_not_up_to_date(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        self.write_file('rig.ma', 'changed rig')
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_touched_file_with_same_content_is_up_to_date(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        os.utime(self.scene_path, (0, 0))
+        self.assertTrue(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_changed_settings_are_not_up_to_date(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        fingerprint = self.get_fingerprint({'frame_start': 0, 'frame_end': (1, 20)})
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, fingerprint))
+
+    def test_missing_export_is_not_up_to_date(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        os.remove(self.export_path)
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_missing_input_never_matches(self):
+        fingerprint = exportmanifest.get_export_fingerprint(self.export_path, {'rig': None}, self.settings)
+        exportmanifest.record_export(self.export_path, fingerprint)
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, fingerprint))
+
+    def test_forget(self):
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        exportmanifest.record_export(self.export_path, None)
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_exports_in_one_directory_are_recorded_separately(self):
+        other_export_path = self.write_file('other.fbx', 'fbx')
+        exportmanifest.record_export(other_export_path, self.get_fingerprint())
+        exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        exportmanifest.record_export(self.export_path, None)
+        self.assertTrue(exportmanifest.is_export_up_to_date(other_export_path, self.get_fingerprint()))
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
+
+    def test_failed_record_does_not_raise(self):
+        os.mkdir(exportmanifest.get_fingerprint_path(self.export_path))
+        with self.assertLogs(exportmanifest.logger, 'WARNING'):
+            exportmanifest.record_export(self.export_path, self.get_fingerprint())
+        self.assertFalse(exportmanifest.is_export_up_to_date(self.export_path, self.get_fingerprint()))
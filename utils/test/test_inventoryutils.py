@@ -0,0 +1,56 @@
+import pymel.core as pm
+
+import flottitools.test as mayatest
+import flottitools.utils.inventoryutils as invutils
+import flottitools.utils.meshutils as meshutils
+import flottitools.utils.skinutils as skinutils
+
+
+class TestSceneInventory(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestSceneInventory, self).setUp()
+        self.test_cube, self.test_joints, self.skin_cluster = self.create_skinned_cube(joint_count=2)
+        self.static_cube = self.create_cube()
+        self.inventory = invutils.SceneInventory()
+
+    def test_get_nodes_includes_derived_types(self):
+        result = self.inventory.get_nodes('transform')
+        self.assertIn(self.static_cube, result)
+        self.assertIn(self.test_joints[0], result)
+
+    def test_get_mesh_transforms(self):
+        self.assertSetEqual(set(meshutils.get_meshes_from_scene()), set(self.inventory.get_mesh_transforms()))
+
+    def test_get_skinned_mesh_transforms(self):
+        self.assertListEqual([self.test_cube], self.inventory.get_skinned_mesh_transforms())
+
+    def test_get_skin_cluster(self):
+        self.assertEqual(self.skin_cluster, self.inventory.get_skin_cluster(self.test_cube))
+        self.assertEqual(self.skin_cluster, self.inventory.get_skin_cluster(self.test_cube.getShape()))
+        self.assertIsNone(self.inventory.get_skin_cluster(self.static_cube))
+
+    def test_get_root_joint(self):
+        self.assertEqual(self.test_joints[0], self.inventory.get_root_joint(self.skin_cluster))
+
+
+class TestSceneInventoryCache(mayatest.MayaTestCase):
+    def test_queries_use_one_inventory(self):
+        test_cube, _, skin_cluster = self.create_skinned_cube(joint_count=2)
+        with invutils.scene_inventory_cache() as inventory:
+            self.assertIs(inventory, invutils.get_active_scene_inventory())
+            self.assertListEqual([test_cube], skinutils.get_skinned_meshes_from_scene())
+            self.assertEqual(skin_cluster, skinutils.get_skincluster(test_cube))
+        self.assertIsNone(invutils.get_active_scene_inventory())
+
+    def test_new_nodes_invalidate_inventory(self):
+        with invutils.scene_inventory_cache():
+            meshutils.get_meshes_from_scene()
+            new_cube = self.create_cube()
+            self.assertIn(new_cube, meshutils.get_meshes_from_scene())
+
+    def test_deleted_nodes_invalidate_inventory(self):
+        test_cube = self.create_cube()
+        with invutils.scene_inventory_cache():
+            meshutils.get_meshes_from_scene()
+            pm.delete(test_cube)
+            self.assertNotIn(test_cube, meshutils.get_meshes_from_scene())
@@ -61,6 +61,74 @@ class TestGetMeshNodes(mayatest.MayaTestCase):
         self.assertListEqual(result, [test_cube.getShape()])
 
 
+class TestMeshScan(mayatest.MayaTestCase):
+    def test_checks_share_scan(self):
+        test_cube = self.create_cube()
+        pm.polyMapDel(test_cube.f[1])
+        test_cube.vtx[3].setColor((1, 0, 0, 1))
+        mesh_scan = meshutils.MeshScan(test_cube)
+        self.assertListEqual([], mesh_scan.get_ngon_indexes().tolist())
+        self.assertListEqual([1], mesh_scan.get_missing_uv_indexes().tolist())
+        self.assertListEqual([], mesh_scan.get_overlapping_vertex_indexes(0.001).tolist())
+        self.assertDictEqual({3: (1.0, 0.0, 0.0, 1.0)}, mesh_scan.get_vertex_colors())
+
+    def test_no_color_sets(self):
+        test_cube = self.create_cube()
+        mesh_scan = meshutils.MeshScan(test_cube)
+        self.assertTupleEqual((8, 4), mesh_scan.vertex_colors.shape)
+        self.assertDictEqual({}, mesh_scan.get_vertex_colors())
+
+    def test_vertex_color_indexes(self):
+        test_cube = self.create_cube()
+        test_cube.vtx[3].setColor((1, 0, 0, 1))
+        test_cube.vtx[5].setColor((1, 1, 1, 1))
+        mesh_scan = meshutils.MeshScan(test_cube)
+        self.assertListEqual([3, 5], mesh_scan.get_vertex_color_indexes().tolist())
+        result = mesh_scan.get_vertex_color_indexes((meshutils.NO_VERTEX_COLOR, (1, 1, 1, 1)))
+        self.assertListEqual([3], result.tolist())
+        self.assertEqual(8, len(mesh_scan.get_vertex_color_indexes(())))
+
+    def test_cache_reuses_scan(self):
+        test_cube = self.create_cube()
+        with meshutils.mesh_scan_cache():
+            mesh_scan = meshutils.get_mesh_scan(test_cube)
+            self.assertIs(mesh_scan, meshutils.get_mesh_scan(test_cube.getShape().name()))
+        self.assertIsNot(mesh_scan, meshutils.get_mesh_scan(test_cube))
+
+
+class TestComponentSet(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestComponentSet, self).setUp()
+        self.test_cube = self.create_cube()
+        self.shape = self.test_cube.getShape()
+        self.component_set = meshutils.ComponentSet(self.shape, [5, 1, 2, 1], meshutils.COMPONENT_FACE)
+
+    def test_indexes_sorted_unique(self):
+        self.assertListEqual([1, 2, 5], self.component_set.indexes.tolist())
+        self.assertEqual(3, len(self.component_set))
+
+    def test_pynodes(self):
+        self.assertEqual(self.shape.f[2], self.component_set[1])
+        self.assertListEqual([self.shape.f[1], self.shape.f[2], self.shape.f[5]], list(self.component_set))
+
+    def test_names(self):
+        expected = ['{0}.f[1]'.format(self.shape.name()), '{0}.f[2]'.format(self.shape.name()),
+                    '{0}.f[5]'.format(self.shape.name())]
+        self.assertListEqual(expected, self.component_set.get_names())
+        expected = ['{0}.f[1:2]'.format(self.shape.name()), '{0}.f[5]'.format(self.shape.name())]
+        self.assertListEqual(expected, self.component_set.get_range_names())
+
+    def test_select(self):
+        self.component_set.subset([0, 2]).select()
+        self.assertListEqual([self.shape.f[1], self.shape.f[5]], pm.selected(flatten=True))
+
+    def test_from_mesh_node(self):
+        pm.polyMapDel(self.test_cube.f[3])
+        result = meshutils.get_faces_with_missing_uvs_from_mesh_node(self.shape)
+        self.assertIsInstance(result, meshutils.ComponentSet)
+        self.assertListEqual([3], result.indexes.tolist())
+
+
 class TestGetNGons(mayatest.MayaTestCase):
     def test_get_ngons(self):
         test_cube = self.create_cube()
@@ -111,6 +179,14 @@ class TestOverlappingVertices(mayatest.MayaTestCase):
         expected = []
         self.assertListEqual(result, expected)
 
+    def test_tolerance(self):
+        test_cube = self.create_cube()
+        pm.move(test_cube.vtx[0], (0, 0, 0), absolute=True)
+        pm.move(test_cube.vtx[1], (.001, .0, .0), absolute=True)
+        pm.move(test_cube.vtx[2], (.0, .003, .0), absolute=True)
+        result = meshutils.get_overlapping_vertex_indexes(test_cube, tolerance=.002)
+        self.assertListEqual([0, 1], result.tolist())
+
 
 class TestGetVertexColors(mayatest.MayaTestCase):
     def test_no_color_skipped(self):
@@ -203,6 +279,28 @@ class TestGetVertexColors(mayatest.MayaTestCase):
         self.assertDictEqual(result, expected)
 
 
+class TestGetColoredVertices(mayatest.MayaTestCase):
+    def test_returns_component_set(self):
+        test_cube = self.create_cube()
+        test_cube.vtx[2].setColor((0, 1, 0, 1))
+        result = meshutils.get_colored_vertices_from_mesh_node(test_cube.getShape())
+        self.assertListEqual([test_cube.vtx[2]], list(result))
+
+    def test_no_colors(self):
+        test_cube = self.create_cube()
+        result = meshutils.get_colored_vertices_from_mesh_node(test_cube.getShape())
+        self.assertEqual(0, len(result))
+
+
+class TestGetVertRangeNames(mayatest.MayaTestCase):
+    def test_collapses_consecutive_indexes(self):
+        result = meshutils.get_vert_range_names('foo', [7, 0, 1, 2, 3, 9, 10])
+        self.assertListEqual(['foo.vtx[0:3]', 'foo.vtx[7]', 'foo.vtx[9:10]'], result)
+
+    def test_no_indexes(self):
+        self.assertListEqual([], meshutils.get_vert_range_names('foo', []))
+
+
 class TestGetMeshPairsByName(mayatest.MayaTestCase):
     def test_basic(self):
         test_cube_a = self.create_cube()
@@ -0,0 +1,65 @@
+import unittest
+
+import flottitools.utils.progressutils as progressutils
+
+
+class CountingProgressReporter(progressutils.ProgressReporter):
+    def __init__(self, max_refresh_rate=progressutils.MAX_REFRESH_RATE):
+        super(CountingProgressReporter, self).__init__(max_refresh_rate)
+        self.shown_values = []
+
+    def show(self):
+        self.shown_values.append(self.value)
+
+
+class TestProgressReporter(unittest.TestCase):
+    def test_updates_are_coalesced(self):
+        progress = CountingProgressReporter(max_refresh_rate=0.001)
+        progress.set_maximum(1000)
+        for i in range(1000):
+            progress.update_iterate_value()
+        self.assertListEqual([0], progress.shown_values)
+        self.assertEqual(1000, progress.value)
+
+    def test_finish_shows_final_value(self):
+        progress = CountingProgressReporter(max_refresh_rate=0.001)
+        with progress:
+            progress.set_maximum(10)
+            for i in range(10):
+                progress.update_label_and_iter_val('foo')
+        self.assertEqual(10, progress.shown_values[-1])
+
+    def test_no_max_refresh_rate_shows_every_update(self):
+        progress = CountingProgressReporter(max_refresh_rate=None)
+        for i in range(3):
+            progress.update_iterate_value()
+        self.assertListEqual([1, 2, 3], progress.shown_values)
+
+    def test_update_after_cancel_raises(self):
+        progress = progressutils.ProgressReporter()
+        progress.cancel()
+        self.assertRaises(progressutils.ProgressCanceled, progress.update_label, 'foo')
+
+    def test_forced_refresh_after_cancel_does_not_raise(self):
+        progress = progressutils.ProgressReporter()
+        progress.cancel()
+        progress.reset()
+        progress.finish()
+        self.assertTrue(progress.canceled)
+
+    def test_begin_clears_cancel(self):
+        progress = progressutils.ProgressReporter()
+        progress.cancel()
+        progress.begin()
+        progress.update_label('foo')
+        self.assertFalse(progress.canceled)
+
+    def test_chunks(self):
+        progress = progressutils.ProgressReporter()
+        progress.set_chunks([2, 3])
+        progress.update_label_and_iter_chunk('foo')
+        progress.update_label_and_iter_chunk('bar')
+        progress.update_iterate_chunk()
+        self.assertEqual(5, progress.maximum)
+        self.assertAlmostEqual(5.01, progress.value)
+        self.assertEqual('bar', progress.get_label())
@@ -355,6 +355,48 @@ class TestGetInfluenceMap(mayatest.MayaTestCase):
         self.assertDictEqual(expected, result)
 
 
+class TestInfluenceMetadata(mayatest.MayaTestCase):
+    def test_caches_values(self):
+        test_joint = self.create_joint(position=(1, 2, 3), absolute=True)
+        metadata = skeletonutils.InfluenceMetadata()
+        self.assertEqual((1.0, 2.0, 3.0), metadata.get_position(test_joint))
+        pm.move(test_joint, (5, 5, 5), absolute=True)
+        self.assertEqual((1.0, 2.0, 3.0), metadata.get_position(test_joint))
+
+    def test_influence_that_is_not_a_joint_has_no_label(self):
+        test_cube = self.create_cube()
+        metadata = skeletonutils.InfluenceMetadata()
+        expected = (skeletonutils.LABEL_SIDE_NONE, skeletonutils.LABEL_INT_NONE, None)
+        self.assertEqual(expected, metadata.get_label(test_cube))
+
+    def test_shared_inside_cache_context(self):
+        source_joints = [self.create_joint(position=(i, 0, 0), absolute=True) for i in range(3)]
+        target_joints = [self.create_joint(position=(i, 0, 0), absolute=True) for i in range(3)]
+        with skeletonutils.influence_metadata_cache() as metadata:
+            skeletonutils.update_inf_map_by_worldspace_position(source_joints, target_joints)
+            [pm.move(j, (10, 0, 0), relative=True) for j in target_joints]
+            result, _, _ = skeletonutils.update_inf_map_by_worldspace_position(source_joints, target_joints)
+        expected = dict([(sj, [tj]) for sj, tj in zip(source_joints, target_joints)])
+        self.assertDictEqual(expected, result)
+        self.assertEqual((0.0, 0.0, 0.0), metadata.get_position(target_joints[0]))
+
+    def test_get_influence_map_uses_enclosing_cache(self):
+        source_joints = [self.create_joint(position=(i, 0, 0), absolute=True) for i in range(3)]
+        target_joints = [self.create_joint(position=(i, 0, 0), absolute=True) for i in range(3)]
+        with skeletonutils.influence_metadata_cache() as metadata:
+            skeletonutils.get_influence_map(
+                source_joints, target_joints,
+                mapping_methods=[skeletonutils.update_inf_map_by_worldspace_position])
+        pm.move(target_joints[0], (10, 0, 0), relative=True)
+        self.assertEqual((0.0, 0.0, 0.0), metadata.get_position(target_joints[0]))
+
+    def test_closest_inf_first_target_at_same_position(self):
+        source_joints = [self.create_joint(position=(0, 0, 0), absolute=True)]
+        target_joints = [self.create_joint(position=(i * 0.5, 0, 0), absolute=True) for i in range(3)]
+        result, _, _ = skeletonutils.update_inf_map_by_closest_inf(source_joints, target_joints)
+        self.assertDictEqual({source_joints[0]: [target_joints[0]]}, result)
+
+
 class TestGetRootFromChild(mayatest.MayaTestCase):
     def test_get_root_joint_from_child(self):
         test_joints = [self.create_joint() for _ in range(5)]
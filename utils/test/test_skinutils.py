@@ -1,5 +1,6 @@
 import itertools
 
+import numpy as np
 import pymel.core as pm
 
 import flottitools.test as mayatest
@@ -299,6 +300,22 @@ class TestGetPrunedInfluencesToWeights(mayatest.MayaTestCase):
         self.assertDictEqual(expected, result)
 
 
+class TestPruneWeights(mayatest.MayaTestCase):
+    def test_prunes_and_normalizes_exceeding_rows(self):
+        weights = np.array([[0.5, 0.2, 0.1, 0.1, 0.1],
+                            [0.5, 0.2, 0.2, 0.1, 0.0]])
+        result = skinutils.prune_weights(weights)
+        self.assertListEqual([0], result.tolist())
+        self.assertListEqual([0.625, 0.25, 0.125, 0.0, 0.0], [round(x, 6) for x in weights[0].tolist()])
+        self.assertListEqual([0.5, 0.2, 0.2, 0.1, 0.0], weights[1].tolist())
+
+    def test_too_many_infs_all_equal(self):
+        # same tie breaking as get_pruned_influences_to_weights: 'foo', 'bar', 'spam', 'eggs', 'ham' sorted by name
+        weights = np.array([[0.2, 0.2, 0.2, 0.2, 0.2]])
+        skinutils.prune_weights(weights, tie_break_ranks=[2, 0, 4, 1, 3], normalize=False)
+        self.assertListEqual([0.2, 0.2, 0.0, 0.2, 0.2], weights[0].tolist())
+
+
 class TestPruneExceedingInfluences(mayatest.MayaTestCase):
     def test_prune_exceeding_influences(self):
         test_cube = self.create_cube()
@@ -340,6 +357,32 @@ class TestGetNonNormalizedVerts(mayatest.MayaTestCase):
         self.assertDictEqual(expected, result)
 
 
+class TestNormalizeSkinnedMesh(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestNormalizeSkinnedMesh, self).setUp()
+        self.test_cube = self.create_cube()
+        self.test_joints = [self.create_joint() for _ in range(2)]
+        self.skincl = skinutils.bind_mesh_to_joints(self.test_cube, self.test_joints, maximumInfluences=4)
+        self.skincl.setNormalizeWeights(0)
+        skinutils.set_weights_array(self.skincl, [0, 1, 2], [[1.0, 1.0], [0.25, 0.25], [0.5, 0.5]], normalize=False)
+
+    def test_normalizes_only_bad_verts(self):
+        result = skinutils.normalize_skinned_mesh(self.test_cube)
+        self.assertListEqual([0, 1], result.tolist())
+        self.assertListEqual([0.5, 0.5], pm.skinPercent(self.skincl, self.test_cube.vtx[0], q=True, value=True))
+        self.assertListEqual([0.5, 0.5], pm.skinPercent(self.skincl, self.test_cube.vtx[1], q=True, value=True))
+        self.assertDictEqual({}, skinutils.get_non_normalized_vert_indexes(skin_cluster=self.skincl))
+
+    def test_only_given_verts(self):
+        skinutils.normalize_skinned_mesh(self.test_cube, [1])
+        self.assertDictEqual({0: 2.0}, skinutils.get_non_normalized_vert_indexes(skin_cluster=self.skincl))
+
+    def test_undo(self):
+        skinutils.normalize_skinned_mesh(self.test_cube)
+        pm.undo()
+        self.assertDictEqual({0: 2.0, 1: 0.5}, skinutils.get_non_normalized_vert_indexes(skin_cluster=self.skincl))
+
+
 class TestMoveWeights(mayatest.MayaTestCase):
     def setUp(self):
         super(TestMoveWeights, self).setUp()
@@ -556,6 +599,77 @@ class CopyWeights(mayatest.MayaTestCase):
             [self.assertAlmostEqual(expected_weight, result_weight) for expected_weight, result_weight in zip(e, r)]
 
 
+class TestCopyWeightsClosestPoint(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestCopyWeightsClosestPoint, self).setUp()
+        self.source_cube, self.source_joints, self.source_skincl = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(self.source_skincl, self.source_cube.vtx[:4], transformValue=(self.source_joints[0], 1.0))
+        pm.skinPercent(self.source_skincl, self.source_cube.vtx[4:], transformValue=(self.source_joints[1], 1.0))
+        self.target_cube = self.create_cube()
+        self.target_skincl = skinutils.bind_mesh_to_joints(self.target_cube, self.source_joints)
+
+    def test_same_positions(self):
+        skinutils.copy_weights_closest_point(self.source_cube, self.target_cube)
+        for vertex in self.target_cube.vtx:
+            expected = skinutils.get_weighted_influences(self.source_cube.vtx[vertex.index()])
+            self.assertEqual(expected, skinutils.get_weighted_influences(vertex))
+
+    def test_interpolates_between_vertices(self):
+        # halfway along the edge from vtx[2] to vtx[4], which are weighted to different joints
+        pm.move(self.target_cube.vtx[0], (-0.5, 0.5, 0.0), absolute=True)
+        skinutils.copy_weights_closest_point(self.source_cube, self.target_cube)
+        result = pm.skinPercent(self.target_skincl, self.target_cube.vtx[0], q=True, value=True)
+        self.assertAlmostEqual(0.5, result[0])
+        self.assertAlmostEqual(0.5, result[1])
+
+    def test_only_given_vertices(self):
+        pm.skinPercent(self.target_skincl, self.target_cube.vtx, transformValue=(self.source_joints[1], 1.0))
+        skinutils.copy_weights_closest_point(self.source_cube, self.target_cube, vertices=[self.target_cube.vtx[0]])
+        self.assertEqual({self.source_joints[0]: 1.0}, skinutils.get_weighted_influences(self.target_cube.vtx[0]))
+        self.assertEqual({self.source_joints[1]: 1.0}, skinutils.get_weighted_influences(self.target_cube.vtx[1]))
+
+    def test_closest_vertex(self):
+        pm.move(self.target_cube.vtx[0], (-0.5, 0.5, 0.1), absolute=True)
+        skinutils.copy_weights_closest_vertex(self.source_cube, self.target_cube)
+        self.assertEqual({self.source_joints[0]: 1.0}, skinutils.get_weighted_influences(self.target_cube.vtx[0]))
+
+
+class TestSkinWeightTransfer(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestSkinWeightTransfer, self).setUp()
+        self.source_cube, self.source_joints, self.source_skincl = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(self.source_skincl, self.source_cube.vtx[:4], transformValue=(self.source_joints[0], 1.0))
+        pm.skinPercent(self.source_skincl, self.source_cube.vtx[4:], transformValue=(self.source_joints[1], 1.0))
+        self.target_cubes = [self.create_cube() for _ in range(3)]
+        [skinutils.bind_mesh_to_joints(target_cube, self.source_joints) for target_cube in self.target_cubes]
+
+    def _assert_weights_match_source(self, target_cube):
+        for vertex in target_cube.vtx:
+            expected = skinutils.get_weighted_influences(self.source_cube.vtx[vertex.index()])
+            self.assertEqual(expected, skinutils.get_weighted_influences(vertex))
+
+    def test_copy_to_meshes(self):
+        transfer = skinutils.SkinWeightTransfer(self.source_cube)
+        transfer.copy_to_meshes(self.target_cubes)
+        [self._assert_weights_match_source(target_cube) for target_cube in self.target_cubes]
+
+    def test_copy_to_meshes_with_workers(self):
+        transfer = skinutils.SkinWeightTransfer(self.source_cube)
+        transfer.copy_to_meshes(self.target_cubes, max_workers=2)
+        [self._assert_weights_match_source(target_cube) for target_cube in self.target_cubes]
+
+    def test_vert_order(self):
+        pm.move(self.target_cubes[0], (5.0, 0.0, 0.0))
+        transfer = skinutils.SkinWeightTransfer(self.source_cube)
+        transfer.copy_to(self.target_cubes[0], skinutils.SURFACE_ASSOCIATION_VERT_ORDER)
+        self._assert_weights_match_source(self.target_cubes[0])
+
+    def test_maps_shared_influences_once(self):
+        transfer = skinutils.SkinWeightTransfer(self.source_cube)
+        transfer.copy_to_meshes(self.target_cubes)
+        self.assertEqual(1, len(transfer._influence_map_matrices))
+
+
 class TestGetRootFromSkinnedMesh(mayatest.MayaTestCase):
     def test_get_root_joint_from_skinned_mesh(self):
         test_cube = self.create_cube()
@@ -649,6 +763,40 @@ class TestGetVertsToWeightedInfluences(mayatest.MayaTestCase):
         self.assertDictEqual(expected, result)
 
 
+class TestSkinWeights(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestSkinWeights, self).setUp()
+        self.test_cube, self.test_joints, self.skin_cluster = self.create_skinned_cube()
+        pm.skinPercent(self.skin_cluster, self.test_cube.vtx, transformValue=(self.test_joints[0], 1.0))
+        pm.skinPercent(self.skin_cluster, self.test_cube.vtx[3],
+                       transformValue=[(self.test_joints[1], 0.5), (self.test_joints[2], 0.3),
+                                       (self.test_joints[3], 0.2)])
+
+    def test_weights_shape(self):
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(self.skin_cluster)
+        self.assertEqual((8, 5), skin_weights.weights.shape)
+        self.assertListEqual(self.test_joints, skin_weights.influences)
+
+    def test_row_sums(self):
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(self.skin_cluster)
+        self.assertListEqual([1.0] * 8, [round(x, 6) for x in skin_weights.row_sums().tolist()])
+
+    def test_nonzero_counts(self):
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(self.skin_cluster)
+        self.assertListEqual([1, 1, 1, 3, 1, 1, 1, 1], skin_weights.nonzero_counts().tolist())
+
+    def test_top_k(self):
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(self.skin_cluster)
+        columns, weights = skin_weights.top_k(2)
+        self.assertListEqual([1, 2], columns[3].tolist())
+        self.assertListEqual([0.5, 0.3], [round(x, 6) for x in weights[3].tolist()])
+
+    def test_subset_of_verts(self):
+        skin_weights = skinutils.SkinWeights.from_skin_cluster(self.skin_cluster, self.test_cube.vtx[2:4])
+        self.assertListEqual([2, 3, 4], skin_weights.vert_indexes.tolist())
+        self.assertEqual((3, 5), skin_weights.weights.shape)
+
+
 class TestGetInfluenceIndex(mayatest.MayaTestCase):
     def test_influence_passed_as_pynode(self):
         test_cube, test_joints, skin_cluster = self.create_skinned_cube()
@@ -862,6 +1010,32 @@ class TestSetWeights(mayatest.MayaTestCase):
         inf_values = pm.skinPercent(test_skincluster, test_cube.vtx[5], q=True, value=True)
         self.assertListEqual([0.5, 0.0, 0.0, 0.0, 0.5], inf_values)
 
+    def test_does_not_change_other_verts(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(test_skincluster, test_cube.vtx, transformValue=(test_joints[0], 1.0))
+        pm.skinPercent(test_skincluster, test_cube.vtx[1], transformValue=(test_joints[1], 0.5))
+        skinutils.set_weights({0: {test_joints[1]: 1.0}}, skin_cluster=test_skincluster)
+        inf_values = pm.skinPercent(test_skincluster, test_cube.vtx[1], q=True, value=True)
+        self.assertListEqual([0.5, 0.5], inf_values)
+
+    def test_set_weights_array_csr(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(test_skincluster, test_cube.vtx, transformValue=(test_joints[0], 1.0))
+        csr_weights = ([1.0, 0.5, 0.5], [1, 0, 1], [0, 1, 3], (2, 2))
+        skinutils.set_weights_array(test_skincluster, [5, 2], csr_weights)
+        inf_values = pm.skinPercent(test_skincluster, test_cube.vtx[5], q=True, value=True)
+        self.assertListEqual([0.0, 1.0], inf_values)
+        inf_values = pm.skinPercent(test_skincluster, test_cube.vtx[2], q=True, value=True)
+        self.assertListEqual([0.5, 0.5], inf_values)
+
+    def test_undo(self):
+        test_cube, test_joints, test_skincluster = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(test_skincluster, test_cube.vtx, transformValue=(test_joints[0], 1.0))
+        skinutils.set_weights({3: {test_joints[1]: 1.0}}, skin_cluster=test_skincluster)
+        pm.undo()
+        inf_values = pm.skinPercent(test_skincluster, test_cube.vtx[3], q=True, value=True)
+        self.assertListEqual([1.0, 0.0], inf_values)
+
     def test_raises_value_error_if_no_cluster_or_mesh(self):
         verts_to_infs_wts = {0: {'foo': 1.0}}
         self.assertRaises(ValueError, skinutils.set_weights, verts_to_infs_wts)
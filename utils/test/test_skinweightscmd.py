@@ -0,0 +1,49 @@
+import numpy as np
+import pymel.core as pm
+
+import flottitools.test as mayatest
+import flottitools.utils.skinweightscmd as skinweightscmd
+
+
+class TestSetWeights(mayatest.MayaTestCase):
+    def setUp(self):
+        super(TestSetWeights, self).setUp()
+        self.test_cube, self.test_joints, self.skin_cluster = self.create_skinned_cube(joint_count=2)
+        pm.skinPercent(self.skin_cluster, self.test_cube.vtx, transformValue=(self.test_joints[0], 1.0))
+
+    def test_sets_weights(self):
+        skinweightscmd.set_weights(self.skin_cluster, [1, 4], [[0.0, 1.0], [0.25, 0.75]])
+        self.assertListEqual([0.0, 1.0], pm.skinPercent(self.skin_cluster, self.test_cube.vtx[1], q=True, value=True))
+        self.assertListEqual([0.25, 0.75], pm.skinPercent(self.skin_cluster, self.test_cube.vtx[4], q=True, value=True))
+
+    def test_undo_redo(self):
+        skinweightscmd.set_weights(self.skin_cluster, [1], [[0.0, 1.0]])
+        pm.undo()
+        self.assertListEqual([1.0, 0.0], pm.skinPercent(self.skin_cluster, self.test_cube.vtx[1], q=True, value=True))
+        pm.redo()
+        self.assertListEqual([0.0, 1.0], pm.skinPercent(self.skin_cluster, self.test_cube.vtx[1], q=True, value=True))
+
+    def test_record_only_keeps_changed_weights(self):
+        # two influences changed on one vertex: 2 * (int32 vert + int32 inf + float64 old + float64 new)
+        result = skinweightscmd.set_weights(self.skin_cluster, [0, 1, 2], [[1.0, 0.0], [0.0, 1.0], [1.0, 0.0]])
+        self.assertEqual(48, result)
+
+    def test_no_changes(self):
+        result = skinweightscmd.set_weights(self.skin_cluster, [0, 1], np.array([[1.0, 0.0], [1.0, 0.0]]))
+        self.assertEqual(0, result)
+
+    def test_undo_memory_limit_releases_oldest_record(self):
+        optionvar = skinweightscmd.UNDO_MEMORY_LIMIT_OPTIONVAR
+        had_optionvar = pm.optionVar(exists=optionvar)
+        initial_limit = skinweightscmd.get_undo_memory_limit()
+        try:
+            skinweightscmd.set_undo_memory_limit(48)
+            skinweightscmd.set_weights(self.skin_cluster, [1], [[0.0, 1.0]])
+            skinweightscmd.set_weights(self.skin_cluster, [2], [[0.0, 1.0]])
+            self.assertEqual(48, skinweightscmd.get_undo_memory_usage())
+        finally:
+            if had_optionvar:
+                skinweightscmd.set_undo_memory_limit(initial_limit)
+            else:
+                # don't leave the optionVar in the user's prefs
+                pm.optionVar(remove=optionvar)
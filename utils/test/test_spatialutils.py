@@ -0,0 +1,113 @@
+import unittest
+
+import numpy as np
+
+import flottitools.utils.spatialutils as spatialutils
+
+
+def _get_closest_distances_brute_force(points, triangles, query_points):
+    corners = points[triangles]
+    distances = []
+    for query_point in query_points:
+        repeated = np.repeat(query_point[np.newaxis], len(triangles), axis=0)
+        closest, _ = spatialutils.closest_points_on_triangles(repeated, corners[:, 0], corners[:, 1], corners[:, 2])
+        distances.append(((closest - query_point) ** 2).sum(axis=1).min())
+    return np.array(distances)
+
+
+def _create_grid_mesh(size=10):
+    xs, zs = np.meshgrid(np.arange(size, dtype=np.float64), np.arange(size, dtype=np.float64), indexing='ij')
+    points = np.stack([xs.ravel(), np.sin(xs.ravel() + zs.ravel()), zs.ravel()], axis=1)
+    triangles = []
+    for x in range(size - 1):
+        for z in range(size - 1):
+            a, b, c, d = x * size + z, x * size + z + 1, (x + 1) * size + z, (x + 1) * size + z + 1
+            triangles.extend([(a, b, c), (b, d, c)])
+    return points, np.array(triangles)
+
+
+class TestClosestPointsOnTriangles(unittest.TestCase):
+    def setUp(self):
+        self.corners = [np.array([[0.0, 0.0, 0.0]]), np.array([[1.0, 0.0, 0.0]]), np.array([[0.0, 1.0, 0.0]])]
+
+    def test_inside(self):
+        closest, barycentrics = spatialutils.closest_points_on_triangles(np.array([[0.25, 0.25, 1.0]]), *self.corners)
+        np.testing.assert_allclose([[0.25, 0.25, 0.0]], closest)
+        np.testing.assert_allclose([[0.5, 0.25, 0.25]], barycentrics)
+
+    def test_corner(self):
+        closest, barycentrics = spatialutils.closest_points_on_triangles(np.array([[-1.0, -1.0, 0.0]]), *self.corners)
+        np.testing.assert_allclose([[0.0, 0.0, 0.0]], closest)
+        np.testing.assert_allclose([[1.0, 0.0, 0.0]], barycentrics)
+
+    def test_edge(self):
+        closest, barycentrics = spatialutils.closest_points_on_triangles(np.array([[1.0, 1.0, 0.0]]), *self.corners)
+        np.testing.assert_allclose([[0.5, 0.5, 0.0]], closest)
+        np.testing.assert_allclose([[0.0, 0.5, 0.5]], barycentrics)
+
+
+class TestTriangleGrid(unittest.TestCase):
+    def setUp(self):
+        self.points, self.triangles = _create_grid_mesh()
+        self.grid = spatialutils.TriangleGrid(self.points, self.triangles)
+
+    def test_matches_brute_force(self):
+        query_points = np.random.RandomState(0).uniform(-5.0, 15.0, (200, 3))
+        result = ((self.grid.closest_points(query_points) - query_points) ** 2).sum(axis=1)
+        expected = _get_closest_distances_brute_force(self.points, self.triangles, query_points)
+        np.testing.assert_allclose(expected, result)
+
+    def test_points_on_mesh(self):
+        triangle_indexes, barycentrics = self.grid.closest_triangles(self.points)
+        result = self.points[self.triangles[triangle_indexes]] * barycentrics[:, :, np.newaxis]
+        np.testing.assert_allclose(self.points, result.sum(axis=1), atol=1e-12)
+
+    def test_far_points(self):
+        query_points = np.array([[1000.0, 0.0, 0.0], [-50.0, 200.0, 3.0]])
+        result = ((self.grid.closest_points(query_points) - query_points) ** 2).sum(axis=1)
+        expected = _get_closest_distances_brute_force(self.points, self.triangles, query_points)
+        np.testing.assert_allclose(expected, result)
+
+    def test_closest_vertex(self):
+        grid = spatialutils.TriangleGrid.from_points(self.points)
+        query_points = np.random.RandomState(1).uniform(-2.0, 12.0, (200, 3))
+        result, _ = grid.closest_triangles(query_points)
+        distances = ((query_points[:, np.newaxis] - self.points[np.newaxis]) ** 2).sum(axis=2)
+        np.testing.assert_allclose(distances.min(axis=1), distances[np.arange(len(query_points)), result])
+
+
+class TestGetInverseDistanceScalers(unittest.TestCase):
+    def test_matches_inverse_distances(self):
+        query_points = np.array([[0.0, 0.0, 0.0], [0.0, 3.0, 0.0]])
+        sample_points = np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0]])
+        result = spatialutils.get_inverse_distance_scalers(query_points, sample_points)
+        root_ten = np.sqrt(10.0)
+        expected = [[2.0 / 3.0, 1.0 / 3.0], [1.0 / (1.0 + root_ten), root_ten / (1.0 + root_ten)]]
+        np.testing.assert_allclose(expected, result)
+
+    def test_coincident_sample(self):
+        query_points = np.array([[1.0, 0.0, 0.0]])
+        sample_points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        result = spatialutils.get_inverse_distance_scalers(query_points, sample_points)
+        np.testing.assert_allclose([[0.0, 1.0, 0.0]], result)
+
+
+class TestGetCoincidentPointIndexes(unittest.TestCase):
+    def test_exact_duplicates(self):
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+        result = spatialutils.get_coincident_point_indexes(points)
+        self.assertListEqual([0, 2, 3], result.tolist())
+
+    def test_tolerance_across_cells(self):
+        points = np.array([[0.0, 0.0, 0.0], [0.0009, 0.0, 0.0], [1.0, 1.0, 1.0], [1.0, 1.0, 1.0011]])
+        result = spatialutils.get_coincident_point_indexes(points, tolerance=0.001)
+        self.assertListEqual([0, 1], result.tolist())
+
+    def test_matches_brute_force(self):
+        points = np.random.RandomState(0).uniform(0.0, 1.0, (500, 3)).round(2)
+        tolerance = 0.02
+        distances = ((points[:, np.newaxis] - points[np.newaxis]) ** 2).sum(axis=2)
+        np.fill_diagonal(distances, np.inf)
+        expected = np.flatnonzero((distances <= tolerance * tolerance).any(axis=1))
+        result = spatialutils.get_coincident_point_indexes(points, tolerance)
+        np.testing.assert_array_equal(expected, result)
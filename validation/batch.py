@@ -0,0 +1,160 @@
+"""
+Batch validation of many scene files with a pool of mayapy worker processes.
+
+Each worker is a long running mayapy that reads scene paths from stdin, validates them with
+flottitools.validation.engine and writes one JSON report per scene to stdout. Keeping workers alive
+avoids paying mayapy startup for every scene. A scene that takes longer than the timeout, or crashes
+its worker, gets an error report and the worker is replaced, so one bad file can't stop the batch.
+The parent process only hands out scene paths and merges reports. It never loads pymel or opens a scene:
+
+    mayapy -m flottitools.validation.batch path/to/scenes --preset Meshes --workers 8 --output report.json
+"""
+import argparse
+import json
+import os
+import sys
+import traceback
+
+import flottitools.batchtool.batchutils as batchutils
+import flottitools.batchtool.mayapypool as mayapypool
+
+
+OPERATION_NAME = 'Validation'
+DEFAULT_TIMEOUT = mayapypool.DEFAULT_TIMEOUT
+DEFAULT_MAX_SCENES_PER_WORKER = mayapypool.DEFAULT_MAX_ITEMS_PER_WORKER
+READY_MARKER = mayapypool.READY_MARKER
+REPORT_MARKER = mayapypool.RESULT_MARKER
+
+# matches engine.SEVERITY_NAMES[engine.SEVERITY_ERROR]. The engine is not imported here because it loads pymel.
+SEVERITY_ERROR_NAME = 'error'
+
+BatchWorkerError = mayapypool.WorkerError
+BatchWorkerTimeout = mayapypool.WorkerTimeout
+BatchWorkerCrashed = mayapypool.WorkerCrashed
+
+
+def get_failed_report(error_message):
+    return {'severity': SEVERITY_ERROR_NAME, 'error': error_message, 'checks': {}}
+
+
+def get_report_summary(report):
+    if report.get('error'):
+        return 'failed: {}'.format(report['error'])
+    failed_check_names = sorted([name for name, check in report['checks'].items() if not check['passed']])
+    if not failed_check_names:
+        return report['severity']
+    return '{0}: {1}'.format(report['severity'], ', '.join(failed_check_names))
+
+
+class BatchWorker(mayapypool.MayapyWorker):
+    module_name = 'flottitools.validation.batch'
+
+    def __init__(self, mayapy_path=None, presets=None, check_names=None):
+        super(BatchWorker, self).__init__(mayapy_path)
+        self.presets = presets or []
+        self.check_names = check_names or []
+
+    def get_worker_args(self):
+        args = []
+        for preset in self.presets:
+            args.extend(['--preset', preset])
+        for check_name in self.check_names:
+            args.extend(['--check', check_name])
+        return args
+
+    def validate(self, scene_path, timeout=DEFAULT_TIMEOUT):
+        """Returns the report dict of scene_path. Raises BatchWorkerError if the worker times out or dies."""
+        return self.request(scene_path, timeout)
+
+
+def validate_scene_files(scene_paths, presets=None, check_names=None, worker_count=None, timeout=DEFAULT_TIMEOUT,
+                         mayapy_path=None, max_scenes_per_worker=DEFAULT_MAX_SCENES_PER_WORKER, logger=None,
+                         worker_class=BatchWorker, progress_bar=None):
+    """
+    Validates scenes in parallel mayapy workers.
+
+    :param worker_count: number of mayapy processes. Defaults to one per core.
+    :param timeout: seconds a single scene may take before its worker is killed.
+    :param max_scenes_per_worker: a worker is restarted after this many scenes to bound memory growth.
+    :param logger: optional batchutils.Logger that gets one line per scene.
+    :param progress_bar: optional progress reporter, only updated from the calling thread. If it is canceled
+        workers finish the scene they are on and ProgressCanceled is raised.
+    :returns: {scene_path: report dict} in scene_paths order. Failed scenes have an 'error' message.
+    """
+    scene_paths = [str(p) for p in scene_paths]
+
+    def on_scene_done(scene_path, report):
+        if logger:
+            logger.log(scene_path, get_report_summary(report))
+        if progress_bar:
+            progress_bar.update_label_and_iter_val('Validated {}'.format(os.path.basename(scene_path)))
+
+    if progress_bar:
+        progress_bar.reset()
+        progress_bar.set_maximum(len(scene_paths))
+    reports = mayapypool.run_pool(scene_paths,
+                                  create_worker=lambda: worker_class(mayapy_path, presets, check_names),
+                                  run_item=lambda worker, scene_path: worker.validate(scene_path, timeout),
+                                  get_failed_result=lambda scene_path, message: get_failed_report(message),
+                                  worker_count=worker_count, max_items_per_worker=max_scenes_per_worker,
+                                  on_item_done=on_scene_done)
+    return dict(zip(scene_paths, reports))
+
+
+def run_worker_loop(presets=None, check_names=None):
+    """Worker side of the pool. Runs in mayapy and validates every scene path read from stdin."""
+    import flottitools.validation.engine as val_engine
+    import flottitools.validation.profiling as val_profiling
+
+    engine = val_engine.ValidationEngine(val_engine.get_check_classes(presets, check_names),
+                                         profile_dir=os.environ.get(val_profiling.PROFILE_DIR_ENV_VAR),
+                                         track_memory=val_profiling.is_memory_tracking_enabled())
+    mayapypool.write_ready()
+    for scene_path in mayapypool.iterate_requests():
+        try:
+            val_engine.pm.openFile(scene_path, force=True)
+            report = engine.run().to_dict()
+        except Exception:
+            report = get_failed_report(traceback.format_exc())
+        mayapypool.write_result(report)
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if any scene has errors or failed, else 0."""
+    parser = argparse.ArgumentParser(description='Validate many Maya scenes in parallel mayapy processes.')
+    parser.add_argument('paths', nargs='*', help='scene files or directories to search for scenes.')
+    parser.add_argument('--filter', default=batchutils.SCENE_FILTER_STRING,
+                        help='comma separated file patterns to match in directories.')
+    parser.add_argument('--preset', action='append', help='only run checks in this preset. Can be repeated.')
+    parser.add_argument('--check', action='append', dest='checks', help='only run this check. Can be repeated.')
+    parser.add_argument('--workers', type=int, help='number of mayapy processes. Defaults to one per core.')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='seconds allowed per scene.')
+    parser.add_argument('--mayapy', help='mayapy executable. Defaults to $MAYA_LOCATION/bin/mayapy.')
+    parser.add_argument('--output', help='write the merged JSON report to this file instead of stdout.')
+    parser.add_argument('--log-dir', help='write a Batcher style log file to this directory.')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker_loop(args.preset, args.checks)
+        return 0
+
+    scene_paths = batchutils.get_matching_file_paths(args.paths, args.filter)
+    logger = batchutils.Logger(scene_paths, OPERATION_NAME, args.log_dir) if args.log_dir else None
+    path_to_report = validate_scene_files(scene_paths, args.preset, args.checks, worker_count=args.workers,
+                                          timeout=args.timeout, mayapy_path=args.mayapy, logger=logger)
+    if logger:
+        logger.finish()
+
+    report_json = json.dumps(path_to_report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json)
+    else:
+        sys.stdout.write(report_json + '\n')
+    has_errors = any([r['severity'] == SEVERITY_ERROR_NAME for r in path_to_report.values()])
+    return 1 if has_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
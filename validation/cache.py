@@ -0,0 +1,137 @@
+"""
+Incremental validation.
+
+ValidationCache keeps what each check found on each node together with a fingerprint of the content the
+check looked at. Node dirty callbacks drop the fingerprints of nodes that may have changed. A node that was
+not dirtied reuses its cached result without being read at all. A dirtied node is fingerprinted again and
+only validated again if the fingerprint changed.
+"""
+import hashlib
+
+import maya.api.OpenMaya as om
+import numpy as np
+
+import flottitools.utils.meshutils as meshutils
+import flottitools.utils.skinutils as skinutils
+
+
+# content a check's result can depend on. See ValidationCheck.fingerprint_parts.
+FINGERPRINT_TOPOLOGY = 'topology'
+FINGERPRINT_POINTS = 'points'
+FINGERPRINT_UVS = 'uvs'
+FINGERPRINT_COLORS = 'colors'
+FINGERPRINT_WEIGHTS = 'weights'
+
+
+def get_fingerprint_part(node, part):
+    """Returns a hash of one part of the content of node and its mesh shapes."""
+    part_hash = hashlib.sha1()
+    if part == FINGERPRINT_WEIGHTS:
+        skin_cluster = skinutils.get_skincluster(node)
+        if skin_cluster:
+            skin_weights = skinutils.SkinWeights.from_skin_cluster(skin_cluster)
+            part_hash.update(' '.join([inf.name() for inf in skin_weights.influences]).encode('utf-8'))
+            part_hash.update(np.ascontiguousarray(skin_weights.weights).tobytes())
+        return part_hash.hexdigest()
+    array_names = {FINGERPRINT_TOPOLOGY: ('poly_vert_counts', 'poly_verts'),
+                   FINGERPRINT_POINTS: ('points',),
+                   FINGERPRINT_UVS: ('uv_counts', 'uv_ids'),
+                   FINGERPRINT_COLORS: ('vertex_colors',)}[part]
+    for mesh_node in meshutils.get_mesh_nodes(node):
+        part_hash.update(mesh_node.name().encode('utf-8'))
+        part_hash.update(meshutils.get_mesh_scan(mesh_node).get_hash(*array_names).encode('utf-8'))
+    return part_hash.hexdigest()
+
+
+class ValidationCache(object):
+    def __init__(self):
+        # {(check_name, node): (fingerprint, {result_node: issue_data})}
+        self._entries = {}
+        # {node: {fingerprint_part: hash}}. A node is dirty when it has no entry here.
+        self._node_to_part_hashes = {}
+        # {node: [callback_id]}
+        self._node_to_callback_ids = {}
+        # nodes of the previous scene are gone once another scene is opened
+        self._scene_callback_ids = [om.MSceneMessage.addCallback(message, self._on_scene_changed)
+                                    for message in (om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen)]
+
+    def get_fingerprint(self, node, parts):
+        part_hashes = self._node_to_part_hashes.setdefault(node, {})
+        for part in parts:
+            if part not in part_hashes:
+                part_hashes[part] = get_fingerprint_part(node, part)
+        return tuple([part_hashes[part] for part in parts])
+
+    def split(self, check, nodes):
+        """
+        Splits nodes into those with a cached result that is still valid and those that need validating.
+
+        :returns: ({result_node: issue_data} of the cached nodes, nodes to validate)
+        """
+        cached_issue_data = {}
+        nodes_to_validate = []
+        for node in nodes:
+            entry = self._entries.get((check.name, node))
+            if entry and entry[0] == self.get_fingerprint(node, check.fingerprint_parts):
+                cached_issue_data.update(entry[1])
+            else:
+                nodes_to_validate.append(node)
+        return cached_issue_data, nodes_to_validate
+
+    def store(self, check, nodes, nodes_to_issue_data):
+        """
+        Caches what check.validate(nodes) returned for each of nodes.
+        Results keyed by a mesh shape are stored with the transform they were validated through.
+        """
+        result_node_to_node = {}
+        for node in nodes:
+            result_node_to_node[node] = node
+            for mesh_node in meshutils.get_mesh_nodes(node):
+                result_node_to_node.setdefault(mesh_node, node)
+        node_to_issue_data = dict([(node, {}) for node in nodes])
+        for result_node, issue_data in nodes_to_issue_data.items():
+            node = result_node_to_node.get(result_node)
+            if node is None:
+                # there is no telling which node this result came from, so don't cache any of them
+                return
+            node_to_issue_data[node][result_node] = issue_data
+        for node, issue_data in node_to_issue_data.items():
+            fingerprint = self.get_fingerprint(node, check.fingerprint_parts)
+            self._entries[(check.name, node)] = (fingerprint, issue_data)
+            self._watch(node)
+
+    def set_dirty(self, node):
+        self._node_to_part_hashes.pop(node, None)
+
+    def clear(self):
+        for callback_ids in self._node_to_callback_ids.values():
+            om.MMessage.removeCallbacks(callback_ids)
+        self._entries = {}
+        self._node_to_part_hashes = {}
+        self._node_to_callback_ids = {}
+
+    def close(self):
+        """Clears the cache and removes every callback. The cache can't be used afterwards."""
+        self.clear()
+        om.MMessage.removeCallbacks(self._scene_callback_ids)
+        self._scene_callback_ids = []
+
+    def _watch(self, node):
+        """Makes changes to node, its mesh shapes or its skinCluster set node dirty."""
+        if node in self._node_to_callback_ids:
+            return
+        watched_nodes = [node] + meshutils.get_mesh_nodes(node)
+        skin_cluster = skinutils.get_skincluster(node)
+        if skin_cluster:
+            watched_nodes.append(skin_cluster)
+        callback_ids = []
+        for watched_node in watched_nodes:
+            callback_ids.append(om.MNodeMessage.addNodeDirtyCallback(watched_node.__apimobject__(),
+                                                                     self._on_node_dirty, node))
+        self._node_to_callback_ids[node] = callback_ids
+
+    def _on_node_dirty(self, watched_mobject, node):
+        self.set_dirty(node)
+
+    def _on_scene_changed(self, *args):
+        self.clear()
@@ -0,0 +1,539 @@
+"""
+Headless validation.
+
+Every validation check lives here as a ValidationCheck without any Qt, so checks can run in mayapy.
+ValidationEngine runs checks and returns a ValidationReport. The validator UI in validator.py is one consumer,
+the command line entry point at the bottom of this module is another:
+
+    mayapy -m flottitools.validation.engine scene_a.ma scene_b.mb --preset Meshes --output report.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import pymel.core as pm
+
+import flottitools.utils.inventoryutils as invutils
+import flottitools.utils.materialutils as matutils
+import flottitools.utils.meshutils as meshutils
+import flottitools.utils.skinutils as skinutils
+import flottitools.validation.cache as val_cache
+import flottitools.validation.materials as val_mats
+import flottitools.validation.meshes as val_mesh
+import flottitools.validation.profiling as val_profiling
+import flottitools.validation.skinmesh as val_skmesh
+
+
+# categories
+CATEGORY_SKMESH = 'skinned mesh'
+CATEGORY_MESH = 'static mesh'
+CATEGORY_MAT = 'materials'
+
+# presets
+PRESET_ALL = 'All'
+PRESET_NONE = 'None'
+PRESET_MATERIALS_ONLY = 'Materials Only'
+PRESET_SKINNED_MESHES = 'Skinned Meshes'
+PRESET_MESHES = 'Meshes'
+PRESETS = [PRESET_ALL, PRESET_SKINNED_MESHES, PRESET_MESHES, PRESET_MATERIALS_ONLY, PRESET_NONE]
+
+# severity
+SEVERITY_ERROR = 0
+SEVERITY_WARNING = 1
+SEVERITY_PASS = 2
+
+SEVERITY_NAMES = {SEVERITY_ERROR: 'error',
+                  SEVERITY_WARNING: 'warning',
+                  SEVERITY_PASS: 'pass'}
+
+
+class ValidationCheck(object):
+    """
+    A single validation check. Subclasses fill in the class attributes and implement
+    get_nodes_to_validate() and validate(), and fix() if has_fix_method is True.
+
+    fingerprint_parts lists the val_cache.FINGERPRINT_* content the result of a node depends on. A ValidationCache
+    reuses a node's result until that content changes. Checks whose result depends on anything else,
+    like other nodes in the scene or construction history, leave it empty and are never cached.
+    """
+    name = None
+    label = None
+    description = None
+    category = None
+    presets = []
+    issue_report_label = 'Error in {}'
+    severity = None
+    has_fix_method = False
+    fingerprint_parts = ()
+
+    def get_nodes_to_validate(self):
+        raise NotImplementedError
+
+    def validate(self, nodes, progress_bar=None):
+        """
+        :param nodes: nodes to validate. Never empty.
+        :param progress_bar: optional flottitools.utils.progressutils.ProgressReporter or
+            flottitools.ui.ProgressBarWithLabel. Its updates raise ProgressCanceled once it is canceled.
+        :returns: {node: issue_data} of only the nodes with issues.
+        """
+        raise NotImplementedError
+
+    def fix(self, nodes_to_issue_data, progress_bar=None):
+        """:param nodes_to_issue_data: {node: issue_data} as returned by validate()"""
+        raise NotImplementedError('{} has no automatic fix.'.format(self.label))
+
+    def get_component_count(self, nodes):
+        """Returns how many components of nodes the check works on. Defaults to the vertices of their meshes."""
+        mesh_nodes = [mesh_node for node in nodes for mesh_node in meshutils.get_mesh_nodes(node)]
+        return sum([meshutils.get_mesh_scan(mesh_node).fn_mesh.numVertices for mesh_node in mesh_nodes])
+
+
+class ExceedingVertsCheck(ValidationCheck):
+    name = 'exceeding_verts'
+    label = 'Exceeding Verts'
+    description = 'Vertices with more than four influences.'
+    category = CATEGORY_SKMESH
+    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
+    issue_report_label = 'Vertices in {} with more than four influences'
+    severity = SEVERITY_ERROR
+    has_fix_method = True
+    fingerprint_parts = (val_cache.FINGERPRINT_TOPOLOGY, val_cache.FINGERPRINT_WEIGHTS)
+
+    def get_nodes_to_validate(self):
+        return skinutils.get_skinned_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_skmesh.get_exceeding_verts_from_scene(nodes, progress_bar)
+
+    def fix(self, nodes_to_issue_data, progress_bar=None):
+        val_skmesh.prune_exceeding_influences_from_scene_validation(nodes_to_issue_data, progress_bar)
+
+
+class NonNormalizedVertsCheck(ValidationCheck):
+    name = 'non_normalized_verts'
+    label = 'Non-normalized Verts'
+    description = 'Vertices with non normalized weights.'
+    category = CATEGORY_SKMESH
+    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
+    issue_report_label = 'Vertices in {} with non-normalized weights'
+    severity = SEVERITY_ERROR
+    has_fix_method = True
+    fingerprint_parts = (val_cache.FINGERPRINT_TOPOLOGY, val_cache.FINGERPRINT_WEIGHTS)
+
+    def get_nodes_to_validate(self):
+        return skinutils.get_skinned_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_skmesh.get_non_normalized_verts_from_scene(nodes, progress_bar=progress_bar)
+
+    def fix(self, nodes_to_issue_data, progress_bar=None):
+        val_skmesh.normalize_non_normalized_verts_from_scene_validation(nodes_to_issue_data, progress_bar)
+
+
+class ExceedingJointsCheck(ValidationCheck):
+    name = 'exceeding_joints'
+    label = 'Too Many Joints'
+    description = 'Meshes skinned to more than 64 joints.'
+    category = CATEGORY_SKMESH
+    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} is skinned to more than 64 joints'
+    severity = SEVERITY_ERROR
+    fingerprint_parts = (val_cache.FINGERPRINT_WEIGHTS,)
+
+    def get_nodes_to_validate(self):
+        return skinutils.get_skinned_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_skmesh.get_joint_counts_from_scene(nodes, progress_bar=progress_bar)
+
+
+class ExtraRootJointsCheck(ValidationCheck):
+    name = 'extra_root_joints'
+    label = 'Extra Root Joints'
+    description = 'Skeletons that have more than one root.'
+    category = CATEGORY_SKMESH
+    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has more than one root joint in its skeleton.'
+    severity = SEVERITY_ERROR
+
+    def get_nodes_to_validate(self):
+        return skinutils.get_skinned_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_skmesh.get_extra_skeleton_roots_from_scene(nodes, progress_bar=progress_bar)
+
+
+class JointsWithDuplicatedNamesCheck(ValidationCheck):
+    name = 'duplicated_joint_names'
+    label = 'Joints with non unique names'
+    description = 'Joints with non unique names'
+    category = CATEGORY_SKMESH
+    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} is sharing its name with another joint.'
+    severity = SEVERITY_ERROR
+
+    def get_nodes_to_validate(self):
+        return skinutils.get_skinned_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_skmesh.get_dup_joint_names_from_scene(nodes)
+
+
+class MissingUVsCheck(ValidationCheck):
+    name = 'missing_uvs'
+    label = 'Missing UVs'
+    description = 'Meshes with unmapped faces.'
+    category = CATEGORY_MESH
+    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has faces that are missing UVs.'
+    severity = SEVERITY_ERROR
+    fingerprint_parts = (val_cache.FINGERPRINT_TOPOLOGY, val_cache.FINGERPRINT_UVS)
+
+    def get_nodes_to_validate(self):
+        return meshutils.get_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mesh.get_missing_uvs_from_scene(nodes, progress_bar=progress_bar)
+
+
+class MultipleShapeNodesCheck(ValidationCheck):
+    name = 'multiple_shape_nodes'
+    label = 'Multiple shape nodes'
+    description = 'Meshes with too many shape nodes.'
+    category = CATEGORY_MESH
+    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has too many shape nodes.'
+    severity = SEVERITY_ERROR
+
+    def get_nodes_to_validate(self):
+        return meshutils.get_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mesh.get_meshes_with_multiple_shapes_from_scene(nodes, progress_bar=progress_bar)
+
+
+class DirtyHistoryMeshCheck(ValidationCheck):
+    name = 'dirty_history'
+    label = 'Dirty construction history'
+    description = 'Meshes with dirty construction history.'
+    category = CATEGORY_MESH
+    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has dirty construction history.'
+    severity = SEVERITY_WARNING
+    has_fix_method = True
+
+    def get_nodes_to_validate(self):
+        return meshutils.get_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mesh.get_meshes_with_dirty_history_from_scene(nodes, progress_bar=progress_bar)
+
+    def fix(self, nodes_to_issue_data, progress_bar=None):
+        val_mesh.fix_meshes_with_dirty_history(list(nodes_to_issue_data.keys()))
+
+
+class OverlappingVerticesCheck(ValidationCheck):
+    name = 'overlapping_vertices'
+    label = 'Overlapping Vertices'
+    description = 'Meshes with overlapping vertices.'
+    category = CATEGORY_MESH
+    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has overlapping vertices.'
+    severity = SEVERITY_WARNING
+    fingerprint_parts = (val_cache.FINGERPRINT_TOPOLOGY, val_cache.FINGERPRINT_POINTS)
+
+    def get_nodes_to_validate(self):
+        return meshutils.get_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mesh.get_meshes_with_overlapping_verts_from_scene(nodes, progress_bar=progress_bar)
+
+
+class VertexColorCheck(ValidationCheck):
+    name = 'vertex_colors'
+    label = 'Invalid Vertex Color'
+    description = 'Meshes with invalid vertex color.'
+    category = CATEGORY_MESH
+    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
+    issue_report_label = '{} has vertices with invalid color.'
+    severity = SEVERITY_WARNING
+    has_fix_method = True
+    fingerprint_parts = (val_cache.FINGERPRINT_TOPOLOGY, val_cache.FINGERPRINT_COLORS)
+
+    def get_nodes_to_validate(self):
+        return meshutils.get_meshes_from_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mesh.get_invalid_vertex_colors_from_scene(nodes, progress_bar=progress_bar)
+
+    def fix(self, nodes_to_issue_data, progress_bar=None):
+        val_mesh.remove_vert_color(list(nodes_to_issue_data.items()), progress_bar)
+
+
+class MediaNotInTexturePathsCheck(ValidationCheck):
+    name = 'bad_texture_paths'
+    label = 'Bad Texture Paths'
+    description = '"Media" not in texture paths.'
+    category = CATEGORY_MAT
+    presets = [PRESET_ALL, PRESET_MATERIALS_ONLY]
+    issue_report_label = '{} uses a texture that does not contain "media" in the file path.'
+    severity = SEVERITY_WARNING
+
+    def get_nodes_to_validate(self):
+        return matutils.get_used_materials_in_scene()
+
+    def validate(self, nodes, progress_bar=None):
+        return val_mats.get_materials_with_bad_texture_paths_from_scene(nodes, progress_bar=progress_bar)
+
+
+# registered checks in the order they are run and shown in the validator UI
+CHECKS = [ExceedingVertsCheck,
+          NonNormalizedVertsCheck,
+          ExceedingJointsCheck,
+          ExtraRootJointsCheck,
+          JointsWithDuplicatedNamesCheck,
+          MissingUVsCheck,
+          MultipleShapeNodesCheck,
+          DirtyHistoryMeshCheck,
+          OverlappingVerticesCheck,
+          VertexColorCheck]
+
+
+def register_check(check_class):
+    """Adds check_class to CHECKS. Can be used as a class decorator."""
+    if check_class not in CHECKS:
+        CHECKS.append(check_class)
+    return check_class
+
+
+def get_check_classes(presets=None, names=None):
+    """
+    :param presets: only return checks in any of these presets.
+    :param names: only return checks with these names.
+    """
+    check_classes = CHECKS
+    if presets is not None:
+        check_classes = [c for c in check_classes if set(presets).intersection(c.presets)]
+    if names is not None:
+        check_classes = [c for c in check_classes if c.name in names]
+    return list(check_classes)
+
+
+class ValidationResult(object):
+    """The issues a single check found on a single node."""
+    def __init__(self, check, node, data):
+        """
+        :param check: the ValidationCheck that found the issues.
+        :param data: the check's issue data for node.
+        """
+        self.check = check
+        self.node = node
+        self.data = data
+
+    @property
+    def severity(self):
+        return self.check.severity
+
+    @property
+    def label(self):
+        return self.check.issue_report_label.format(self.node.nodeName())
+
+    def to_dict(self):
+        return {'check': self.check.name,
+                'node': self.node.name(),
+                'severity': SEVERITY_NAMES.get(self.severity),
+                'label': self.label,
+                'count': len(self.data) if hasattr(self.data, '__len__') else 1,
+                'data': to_serializable(self.data)}
+
+
+class ValidationReport(object):
+    def __init__(self, checks, results, check_stats=None):
+        """
+        :param checks: every ValidationCheck that was run, whether or not it found issues.
+        :param results: list of ValidationResult
+        :param check_stats: optional {check_name: val_profiling.CheckStats} of how long each check took.
+        """
+        self.checks = checks
+        self.results = results
+        self.check_stats = check_stats or {}
+
+    @property
+    def severity(self):
+        return min([result.severity for result in self.results] or [SEVERITY_PASS])
+
+    @property
+    def has_errors(self):
+        return self.severity == SEVERITY_ERROR
+
+    def get_results(self, check_name=None):
+        return [r for r in self.results if check_name is None or r.check.name == check_name]
+
+    def to_dict(self):
+        checks = {}
+        for check in self.checks:
+            check_results = [r.to_dict() for r in self.get_results(check.name)]
+            checks[check.name] = {'label': check.label,
+                                  'severity': SEVERITY_NAMES.get(check.severity),
+                                  'passed': not check_results,
+                                  'results': check_results}
+            if check.name in self.check_stats:
+                checks[check.name]['stats'] = self.check_stats[check.name].to_dict()
+        return {'severity': SEVERITY_NAMES.get(self.severity), 'checks': checks}
+
+
+class ValidationEngine(object):
+    def __init__(self, checks=None, cache=None, profile_dir=None, track_memory=False):
+        """
+        :param checks: ValidationCheck classes or instances. Defaults to every registered check.
+        :param cache: optional val_cache.ValidationCache. Nodes whose content did not change since they were last
+                      validated reuse their cached results.
+        :param profile_dir: if given, every check and fix runs under cProfile and dumps its stats here.
+        :param track_memory: record the peak memory of every check and fix. See val_profiling.measure().
+        """
+        checks = CHECKS if checks is None else checks
+        self.checks = [c() if isinstance(c, type) else c for c in checks]
+        self.cache = cache
+        self.profile_dir = profile_dir
+        self.track_memory = track_memory
+        # {(check_name, action): val_profiling.CheckStats} of the last time each check was run and fixed
+        self.check_stats = {}
+
+    def get_nodes_to_validate(self, check, nodes=None):
+        """Returns the nodes check applies to. If nodes is given only those of them."""
+        check_nodes = check.get_nodes_to_validate()
+        if nodes is None:
+            return check_nodes
+        nodes = set(nodes)
+        return [n for n in check_nodes if n in nodes]
+
+    def run_check(self, check, nodes=None, progress_bar=None):
+        """
+        :param nodes: only validate these nodes. If None validate every node check applies to.
+        :returns: list of ValidationResult
+        """
+        stats = val_profiling.CheckStats(check.name, val_profiling.ACTION_VALIDATE)
+        with val_profiling.measure(stats, self._get_profile_path(check, stats.action), self.track_memory):
+            nodes_to_validate = self.get_nodes_to_validate(check, nodes)
+            check_node_count = len(nodes_to_validate)
+            nodes_to_issue_data = {}
+            if self.cache is not None and check.fingerprint_parts:
+                nodes_to_issue_data, nodes_to_validate = self.cache.split(check, nodes_to_validate)
+            # the validation functions validate the whole scene when they are given no nodes
+            if nodes_to_validate:
+                validated_issue_data = check.validate(nodes_to_validate, progress_bar=progress_bar)
+                if self.cache is not None and check.fingerprint_parts:
+                    self.cache.store(check, nodes_to_validate, validated_issue_data)
+                nodes_to_issue_data.update(validated_issue_data)
+        stats.node_count = len(nodes_to_validate)
+        stats.cached_node_count = check_node_count - stats.node_count
+        stats.component_count = check.get_component_count(nodes_to_validate)
+        self.check_stats[(check.name, stats.action)] = stats
+        return [ValidationResult(check, node, data) for node, data in nodes_to_issue_data.items()]
+
+    def fix_check(self, check, nodes_to_issue_data, progress_bar=None):
+        """:param nodes_to_issue_data: {node: issue_data} as returned by check.validate()"""
+        stats = val_profiling.CheckStats(check.name, val_profiling.ACTION_FIX)
+        with val_profiling.measure(stats, self._get_profile_path(check, stats.action), self.track_memory):
+            check.fix(nodes_to_issue_data, progress_bar=progress_bar)
+        stats.node_count = len(nodes_to_issue_data)
+        stats.component_count = check.get_component_count([n for n in nodes_to_issue_data if n.exists()])
+        self.check_stats[(check.name, stats.action)] = stats
+
+    def get_check_stats(self, check, action=val_profiling.ACTION_VALIDATE):
+        """Returns the val_profiling.CheckStats of the last time check was run or fixed. None if it wasn't."""
+        return self.check_stats.get((check.name, action))
+
+    def run(self, nodes=None, progress_bar=None):
+        """Runs every check and returns a ValidationReport."""
+        results = []
+        # checks share one scene inventory for their node queries and one MeshScan per mesh for their mesh reads
+        with invutils.scene_inventory_cache(), meshutils.mesh_scan_cache():
+            for check in self.checks:
+                results.extend(self.run_check(check, nodes, progress_bar))
+        check_stats = dict([(check.name, self.get_check_stats(check)) for check in self.checks])
+        return ValidationReport(self.checks, results, check_stats)
+
+    def fix(self, results, progress_bar=None):
+        """Fixes results with every check that has a fix method. Returns the checks that fixed something."""
+        check_to_issue_data = {}
+        for result in results:
+            if result.check.has_fix_method:
+                check_to_issue_data.setdefault(result.check, {})[result.node] = result.data
+        for check, nodes_to_issue_data in check_to_issue_data.items():
+            self.fix_check(check, nodes_to_issue_data, progress_bar=progress_bar)
+        return list(check_to_issue_data.keys())
+
+    def _get_profile_path(self, check, action):
+        if not self.profile_dir:
+            return None
+        scene_name = os.path.splitext(os.path.basename(pm.sceneName()))[0] or 'untitled'
+        return val_profiling.get_profile_path(self.profile_dir, scene_name, check.name, action)
+
+
+def to_serializable(data):
+    """Converts issue data to JSON friendly values. Nodes become names and component sets become name ranges."""
+    if isinstance(data, meshutils.ComponentSet):
+        return data.get_range_names()
+    if isinstance(data, dict):
+        return dict([(_to_key(k), to_serializable(v)) for k, v in data.items()])
+    if isinstance(data, (list, tuple, set)):
+        return [to_serializable(x) for x in data]
+    if isinstance(data, (str, int, float, bool)) or data is None:
+        return data
+    if isinstance(data, pm.PyNode):
+        return data.name()
+    return str(data)
+
+
+def _to_key(key):
+    serializable_key = to_serializable(key)
+    return serializable_key if isinstance(serializable_key, (str, int, float, bool)) else str(serializable_key)
+
+
+def validate_scene_files(scene_paths, presets=None, check_names=None, profile_dir=None, track_memory=False):
+    """Opens each scene and validates it. Returns {scene_path: ValidationReport.to_dict()}."""
+    engine = ValidationEngine(get_check_classes(presets, check_names), profile_dir=profile_dir,
+                              track_memory=track_memory)
+    path_to_report = {}
+    for scene_path in scene_paths:
+        pm.openFile(scene_path, force=True)
+        path_to_report[scene_path] = engine.run().to_dict()
+    return path_to_report
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if any scene has errors, else 0."""
+    parser = argparse.ArgumentParser(description='Validate Maya scenes without the validator UI.')
+    parser.add_argument('scene_paths', nargs='*', help='.ma or .mb files. Validates the open scene if none.')
+    parser.add_argument('--preset', action='append', choices=PRESETS,
+                        help='only run checks in this preset. Can be repeated.')
+    parser.add_argument('--check', action='append', choices=[c.name for c in CHECKS], dest='checks',
+                        help='only run this check. Can be repeated.')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout.')
+    parser.add_argument('--profile-dir', help='dump a cProfile of every check to this directory.')
+    parser.add_argument('--track-memory', action='store_true',
+                        help='record the peak memory of every check. Makes checks slower.')
+    args = parser.parse_args(argv)
+
+    if args.scene_paths:
+        path_to_report = validate_scene_files(args.scene_paths, args.preset, args.checks, args.profile_dir,
+                                              args.track_memory)
+    else:
+        engine = ValidationEngine(get_check_classes(args.preset, args.checks), profile_dir=args.profile_dir,
+                                  track_memory=args.track_memory)
+        path_to_report = {pm.sceneName() or 'untitled': engine.run().to_dict()}
+
+    report_json = json.dumps(path_to_report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json)
+    else:
+        sys.stdout.write(report_json + '\n')
+    has_errors = any([r['severity'] == SEVERITY_NAMES[SEVERITY_ERROR] for r in path_to_report.values()])
+    return 1 if has_errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
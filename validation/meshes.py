@@ -14,9 +14,10 @@ def get_missing_uvs_from_scene(meshes=None, progress_bar=None):
     for mesh in meshes:
         if progress_bar:
             progress_bar.update_label_and_iter_chunk('Validating:  {0}'.format(mesh.name()))
-        missing_uv_faces = meshutils.get_faces_with_missing_uvs(mesh)
-        if missing_uv_faces:
-            meshes_with_missing_uvs[mesh] = missing_uv_faces
+        for mesh_node in meshutils.get_mesh_nodes(mesh):
+            missing_uv_faces = meshutils.get_faces_with_missing_uvs_from_mesh_node(mesh_node)
+            if missing_uv_faces:
+                meshes_with_missing_uvs[mesh_node] = missing_uv_faces
     return meshes_with_missing_uvs
 
 
@@ -74,9 +75,10 @@ def get_meshes_with_overlapping_verts_from_scene(meshes=None, progress_bar=None)
     for mesh in meshes:
         if progress_bar:
             progress_bar.update_label_and_iter_chunk('Validating:  {0}'.format(mesh.name()))
-        overlapping_verts = meshutils.get_overlapping_vertices(mesh)
-        if overlapping_verts:
-            meshes_with_overlapping_verts[mesh] = overlapping_verts
+        for mesh_node in meshutils.get_mesh_nodes(mesh):
+            overlapping_verts = meshutils.get_overlapping_vertices_from_mesh_node(mesh_node)
+            if overlapping_verts:
+                meshes_with_overlapping_verts[mesh_node] = overlapping_verts
     return meshes_with_overlapping_verts
 
 
@@ -92,25 +94,36 @@ def get_bad_history_nodes(node):
 
 
 def get_invalid_vertex_colors_from_scene(meshes=None, progress_bar=None):
+    """:returns: {mesh_node: ComponentSet of vertices} of every mesh shape with colored vertices"""
     meshes = meshes or meshutils.get_meshes_from_scene()
     meshes_with_invalid_vert_colors = {}
     if progress_bar:
         progress_bar.reset()
-        chunks = [len(m.vtx) for m in meshes]
+        chunks = [sum([meshutils.get_mesh_scan(n).fn_mesh.numVertices for n in meshutils.get_mesh_nodes(m)])
+                  for m in meshes]
         progress_bar.set_chunks(chunks)
     for mesh in meshes:
         if progress_bar:
             progress_bar.update_label_and_iter_chunk('Validating:  {0}'.format(mesh.name()))
-        mesh_node_to_index_to_color = meshutils.get_vertex_colors_from_node(mesh)
-        meshes_with_invalid_vert_colors.update(mesh_node_to_index_to_color)
+        for mesh_node in meshutils.get_mesh_nodes(mesh):
+            colored_verts = meshutils.get_colored_vertices_from_mesh_node(mesh_node)
+            if colored_verts:
+                meshes_with_invalid_vert_colors[mesh_node] = colored_verts
     return meshes_with_invalid_vert_colors
 
 
 def remove_vert_color(mesh_and_verts, progress_bar=None):
+    """
+    :param mesh_and_verts: (mesh, verts) pairs. verts is a ComponentSet or a list of vertices on mesh.
+    """
     if progress_bar:
         progress_bar.reset()
         progress_bar.set_maximum(len(mesh_and_verts))
     for mesh, verts in mesh_and_verts:
         if progress_bar:
             progress_bar.update_label_and_iter_val('Fixing:  {0}'.format(mesh.name()))
-        pm.polyColorPerVertex(verts, remove=True)
+        if isinstance(verts, meshutils.ComponentSet):
+            # a few range names instead of a PyNode per vertex keeps this one short command per mesh
+            verts = verts.get_range_names()
+        if verts:
+            pm.polyColorPerVertex(verts, remove=True)
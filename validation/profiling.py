@@ -0,0 +1,127 @@
+"""
+Timing and profiling of validation checks.
+
+measure() wraps a check's validate() or fix() and fills in a CheckStats with its wall time and peak memory.
+The engine adds how many nodes and mesh components the check looked at. Peak memory is what tracemalloc
+sees, which is Python objects and numpy arrays but not memory Maya allocates for itself.
+
+Given a profile path, measure() also runs the check under cProfile and dumps the stats there. Open them
+with pstats or snakeviz. Both cProfile and tracemalloc slow the check down a lot, so they are opt-in.
+"""
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+ACTION_VALIDATE = 'validate'
+ACTION_FIX = 'fix'
+# set to a directory to dump a cProfile of every check the validator UI and batch validation workers run
+PROFILE_DIR_ENV_VAR = 'FLOTTI_VALIDATION_PROFILE_DIR'
+# set to 1 to record the peak memory of every check the validator UI and batch validation workers run
+TRACK_MEMORY_ENV_VAR = 'FLOTTI_VALIDATION_TRACK_MEMORY'
+PROFILE_EXTENSION = '.prof'
+
+
+class CheckStats(object):
+    """What running a single check once cost."""
+    def __init__(self, check_name, action=ACTION_VALIDATE):
+        self.check_name = check_name
+        self.action = action
+        self.wall_time = 0.0
+        # nodes the check actually ran on. Nodes with a cached result are counted in cached_node_count instead.
+        self.node_count = 0
+        self.cached_node_count = 0
+        self.component_count = 0
+        # bytes, or None if memory was not tracked
+        self.peak_memory = None
+        self.profile_path = None
+
+    def to_dict(self):
+        return {'wall_time': self.wall_time,
+                'node_count': self.node_count,
+                'cached_node_count': self.cached_node_count,
+                'component_count': self.component_count,
+                'peak_memory': self.peak_memory,
+                'profile_path': self.profile_path}
+
+    def get_summary(self):
+        return format_seconds(self.wall_time)
+
+    def get_description(self):
+        lines = ['{0}: {1}'.format(self.action.capitalize(), format_seconds(self.wall_time)),
+                 'Nodes: {0} ({1} cached)'.format(self.node_count, self.cached_node_count),
+                 'Components: {}'.format(self.component_count)]
+        if self.peak_memory is not None:
+            lines.append('Peak memory: {}'.format(format_bytes(self.peak_memory)))
+        if self.profile_path:
+            lines.append('Profile: {}'.format(self.profile_path))
+        return '\n'.join(lines)
+
+
+@contextmanager
+def measure(stats, profile_path=None, track_memory=False):
+    """
+    Records the wall time and peak memory of the code in this context on stats.
+
+    :param stats: CheckStats to fill in.
+    :param profile_path: if given, profile the code with cProfile and dump the stats to this file.
+    :param track_memory: also record the peak memory with tracemalloc. It slows down code that allocates
+        many small Python objects several times over, which inflates the wall time too.
+    """
+    started_tracing = False
+    if track_memory:
+        if tracemalloc.is_tracing():
+            # reset_peak() is new in Python 3.9. Without it the peak may be from before this context.
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            started_tracing = True
+        start_memory = tracemalloc.get_traced_memory()[0]
+    profiler = cProfile.Profile() if profile_path else None
+    start_time = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield stats
+    finally:
+        if profiler:
+            profiler.disable()
+        stats.wall_time = time.perf_counter() - start_time
+        if track_memory:
+            stats.peak_memory = max(tracemalloc.get_traced_memory()[1] - start_memory, 0)
+            if started_tracing:
+                tracemalloc.stop()
+        if profiler:
+            profile_dir = os.path.dirname(profile_path)
+            if profile_dir and not os.path.exists(profile_dir):
+                os.makedirs(profile_dir)
+            profiler.dump_stats(profile_path)
+            stats.profile_path = profile_path
+
+
+def is_memory_tracking_enabled():
+    """True if TRACK_MEMORY_ENV_VAR is set to anything but 0 or an empty string."""
+    return os.environ.get(TRACK_MEMORY_ENV_VAR, '') not in ('', '0')
+
+
+def get_profile_path(profile_dir, scene_name, check_name, action):
+    """Returns <profile_dir>/<scene_name>.<check_name>.<action>.prof"""
+    file_name = '.'.join([scene_name, check_name, action]) + PROFILE_EXTENSION
+    return os.path.join(profile_dir, file_name)
+
+
+def format_seconds(seconds):
+    if seconds < 1.0:
+        return '{:.0f} ms'.format(seconds * 1000)
+    return '{:.2f} s'.format(seconds)
+
+
+def format_bytes(byte_count):
+    for unit in ('B', 'KB', 'MB'):
+        if byte_count < 1024:
+            return '{0:.0f} {1}'.format(byte_count, unit)
+        byte_count /= 1024.0
+    return '{:.1f} GB'.format(byte_count)
@@ -49,13 +49,26 @@ def get_non_normalized_verts_from_scene(skinned_meshes=None, progress_bar=None):
         if progress_bar:
             progress_bar.update_label_and_iter_chunk('Validating:  {0}'.format(skinned_mesh.name()))
         skin_cluster = skinutils.get_skincluster(skinned_mesh)
-        bad_vert_indexes_to_weight = skinutils.get_non_normalized_vert_indexes(skinned_mesh.vtx, skin_cluster)
-        bad_verts = [skinned_mesh.vtx[i] for i in bad_vert_indexes_to_weight]
-        if bad_verts:
+        bad_vert_indexes_to_weight = skinutils.get_non_normalized_vert_indexes(skin_cluster=skin_cluster)
+        if bad_vert_indexes_to_weight:
             non_normalized_verts[skinned_mesh] = bad_vert_indexes_to_weight
     return non_normalized_verts
 
 
+def normalize_non_normalized_verts_from_scene_validation(non_normalized_meshes_dict, progress_bar=None):
+    """:param non_normalized_meshes_dict: {skinned_mesh: {vert_index: total_weight}} like
+                                       get_non_normalized_verts_from_scene returns.
+    """
+    if progress_bar:
+        progress_bar.reset()
+        chunks = [len(x) for x in non_normalized_meshes_dict.values()]
+        progress_bar.set_chunks(chunks)
+    for skinned_mesh, bad_vert_indexes_to_weight in non_normalized_meshes_dict.items():
+        if progress_bar:
+            progress_bar.update_label_and_iter_chunk('Fixing:  {0}'.format(skinned_mesh.name()))
+        skinutils.normalize_skinned_mesh(skinned_mesh, list(bad_vert_indexes_to_weight.keys()))
+
+
 def normalize_skinned_meshes(skinned_meshes, progress_bar=None):
     if progress_bar:
         progress_bar.reset()
@@ -104,15 +117,17 @@ def get_extra_skeleton_roots_from_scene(skinned_meshes=None, progress_bar=None):
 
 def iterate_methods_per_vert(vertices, skin_cluster=None, methods=None, progress_bar=None):
     if progress_bar:
-        pbar_text = progress_bar.label.text()
+        pbar_text = progress_bar.get_label()
     results = []
     for i, vert in enumerate(vertices):
         for method in methods:
             result = method(vert, skin_cluster=skin_cluster)
             results.append(result)
         if progress_bar:
-            new_text = '{0}  vtx[{1}]'.format(pbar_text, vert.index())
-            progress_bar.update_label_and_iter_val(new_text)
+            # the label only changes on screen when the progress bar refreshes, so don't format it for every vert
+            progress_bar.iterate_value()
+            if progress_bar.is_refresh_due():
+                progress_bar.update_label('{0}  vtx[{1}]'.format(pbar_text, vert.index()))
 
 
 def get_dup_joint_names_from_scene(skinned_meshes=None):
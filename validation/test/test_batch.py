@@ -0,0 +1,98 @@
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import flottitools.batchtool.batchutils as batchutils
+import flottitools.validation.batch as val_batch
+
+
+# stands in for mayapy. Scene names decide what the fake worker does.
+FAKE_WORKER_SOURCE = textwrap.dedent('''
+    import json
+    import sys
+    import time
+
+    sys.stdout.write('{ready}\\n')
+    sys.stdout.flush()
+    for line in iter(sys.stdin.readline, ''):
+        scene_path = line.strip()
+        if 'hang' in scene_path:
+            time.sleep(60)
+        if 'crash' in scene_path:
+            sys.stdout.write('Fatal Error. Attempting to save in crash.ma\\n')
+            sys.stdout.flush()
+            sys.exit(3)
+        severity = 'error' if 'bad' in scene_path else 'pass'
+        report = {{'severity': severity, 'checks': {{'missing_uvs': {{'passed': severity == 'pass'}}}}}}
+        # Maya chatter without a newline in front of the report
+        sys.stdout.write('// Warning: chatter ' + '{report}' + json.dumps(report) + '\\n')
+        sys.stdout.flush()
+''').format(ready=val_batch.READY_MARKER, report=val_batch.REPORT_MARKER)
+
+
+class FakeBatchWorker(val_batch.BatchWorker):
+    fake_worker_path = None
+
+    def get_command(self):
+        return [sys.executable, self.fake_worker_path]
+
+
+class TestValidateSceneFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        FakeBatchWorker.fake_worker_path = os.path.join(self.tmp_dir, 'fake_worker.py')
+        with open(FakeBatchWorker.fake_worker_path, 'w') as f:
+            f.write(FAKE_WORKER_SOURCE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def validate(self, scene_paths, **kwargs):
+        return val_batch.validate_scene_files(scene_paths, worker_class=FakeBatchWorker, **kwargs)
+
+    def test_merges_reports_in_order(self):
+        scene_paths = ['a_bad.ma', 'b.ma', 'c.mb', 'd.ma']
+        result = self.validate(scene_paths, worker_count=2)
+        self.assertListEqual(scene_paths, list(result.keys()))
+        self.assertListEqual(['error', 'pass', 'pass', 'pass'], [r['severity'] for r in result.values()])
+
+    def test_crash_is_isolated(self):
+        result = self.validate(['a.ma', 'crash.ma', 'b.ma', 'c.ma'], worker_count=1)
+        self.assertEqual('error', result['crash.ma']['severity'])
+        self.assertIn('exited with code 3', result['crash.ma']['error'])
+        self.assertIn('Fatal Error', result['crash.ma']['error'])
+        self.assertListEqual(['pass', 'pass', 'pass'], [result[p]['severity'] for p in ['a.ma', 'b.ma', 'c.ma']])
+
+    def test_timeout_is_isolated(self):
+        result = self.validate(['hang.ma', 'a.ma'], worker_count=1, timeout=2)
+        self.assertIn('Timed out', result['hang.ma']['error'])
+        self.assertEqual('pass', result['a.ma']['severity'])
+
+    def test_missing_mayapy(self):
+        result = val_batch.validate_scene_files(['a.ma'], mayapy_path=os.path.join(self.tmp_dir, 'no_mayapy'))
+        self.assertIn('Could not start', result['a.ma']['error'])
+
+    def test_logs_every_scene(self):
+        logger = batchutils.Logger([], val_batch.OPERATION_NAME, self.tmp_dir)
+        self.validate(['a_bad.ma', 'b.ma'], logger=logger)
+        logger.finish()
+        with open(logger.log_file_path) as f:
+            log_text = f.read()
+        self.assertIn('a_bad.ma :  error: missing_uvs', log_text)
+        self.assertIn('b.ma :  pass', log_text)
+
+
+class TestGetMatchingFilePaths(unittest.TestCase):
+    def test_finds_scenes_in_dirs(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmp_dir, 'sub'))
+            for name in ['a.ma', 'b.txt', os.path.join('sub', 'c.mb')]:
+                open(os.path.join(tmp_dir, name), 'w').close()
+            result = batchutils.get_matching_file_paths([tmp_dir])
+            self.assertListEqual(['a.ma', 'c.mb'], [p.name for p in result])
+        finally:
+            shutil.rmtree(tmp_dir)
@@ -0,0 +1,65 @@
+import pymel.core as pm
+
+import flottitools.test as flottitest
+import flottitools.validation.cache as val_cache
+import flottitools.validation.engine as val_engine
+
+
+class RecordingOverlappingVerticesCheck(val_engine.OverlappingVerticesCheck):
+    def __init__(self):
+        self.validated_nodes = []
+
+    def validate(self, nodes, progress_bar=None):
+        self.validated_nodes.extend(nodes)
+        return super(RecordingOverlappingVerticesCheck, self).validate(nodes, progress_bar)
+
+
+class TestValidationCache(flottitest.MayaTestCase):
+    def setUp(self):
+        super(TestValidationCache, self).setUp()
+        self.cube_a = self.create_cube()
+        self.cube_b = self.create_cube()
+        self.check = RecordingOverlappingVerticesCheck()
+        self.cache = val_cache.ValidationCache()
+        self.engine = val_engine.ValidationEngine([self.check], self.cache)
+
+    def tearDown(self):
+        self.cache.close()
+        super(TestValidationCache, self).tearDown()
+
+    def test_unchanged_nodes_are_not_validated_again(self):
+        self.engine.run()
+        self.check.validated_nodes = []
+        report = self.engine.run()
+        self.assertListEqual([], self.check.validated_nodes)
+        self.assertListEqual([], report.results)
+
+    def test_only_changed_node_is_validated_again(self):
+        self.engine.run()
+        self.check.validated_nodes = []
+        pm.move(self.cube_a.vtx[1], self.cube_a.vtx[0].getPosition(space='world'), absolute=True)
+        report = self.engine.run()
+        self.assertListEqual([self.cube_a], self.check.validated_nodes)
+        self.assertListEqual([self.cube_a.getShape()], [r.node for r in report.results])
+
+    def test_cached_issues_are_reported(self):
+        pm.move(self.cube_a.vtx[1], self.cube_a.vtx[0].getPosition(space='world'), absolute=True)
+        self.engine.run()
+        report = self.engine.run()
+        self.assertListEqual([0, 1], report.results[0].data.indexes.tolist())
+
+    def test_dirty_node_with_same_content_reuses_result(self):
+        self.engine.run()
+        self.check.validated_nodes = []
+        pm.move(self.cube_a.vtx[1], (0, 1, 0), relative=True)
+        pm.move(self.cube_a.vtx[1], (0, -1, 0), relative=True)
+        self.engine.run()
+        self.assertListEqual([], self.check.validated_nodes)
+
+    def test_new_scene_clears_cache(self):
+        self.engine.run()
+        pm.newFile(force=True)
+        cube = self.create_cube()
+        self.check.validated_nodes = []
+        self.engine.run()
+        self.assertListEqual([cube], self.check.validated_nodes)
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pymel.core as pm
+
+import flottitools.test as flottitest
+import flottitools.validation.engine as val_engine
+
+
+class TestValidationEngine(flottitest.MayaTestCase):
+    def setUp(self):
+        super(TestValidationEngine, self).setUp()
+        self.test_cube = self.create_cube()
+        pm.polyMapDel(self.test_cube.f[1])
+        self.engine = val_engine.ValidationEngine([val_engine.MissingUVsCheck, val_engine.OverlappingVerticesCheck])
+
+    def test_run_returns_results(self):
+        report = self.engine.run()
+        results = report.get_results('missing_uvs')
+        self.assertEqual(1, len(results))
+        self.assertListEqual([1], results[0].data.indexes.tolist())
+        self.assertListEqual([], report.get_results('overlapping_vertices'))
+        self.assertTrue(report.has_errors)
+
+    def test_run_only_given_nodes(self):
+        other_cube = self.create_cube()
+        report = self.engine.run(nodes=[other_cube])
+        self.assertListEqual([], report.results)
+        self.assertEqual(val_engine.SEVERITY_PASS, report.severity)
+
+    def test_report_is_json_serializable(self):
+        report_dict = self.engine.run().to_dict()
+        result = json.loads(json.dumps(report_dict))
+        self.assertEqual('error', result['severity'])
+        self.assertFalse(result['checks']['missing_uvs']['passed'])
+        self.assertTrue(result['checks']['overlapping_vertices']['passed'])
+
+    def test_report_has_check_stats(self):
+        report_dict = self.engine.run().to_dict()
+        stats = report_dict['checks']['missing_uvs']['stats']
+        self.assertEqual(1, stats['node_count'])
+        self.assertEqual(8, stats['component_count'])
+        self.assertGreater(stats['wall_time'], 0.0)
+        self.assertIsNone(stats['peak_memory'])
+
+    def test_track_memory(self):
+        engine = val_engine.ValidationEngine([val_engine.MissingUVsCheck], track_memory=True)
+        stats = engine.run().to_dict()['checks']['missing_uvs']['stats']
+        self.assertIsNotNone(stats['peak_memory'])
+
+    def test_get_check_classes_by_preset(self):
+        result = val_engine.get_check_classes(presets=[val_engine.PRESET_MATERIALS_ONLY])
+        self.assertListEqual([], result)
+        result = val_engine.get_check_classes(names=['missing_uvs'])
+        self.assertListEqual([val_engine.MissingUVsCheck], result)
+
+
+class TestVertexColorCheck(flottitest.MayaTestCase):
+    def test_fix_removes_colors(self):
+        test_cube = self.create_cube()
+        pm.polyColorPerVertex(test_cube.vtx[0:5], rgb=(1, 0, 0))
+        engine = val_engine.ValidationEngine([val_engine.VertexColorCheck])
+        results = engine.run().results
+        self.assertListEqual(list(range(6)), results[0].data.indexes.tolist())
+        engine.fix(results)
+        self.assertListEqual([], engine.run().results)
+
+
+class TestMain(flottitest.MayaTempDirTestCase):
+    def test_writes_report(self):
+        test_cube = self.create_cube()
+        pm.polyMapDel(test_cube.f[1])
+        output_path = os.path.join(str(self.tmp_dir_root), 'report.json')
+        result = val_engine.main(['--check', 'missing_uvs', '--output', output_path])
+        self.assertEqual(1, result)
+        with open(output_path, 'r') as f:
+            report = list(json.load(f).values())[0]
+        self.assertFalse(report['checks']['missing_uvs']['passed'])
+
+    def test_profile_dir_dumps_profiles(self):
+        self.create_cube()
+        result = val_engine.main(['--check', 'missing_uvs', '--profile-dir', str(self.tmp_dir_root),
+                                  '--output', os.path.join(str(self.tmp_dir_root), 'report.json')])
+        self.assertEqual(0, result)
+        self.assertTrue(os.path.exists(os.path.join(str(self.tmp_dir_root), 'untitled.missing_uvs.validate.prof')))
@@ -0,0 +1,52 @@
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+import flottitools.validation.profiling as val_profiling
+
+
+class TestMeasure(unittest.TestCase):
+    def test_records_wall_time_and_peak_memory(self):
+        stats = val_profiling.CheckStats('foo')
+        with val_profiling.measure(stats, track_memory=True):
+            data = [str(i) for i in range(10000)]
+        self.assertGreater(stats.wall_time, 0.0)
+        self.assertGreater(stats.peak_memory, 10000)
+
+    def test_no_memory_tracking_by_default(self):
+        stats = val_profiling.CheckStats('foo')
+        with val_profiling.measure(stats):
+            pass
+        self.assertIsNone(stats.peak_memory)
+
+    def test_records_when_check_raises(self):
+        stats = val_profiling.CheckStats('foo')
+        with self.assertRaises(ValueError):
+            with val_profiling.measure(stats):
+                raise ValueError()
+        self.assertGreater(stats.wall_time, 0.0)
+
+    def test_dumps_profile(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            profile_path = val_profiling.get_profile_path(os.path.join(tmp_dir, 'profiles'), 'scene', 'foo',
+                                                          val_profiling.ACTION_FIX)
+            stats = val_profiling.CheckStats('foo', val_profiling.ACTION_FIX)
+            with val_profiling.measure(stats, profile_path):
+                sorted(range(1000), reverse=True)
+            self.assertEqual(profile_path, stats.profile_path)
+            self.assertTrue(pstats.Stats(profile_path).total_calls > 0)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+class TestFormatting(unittest.TestCase):
+    def test_format_seconds(self):
+        self.assertEqual('250 ms', val_profiling.format_seconds(.25))
+        self.assertEqual('1.50 s', val_profiling.format_seconds(1.5))
+
+    def test_format_bytes(self):
+        self.assertEqual('512 B', val_profiling.format_bytes(512))
+        self.assertEqual('2 MB', val_profiling.format_bytes(2 * 1024 * 1024))
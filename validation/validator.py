@@ -1,36 +1,25 @@
 import os
 
+import maya.api.OpenMaya as om
 import pymel.core as pm
 
 import flottitools.path_consts as path_consts
 import flottitools.ui as flottiui
-import flottitools.utils.materialutils as matutils
+import flottitools.utils.inventoryutils as invutils
 import flottitools.utils.meshutils as meshutils
-import flottitools.utils.skinutils as skinutils
-import flottitools.validation.materials as val_mats
-import flottitools.validation.meshes as val_mesh
-import flottitools.validation.skinmesh as val_skmesh
+import flottitools.utils.progressutils as progressutils
+import flottitools.validation.cache as val_cache
+import flottitools.validation.engine as val_engine
+import flottitools.validation.profiling as val_profiling
 
 from flottitools.ui import QtWidgets, QtCore, QtGui
+from flottitools.validation.engine import (CATEGORY_SKMESH, CATEGORY_MESH, CATEGORY_MAT,
+                                           PRESET_ALL, PRESET_NONE, PRESET_MATERIALS_ONLY,
+                                           PRESET_SKINNED_MESHES, PRESET_MESHES,
+                                           SEVERITY_ERROR, SEVERITY_WARNING, SEVERITY_PASS)
 
 
 VALIDATOR_UI = None
-# categories
-CATEGORY_SKMESH = 'skinned mesh'
-CATEGORY_MESH = 'static mesh'
-CATEGORY_MAT = 'materials'
-
-# presets
-PRESET_ALL = 'All'
-PRESET_NONE = 'None'
-PRESET_MATERIALS_ONLY = 'Materials Only'
-PRESET_SKINNED_MESHES = 'Skinned Meshes'
-PRESET_MESHES = 'Meshes'
-
-# severity
-SEVERITY_ERROR = 0
-SEVERITY_WARNING = 1
-SEVERITY_PASS = 2
 
 # colors
 COLOR_ERROR = 'maroon'
@@ -49,6 +38,7 @@ SEVERITY_COLOR_MAP = {
 def validator_launch(parent_to_notify=None, launch_hidden=False):
     global VALIDATOR_UI
     if VALIDATOR_UI:
+        VALIDATOR_UI.remove_callbacks()
         VALIDATOR_UI.deleteLater()
     VALIDATOR_UI = ValidatorMayaWindow(parent_to_notify)
     if not launch_hidden:
@@ -88,6 +78,12 @@ class ValidatorMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
         self.ui.pbar_vis_widget.layout().addWidget(self.ui.progress_bar)
 
         self._add_issues()
+        # unchanged nodes reuse their results so validating again after a small edit only checks what changed
+        self.cache = val_cache.ValidationCache()
+        self.engine = val_engine.ValidationEngine([issue.check for issue in self.initialized_issues], self.cache,
+                                                  profile_dir=os.environ.get(val_profiling.PROFILE_DIR_ENV_VAR),
+                                                  track_memory=val_profiling.is_memory_tracking_enabled())
+        self._save_callback_id = om.MSceneMessage.addCallback(om.MSceneMessage.kAfterSave, self._on_scene_saved)
         self._init_presets()
         self._init_scene_nodes()
         self._init_ui_connections()
@@ -102,20 +98,33 @@ class ValidatorMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
         try:
             self.ui.pbar_vis_widget.setVisible(True)
             for pb in progress_bars:
-                pb.reset()
+                pb.begin()
                 pb.set_maximum(len(issues_to_validate))
-            for issue in issues_to_validate:
-                for pb in progress_bars:
-                    pb.update_label_and_iter_val('Validating {}'.format(issue.label))
-                self._scroll_issues_to_issue(issue)
-                issue.validate_issue(update_parent_ui=False)
-            self.ui.pbar_vis_widget.setVisible(False)
-            self.update_ui_elements_based_on_issue_results()
+            # checks share one scene inventory for their node queries and one MeshScan per mesh for their mesh reads
+            with invutils.scene_inventory_cache(), meshutils.mesh_scan_cache():
+                for issue in issues_to_validate:
+                    for pb in progress_bars:
+                        pb.update_label_and_iter_val('Validating {}'.format(issue.label))
+                    self._scroll_issues_to_issue(issue)
+                    if not issue.validate_issue(update_parent_ui=False):
+                        break
+        except progressutils.ProgressCanceled:
+            print('Validation canceled.')
         except Exception as e:
             pm.waitCursor(state=False)
             raise e
+        self.ui.pbar_vis_widget.setVisible(False)
+        self.update_ui_elements_based_on_issue_results()
         pm.waitCursor(state=False)
 
+    def remove_callbacks(self):
+        om.MMessage.removeCallback(self._save_callback_id)
+        self.cache.close()
+
+    def _on_scene_saved(self, *args):
+        if self.isVisible():
+            self.validate_scene()
+
     def fix_all(self):
         issues_to_fix = [i for i in self.get_dirty_issues() if i.has_fix_method]
         [issue.fix_issue() for issue in issues_to_fix]
@@ -275,8 +284,9 @@ class ValidatorMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
 
     def _get_all_nodes_to_validate(self):
         all_val_nodes = []
-        for issue in self._get_all_issues_to_validate():
-            all_val_nodes.extend(issue.get_nodes_to_validate())
+        with invutils.scene_inventory_cache():
+            for issue in self._get_all_issues_to_validate():
+                all_val_nodes.extend(issue.get_nodes_to_validate())
         all_val_nodes = list(set(all_val_nodes))
         all_val_nodes.sort()
         return all_val_nodes
@@ -293,13 +303,13 @@ class ValidatorMayaWindow(flottiui.FlottiMayaWindowDesignerUI):
 
     def _init_presets(self):
         self.ui.presets_groupBox.setVisible(False)
-        self.preset_names = [PRESET_ALL, PRESET_SKINNED_MESHES, PRESET_MESHES, PRESET_MATERIALS_ONLY, PRESET_NONE]
+        self.preset_names = list(val_engine.PRESETS)
         self.preset_name_to_issue_state = {}
         for preset_name in self.preset_names:
             self.preset_name_to_issue_state.setdefault(preset_name, [])
             for issue in self.issues:
                 val = False
-                if preset_name in issue.presets:
+                if preset_name in issue.check_class.presets:
                     val = True
                 self.preset_name_to_issue_state[preset_name].append(val)
         self.refresh_presets_list()
@@ -359,6 +369,8 @@ class ValidationIssueWidget(flottiui.FlottiMayaWindowDesignerUI):
                          SEVERITY_WARNING: warning_path,
                          None: unknown_path}
 
+    # the val_engine.ValidationCheck this widget shows. Its label, severity etc. are copied onto the widget.
+    check_class = None
     report_widget = None
     category = None
     label = None
@@ -373,6 +385,9 @@ class ValidationIssueWidget(flottiui.FlottiMayaWindowDesignerUI):
     def __init__(self, validator_instance):
         super(ValidationIssueWidget, self).__init__()
         self.validator_instance = validator_instance
+        self.check = self.check_class()
+        for attr_name in ('category', 'label', 'description', 'issue_report_label', 'severity', 'has_fix_method'):
+            setattr(self, attr_name, getattr(self.check, attr_name))
         self.dirty = None
         self.ui.issue_label.setText(self.description)
         preval_pixmap = QtGui.QPixmap(self.preval_path)
@@ -386,12 +401,19 @@ class ValidationIssueWidget(flottiui.FlottiMayaWindowDesignerUI):
         self._init_progress_bar()
 
     def validate_issue(self, update_parent_ui=True):
+        """Returns False if validation was canceled, leaving the issue's previous results in place."""
         nodes_to_validate = self.get_whitelisted_nodes_to_validate()
         result = None
         if nodes_to_validate:
             self.ui.pbar_vis_widget.setVisible(True)
-            result = self.validate(nodes_to_validate)
-            self.ui.pbar_vis_widget.setVisible(False)
+            self.ui.progress_bar.begin()
+            try:
+                result = self.validate(nodes_to_validate)
+            except progressutils.ProgressCanceled:
+                print('{} validation canceled.'.format(self.label))
+                return False
+            finally:
+                self.ui.pbar_vis_widget.setVisible(False)
 
         if result:
             self.dirty = True
@@ -418,9 +440,17 @@ class ValidationIssueWidget(flottiui.FlottiMayaWindowDesignerUI):
         if update_parent_ui:
             self.validator_instance.update_ui_elements_based_on_issue_results()
         self.validator_instance.update_ui_elements_based_on_issue_results()
+        return True
 
     def validate(self, nodes_to_validate=None):
-        raise NotImplementedError(self.error_msg)
+        results = self.validator_instance.engine.run_check(self.check, nodes_to_validate,
+                                                           progress_bar=self.ui.progress_bar)
+        self.update_timing_label()
+        nodes_to_issue_data = dict([(result.node, result.data) for result in results])
+        self.validation_results = self.format_validation_results(nodes_to_issue_data,
+                                                                 self.issue_report_label,
+                                                                 severity=self.severity)
+        return self.validation_results
 
     @staticmethod
     def validation_method(white_listed_nodes=None):
@@ -431,10 +461,31 @@ class ValidationIssueWidget(flottiui.FlottiMayaWindowDesignerUI):
         report_widget_instance.show()
 
     def fix(self):
-        raise NotImplementedError(self.error_msg)
+        if not self.has_fix_method:
+            raise NotImplementedError(self.error_msg)
+        self.ui.pbar_vis_widget.setVisible(True)
+        self.ui.progress_bar.begin()
+        nodes_to_issue_data = dict([(val_node.node, val_node.issues[0].data) for val_node in self.validation_results])
+        try:
+            self.validator_instance.engine.fix_check(self.check, nodes_to_issue_data, progress_bar=self.ui.progress_bar)
+        except progressutils.ProgressCanceled:
+            # nodes fixed before canceling stay fixed. validate_issue() shows what is left.
+            print('{} fix canceled.'.format(self.label))
+        finally:
+            self.ui.pbar_vis_widget.setVisible(False)
+
+    def update_timing_label(self):
+        """Shows how long the check took to validate and, in the tooltip, what it cost to validate and fix."""
+        engine = self.validator_instance.engine
+        all_stats = [engine.get_check_stats(self.check, action)
+                     for action in (val_profiling.ACTION_VALIDATE, val_profiling.ACTION_FIX)]
+        all_stats = [stats for stats in all_stats if stats]
+        validate_stats = engine.get_check_stats(self.check)
+        self.ui.timing_label.setText(validate_stats.get_summary() if validate_stats else '')
+        self.ui.timing_label.setToolTip('\n\n'.join([stats.get_description() for stats in all_stats]))
 
     def get_nodes_to_validate(self):
-        raise NotImplementedError(self.error_msg)
+        return self.check.get_nodes_to_validate()
 
     def get_whitelisted_nodes_to_validate(self):
         all_nodes = self.get_nodes_to_validate()
@@ -682,39 +733,9 @@ class ExceedingVertsIssueReportWidget(IssueReportWidget):
 
 
 class ExceedingVertsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_SKMESH
-    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
-    label = 'Exceeding Verts'
-    description = 'Vertices with more than four influences.'
-    issue_report_label = 'Vertices in {} with more than four influences'
-    severity = SEVERITY_ERROR
-
+    check_class = val_engine.ExceedingVertsCheck
     report_widget = ExceedingVertsIssueReportWidget
 
-    def validate(self, skinned_meshes=None):
-        meshes_to_bad_verts = val_skmesh.get_exceeding_verts_from_scene(
-            skinned_meshes, self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_bad_verts,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def fix(self):
-        self.ui.pbar_vis_widget.setVisible(True)
-        exceeding_meshes_dict = self._format_val_results_for_fix()
-        val_skmesh.prune_exceeding_influences_from_scene_validation(exceeding_meshes_dict, self.ui.progress_bar)
-        self.ui.pbar_vis_widget.setVisible(False)
-
-    def get_nodes_to_validate(self):
-        return skinutils.get_skinned_meshes_from_scene()
-
-    def _format_val_results_for_fix(self):
-        exceeding_meshes_dict = {}
-        for val_node in self.validation_results:
-            issue_data = val_node.issues[0].data
-            exceeding_meshes_dict[val_node.node] = issue_data
-        return exceeding_meshes_dict
-
 
 class NonNormalizedVertsIssueReportWidget(IssueReportWidget):
     window_title = "Validate Non-normalized Vertices Report"
@@ -739,35 +760,9 @@ class NonNormalizedVertsIssueReportWidget(IssueReportWidget):
 
 
 class NonNormalizedVertsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_SKMESH
-    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
-    label = 'Non-normalized Verts'
-    description = 'Vertices with non normalized weights.'
-    issue_report_label = 'Vertices in {} with non-normalized weights'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.NonNormalizedVertsCheck
     report_widget = NonNormalizedVertsIssueReportWidget
 
-    def validate(self, skinned_meshes=None):
-        validation_results = val_skmesh.get_non_normalized_verts_from_scene(
-            skinned_meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(validation_results,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def fix(self):
-        self.ui.pbar_vis_widget.setVisible(True)
-        formatted_val_results = self.format_val_nodes_for_fix_method()
-        val_skmesh.normalize_skinned_meshes(formatted_val_results, self.ui.progress_bar)
-        self.ui.pbar_vis_widget.setVisible(False)
-
-    def format_val_nodes_for_fix_method(self):
-        skinned_meshes = [v.node for v in self.validation_results]
-        return skinned_meshes
-
-    def get_nodes_to_validate(self):
-        return skinutils.get_skinned_meshes_from_scene()
-
 
 class ExceedingJointsIssueReportWidget(IssueReportWidget):
     window_title = "Validate >64 Weighted Influences Report"
@@ -788,25 +783,8 @@ class ExceedingJointsIssueReportWidget(IssueReportWidget):
 
 
 class ExceedingJointsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_SKMESH
-    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
-    label = 'Too Many Joints'
-    description = 'Meshes skinned to more than 64 joints.'
-    issue_report_label = '{} is skinned to more than 64 joints'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.ExceedingJointsCheck
     report_widget = ExceedingJointsIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, skinned_meshes=None):
-        meshes_to_joint_count = val_skmesh.get_joint_counts_from_scene(
-            skinned_meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_joint_count,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return skinutils.get_skinned_meshes_from_scene()
 
 
 class ExtraRootJointsIssueReportWidget(IssueReportWidget):
@@ -838,25 +816,8 @@ class ExtraRootJointsIssueReportWidget(IssueReportWidget):
 
 
 class ExtraRootJointsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_SKMESH
-    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
-    label = 'Extra Root Joints'
-    description = 'Skeletons that have more than one root.'
-    issue_report_label = '{} has more than one root joint in its skeleton.'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.ExtraRootJointsCheck
     report_widget = ExtraRootJointsIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, skinned_meshes=None):
-        meshes_to_extra_roots = val_skmesh.get_extra_skeleton_roots_from_scene(
-            skinned_meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_extra_roots,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return skinutils.get_skinned_meshes_from_scene()
 
 
 class MediaNotInTexturePathsIssueReportWidget(IssueReportWidget):
@@ -914,25 +875,8 @@ class MediaNotInTexturePathsIssueReportWidget(IssueReportWidget):
 
 
 class MediaNotInTexturePathsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MAT
-    presets = [PRESET_ALL, PRESET_MATERIALS_ONLY]
-    label = 'Bad Texture Paths'
-    description = '"Media" not in texture paths.'
-    issue_report_label = '{} uses a texture that does not contain "media" in the file path.'
-    severity = SEVERITY_WARNING
+    check_class = val_engine.MediaNotInTexturePathsCheck
     report_widget = MediaNotInTexturePathsIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, material_nodes=None):
-        mats_to_file_nodes = val_mats.get_materials_with_bad_texture_paths_from_scene(
-            material_nodes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(mats_to_file_nodes,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return matutils.get_used_materials_in_scene()
 
 
 class JointsWithDuplicatedNamesIssueReportWidget(IssueReportWidget):
@@ -954,25 +898,8 @@ class JointsWithDuplicatedNamesIssueReportWidget(IssueReportWidget):
 
 
 class JointsWithDuplicatedNamesIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_SKMESH
-    presets = [PRESET_ALL, PRESET_SKINNED_MESHES]
-    label = 'Joints with non unique names'
-    description = 'Joints with non unique names'
-    issue_report_label = '{} is sharing its name with another joint.'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.JointsWithDuplicatedNamesCheck
     report_widget = JointsWithDuplicatedNamesIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, skinned_meshes=None):
-        joints_dict = val_skmesh.get_dup_joint_names_from_scene(skinned_meshes)
-
-        self.validation_results = self.format_validation_results(joints_dict,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return skinutils.get_skinned_meshes_from_scene()
 
 
 class MissingUVsIssueReportWidget(IssueReportWidget):
@@ -992,24 +919,8 @@ class MissingUVsIssueReportWidget(IssueReportWidget):
 
 
 class MissingUVsIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MESH
-    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
-    label = 'Missing UVs'
-    description = 'Meshes with unmapped faces.'
-    issue_report_label = '{} has faces that are missing UVs.'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.MissingUVsCheck
     report_widget = MissingUVsIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, meshes=None):
-        meshes_to_bad_faces = val_mesh.get_missing_uvs_from_scene(meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_bad_faces,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return val_mesh.get_missing_uvs_from_scene()
 
 
 class MultipleShapeNodesIssueReportWidget(IssueReportWidget):
@@ -1029,25 +940,8 @@ class MultipleShapeNodesIssueReportWidget(IssueReportWidget):
 
 
 class MultipleShapeNodesIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MESH
-    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
-    label = 'Multiple shape nodes'
-    description = 'Meshes with too many shape nodes.'
-    issue_report_label = '{} has too many shape nodes.'
-    severity = SEVERITY_ERROR
+    check_class = val_engine.MultipleShapeNodesCheck
     report_widget = MultipleShapeNodesIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, meshes=None):
-        meshes_to_shapes = val_mesh.get_meshes_with_multiple_shapes_from_scene(
-            meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_shapes,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return meshutils.get_meshes_from_scene()
 
 
 class DirtyHistoryMeshIssueReportWidget(IssueReportWidget):
@@ -1067,29 +961,9 @@ class DirtyHistoryMeshIssueReportWidget(IssueReportWidget):
 
 
 class DirtyHistoryMeshIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MESH
-    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
-    label = 'Dirty construction history'
-    description = 'Meshes with dirty construction history.'
-    issue_report_label = '{} has dirty construction history.'
-    severity = SEVERITY_WARNING
+    check_class = val_engine.DirtyHistoryMeshCheck
     report_widget = DirtyHistoryMeshIssueReportWidget
 
-    def validate(self, meshes=None):
-        meshes_to_shapes = val_mesh.get_meshes_with_dirty_history_from_scene(
-            meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_shapes,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return meshutils.get_meshes_from_scene()
-
-    def fix(self):
-        meshes = [v.node for v in self.validation_results]
-        val_mesh.fix_meshes_with_dirty_history(meshes)
-
 
 class OverlappingVerticesIssueReportWidget(IssueReportWidget):
     window_title = "Validate Overlapping Vertices"
@@ -1108,25 +982,8 @@ class OverlappingVerticesIssueReportWidget(IssueReportWidget):
 
 
 class OverlappingVerticesIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MESH
-    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
-    label = 'Overlapping Vertices'
-    description = 'Meshes with overlapping vertices.'
-    issue_report_label = '{} has overlapping vertices.'
-    severity = SEVERITY_WARNING
+    check_class = val_engine.OverlappingVerticesCheck
     report_widget = OverlappingVerticesIssueReportWidget
-    has_fix_method = False
-
-    def validate(self, meshes=None):
-        meshes_to_bad_verts = val_mesh.get_meshes_with_overlapping_verts_from_scene(
-            meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_bad_verts,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return meshutils.get_meshes_from_scene()
 
 
 class VertexColorIssueReportWidget(IssueReportWidget):
@@ -1134,9 +991,8 @@ class VertexColorIssueReportWidget(IssueReportWidget):
 
     @staticmethod
     def format_issue_and_add_to_group_box(issue, issue_layout):
-        node_and_value_pairs = []
-        for vert_index, vert_color in issue.data.items():
-            node_and_value_pairs.append((issue.parent_val_data.node.vtx[vert_index], vert_color))
+        colors = meshutils.get_mesh_scan(issue.data.mesh).vertex_colors[issue.data.indexes]
+        node_and_value_pairs = list(zip(issue.data, [tuple(color) for color in colors.tolist()]))
         _setup_simple_vert_table(node_and_value_pairs, 'Vert Color', issue_layout)
 
     @staticmethod
@@ -1149,35 +1005,8 @@ class VertexColorIssueReportWidget(IssueReportWidget):
 
 
 class VertexColorIssueWidget(ValidationIssueWidget):
-    category = CATEGORY_MESH
-    presets = [PRESET_ALL, PRESET_MESHES, PRESET_SKINNED_MESHES]
-    label = 'Invalid Vertex Color'
-    description = 'Meshes with invalid vertex color.'
-    issue_report_label = '{} has vertices with invalid color.'
-    severity = SEVERITY_WARNING
+    check_class = val_engine.VertexColorCheck
     report_widget = VertexColorIssueReportWidget
-    has_fix_method = True
-
-    def fix(self):
-        self.ui.pbar_vis_widget.setVisible(True)
-        meshes_and_verts = []
-        for val_node in self.validation_results:
-            issue_data = val_node.issues[0].data
-            verts = [val_node.node.vtx[i] for i in issue_data.keys()]
-            meshes_and_verts.append((val_node.node, verts))
-        val_mesh.remove_vert_color(meshes_and_verts)
-        self.ui.pbar_vis_widget.setVisible(False)
-
-    def validate(self, meshes=None):
-        meshes_to_bad_verts = val_mesh.get_invalid_vertex_colors_from_scene(
-            meshes, progress_bar=self.ui.progress_bar)
-        self.validation_results = self.format_validation_results(meshes_to_bad_verts,
-                                                                 self.issue_report_label,
-                                                                 severity=self.severity)
-        return self.validation_results
-
-    def get_nodes_to_validate(self):
-        return meshutils.get_meshes_from_scene()
 
 
 class ValidatorEmbedded(QtWidgets.QWidget):
@@ -1275,16 +1104,21 @@ def _setup_simple_vert_table(node_and_value_pairs, column_label, parent_layout):
 
 
 def _setup_simple_report_list_widget(nodes, parent_layout):
+    """:param nodes: list of PyNodes or a meshutils.ComponentSet"""
     list_widget = QtWidgets.QListWidget()
     list_widget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
     parent_layout.addWidget(list_widget)
-    for node in nodes:
-        list_item = QtWidgets.QListWidgetItem(node.name())
-        list_widget.addItem(list_item)
+    is_component_set = isinstance(nodes, meshutils.ComponentSet)
+    # a ComponentSet names its components without making a PyNode for each one
+    labels = nodes.get_names() if is_component_set else [node.name() for node in nodes]
+    list_widget.addItems(labels)
 
     def on_sel_change():
-        to_select = [nodes[i.row()] for i in list_widget.selectedIndexes()]
-        pm.select(to_select, r=True)
+        rows = [i.row() for i in list_widget.selectedIndexes()]
+        if is_component_set:
+            nodes.subset(rows).select()
+        else:
+            pm.select([nodes[row] for row in rows], r=True)
     list_widget.itemSelectionChanged.connect(on_sel_change)
 
 